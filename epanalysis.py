@@ -0,0 +1,467 @@
+# epanalysis.py
+# Per-file analysis of EnergyPlus results for eppp.py, with optional process-pool execution
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# analyzeFile() does the work of one pass of the old "for f in files" loop in eppp.py: read the
+# EnergyPlus output, compute cost, energy and comfort metrics, and export the comfort data.
+# analyzeFiles() runs it over a list of files, either in order or spread over a process pool.
+# Read-only inputs that are the same for every file (price, occupancy, 100% comfort bounds, ...)
+# are computed once by eppp.py and passed in as the dict "shared", which is handed to each
+# worker process once when the pool starts rather than once per file.
+# If shared['results'] holds a run key (see epresults.py), results saved by an earlier run with
+# the same inputs and parameters are reused instead of analyzing the file again.
+# With profiling on (shared['profile'], see epprofile.py), each file's stage records are returned
+# in res['profile'] so that they reach the main process from worker processes too.
+
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from epcost import computeCost, energyMatrix, convTokWh
+from epcomfort import (adaptiveBounds, tempDifference, percentComfortable, bounds90, boundsAt, isComfortable,
+                       pctOccupiedComfortable, occupiedComfortCounts)
+from eploader import (loadEPlusCSV, findRunPeriodStart, findZones, columnTypes, outdoorChunks, chunkWindow, EPPP_COLUMNS,
+                      INDOOR_COL, OUTDOOR_COL, HEAT_SETPT_COL, COOL_SETPT_COL, FACILITY_COL, HEATING_COL, COOLING_COL)
+from epoccupancy import occupancyStatusChunks
+from epzones import zoneArrays, zoneCounts, addZoneCounts, zoneResult, zoneFileName, writeZones
+from epresults import resultKey, loadResult, storeResult
+from epexport import exportPath, datasetPath, openTable, writeChunk, closeTable, writeTable
+from epprofile import enableProfile, profileOn, clock, recordSince, takeRecords
+
+# Shared inputs for this worker process, set once by initWorker when the pool starts
+_shared = None
+
+# Returns the comfort DataFrame for indoor and outdoor temperature and occupancy Series, which must
+# all have the same index (row numbers from the first non-calibration row).
+# Columns: indoor, outdoor, occupancy, comfort90_min, comfort90_max, is90, comf_occ_90,
+#          is80, comfort80_min, comfort80_max, comf_occ80
+def comfortTable(indoor, outdoor, occupancy):
+    comfort = pd.DataFrame(index=indoor.index)
+    comfort['indoor'] = indoor
+    comfort['outdoor'] = outdoor
+    comfort['occupancy'] = occupancy
+    # Adaptive setpoint bounds for 90% of people
+    comfort['comfort90_min'], comfort['comfort90_max'] = bounds90(comfort['outdoor'])
+    # Determine if temp is within 90% comfort bounds
+    comfort['is90'] = isComfortable(comfort['indoor'], comfort['comfort90_min'], comfort['comfort90_max'])
+    # Is it both comfortable and occupied? 'is90' and 'occupancy' are both arrays with values of 1 or 0. Multiplying results
+    # in 1 if both are true, and 0 otherwise
+    comfort['comf_occ_90'] = comfort['is90']*comfort['occupancy']
+    # 80% range: 100% setpoint band + expanded amount allowed by comfort range at 80%
+    comfort80_min, comfort80_max = boundsAt(comfort['outdoor'], 0.80)
+    comfort['is80'] = isComfortable(comfort['indoor'], comfort80_min, comfort80_max)
+    comfort['comfort80_min'] = comfort80_min
+    comfort['comfort80_max'] = comfort80_max
+    comfort['comf_occ80'] = comfort['is80']*comfort['occupancy']
+    return comfort
+
+# Returns the comfort data file exported for input file f, or None if comfort export is off
+def comfortFileName(f, comfortSuffix):
+    if "None" in comfortSuffix or "none" in comfortSuffix: return None
+    return f.replace(".csv" , "") + "_" + comfortSuffix
+
+# Returns the file the comfort data of input file f is exported to, in the export format of shared
+# (see epexport.py), or None if comfort export is off
+def comfortExportFile(f, shared):
+    comfortFile = comfortFileName(f, shared['comfortSuffix'])
+    if comfortFile is None: return None
+    if shared['dataset']: return datasetPath(shared['dataset'], f, shared['exportFormat'])
+    return exportPath(comfortFile, shared['exportFormat'])
+
+# Add setpoints, heating and cooling energy, price and per-step cost to the comfort DataFrame for
+# export. data holds the EnergyPlus columns with the same index as comfort (may be more rows).
+# stepCost is the per-step cost array from computeCost for the rows of comfort, or None for legacy prices.
+def addExportColumns(comfort, data, shared, stepCost):
+    comfort['Max_Setpt'] = data[COOL_SETPT_COL]
+    comfort['Min_Setpt'] = data[HEAT_SETPT_COL]
+    comfort["Cooling Electricity [kWh]"] = data[COOLING_COL]*convTokWh
+    comfort["Heating Electricity [kWh]"] = data[HEATING_COL]*convTokWh
+    if 'l' not in shared['priceType']:
+        comfort['Electricity Price [$/kWh]'] = np.asarray(shared['eprice'])[comfort.index]
+        # Per-timestep cost from the cost engine
+        comfort['Electricity Cost [$]'] = stepCost[0]
+        comfort['Heating Cost [$]'] = stepCost[1]
+        comfort['Cooling Cost [$]'] = stepCost[2]
+    else:
+        comfort['Electric Price [$/kWh]'] = shared['legacyPrice']['Price [$/MWh]']
+
+# Returns [zones, columns to read] for input file f: the eppp.py columns, and with shared['zones'] set,
+# the zone columns too so that every zone is read in the same parse
+def fileColumns(f, shared):
+    if not shared.get('zones'): return [None, EPPP_COLUMNS]
+    zones, zoneCols = findZones(f, shared['zones'])
+    return [zones, EPPP_COLUMNS + [c for c in zoneCols if c not in EPPP_COLUMNS]]
+
+# Per-zone metrics of rows win of a file (see epzones.py), added into total (None for the first chunk).
+# occupancy is the occupancy status Series holding the rows of win, or None for shared['occupancy'].
+def addZoneRows(total, win, zones, shared, occupancy=None):
+    if occupancy is None: occupancy = shared['occupancy']
+    indoor, heatSet, coolSet = zoneArrays(win, zones)
+    if shared['outdoorTemp'] is not None: outdoor = shared['outdoorTemp'].reindex(win.index)
+    else: outdoor = win[OUTDOOR_COL]
+    return addZoneCounts(total, zoneCounts(indoor, heatSet, coolSet, outdoor.to_numpy(),
+                                           occupancy.reindex(win.index).to_numpy()))
+
+# Put the zone metrics in res and export them
+def finishZones(res, counts, zones, shared, say):
+    res['zones'] = zoneResult(counts, zones, shared['timestep'])
+    zoneFile = zoneFileName(res['file'])
+    writeZones(zoneFile, res['zones'])
+    say("Zones: ", len(zones), "   Building percent of occupied time within 90% comfortable:",
+        res['zones']['pctTimeComf90'][-1])
+    say("Zone Data Exported to: ", zoneFile)
+
+# Analyze one EnergyPlus result file. Returns a dict of the summary metrics for the file.
+# Terminal output is collected in res['log'] instead of printed so that the caller can show it
+# in file order even when files are processed in parallel.
+# shared must contain:
+#   priceType, eprice (or legacyPrice for priceType 'l'), occupancy, outdoorTemp,
+#   comfHeat100, comfCool100, datastart, dataend, firstDay, lastDay, calibration (rows or 'auto'),
+#   comfortSuffix, exportFormat, float32, dataset (see epexport.py), verbose, graph, cache, startDate, stream (rows per chunk, or None),
+#   sweep (if True, res['energy'] is the energyMatrix of the file for the tariff sweep),
+#   results (run key for saved results, or None), profile (True to record stage times, optional),
+#   zones ('all' or a list of zone names for per-zone metrics, see epzones.py, or None), timestep [minutes]
+def analyzeFile(f, shared):
+    log = []
+    def say(*args):
+        log.append(' '.join(str(a) for a in args))
+    res = {'file': f, 'found': False, 'log': log}
+
+    datastart = shared['datastart']
+    dataend = shared['dataend']
+    ndays = shared['lastDay'] - shared['firstDay']
+    priceType = shared['priceType']
+    verbose = shared['verbose']
+    outdoorTemp = shared['outdoorTemp']
+    temp_100comfort_heating = shared['comfHeat100']
+    temp_100comfort_cooling = shared['comfCool100']
+
+    # Read EP file data ----------------------------------------
+    # Only the columns used here, with the EnergyPlus calibration part removed while loading
+    stageStart = clock()
+    try:
+        zones, columns = fileColumns(f, shared)
+        data = loadEPlusCSV(f, columns, shared['calibration'], shared['startDate'], useCache=shared['cache'])
+    except FileNotFoundError:
+        say("Input file ", f, " does not exist, skipping.")
+        return res
+    res['found'] = True
+    recordSince('load', stageStart, f, len(data))
+    say("-------------------------------------------------\n\nDataset: " + f)
+    # Indoor temperature for current simulation
+    indoorTemp = data['LIVING_UNIT1:Zone Air Temperature [C](TimeStep)']
+
+    # Cost, energy consumption, and thermal comfort ---------------------------
+    # determine price using total electricity times price of energy
+    stageStart = clock()
+    if 'l' in priceType: # Legacy - older files
+        price = shared['legacyPrice']
+        pricePaid = price['Price [$/MWh]'].loc[0:len(data)-1]*data['Electricity:Facility [J](TimeStep)']*convTokWh
+        res['totalPrice'] = pricePaid.sum()
+        res['heatPrice'] = 0
+        res['coolPrice'] = 0
+        stepCost = None
+    else: # New getWholesaleCAISO files
+        eprice = shared['eprice']
+        if verbose:
+            say("Price timesteps: ", len(eprice), "  Data timesteps: ", len(data))
+        # Whole-array cost for [datastart, dataend), keeping per-step costs for the comfort export
+        res['totalPrice'], res['heatPrice'], res['coolPrice'], stepCost = computeCost(eprice,
+            data['Electricity:Facility [J](TimeStep)'], data['Heating:Electricity [J](TimeStep)'],
+            data['Cooling:Electricity [J](TimeStep)'], datastart, dataend, perStep=True)
+    say("Total HVAC Electric Bill [$] = ",res['totalPrice'])
+    res['avgDailyCost'] = res['totalPrice'] / ndays
+    # Electricity per timestep [kWh] for the tariff sweep
+    if shared['sweep']:
+        res['energy'] = energyMatrix(data[FACILITY_COL], data[HEATING_COL], data[COOLING_COL], datastart, dataend)
+
+    # total energy over whole simulation ------------------------------------------
+    elec_kwh = pd.DataFrame(columns=["Heating Electricity [kWh]", "Cooling Electricity [kWh]"])
+    elec_kwh["Heating Electricity [kWh]"] = data['Heating:Electricity [J](TimeStep)']*convTokWh
+    res['totHeatElec'] = elec_kwh["Heating Electricity [kWh]"].iloc[datastart:dataend].sum()
+    say("total heating electricity [kWh]:",res['totHeatElec'])
+
+    elec_kwh["Cooling Electricity [kWh]"] = data['Cooling:Electricity [J](TimeStep)']*convTokWh
+    res['totCoolElec'] = elec_kwh["Cooling Electricity [kWh]"].iloc[datastart:dataend].sum()
+    say("total cooling electricity [kWh]:",res['totCoolElec'])
+
+    res['avgDailyEnergy'] = (res['totHeatElec'] + res['totCoolElec']) / ndays
+    say("Average Daily HVAC Electricity [kWh] = ", res['avgDailyEnergy'])
+
+    recordSince('cost & energy', stageStart, f, dataend - datastart)
+
+    # thermal comfort -----------------------------------------------------------
+    stageStart = clock()
+    # temperature difference from indoor to 100% comfortable:
+    delta_temp = pd.DataFrame({"maximum": tempDifference(indoorTemp, temp_100comfort_heating, temp_100comfort_cooling)})
+
+    # Convert temperature difference into percent of comfortable occupants:
+    delta_temp["percent-comfortable"] = percentComfortable(delta_temp["maximum"])
+    if verbose:
+        say("Percent Comfortable Regardless of Occupancy Dataframe")
+        say(delta_temp.head(24))
+    res['meanDiff100'] = delta_temp["maximum"].iloc[datastart:dataend].mean()
+    say("\nMean temperature difference from 100% comfortable temperature:", res['meanDiff100'])
+    res['meanComfBand'] = delta_temp["percent-comfortable"].iloc[datastart:dataend].mean()
+    say("Mean comfort band percent:", res['meanComfBand'])
+
+    # Determine percentage of time that indoor temp is within 90% and 80% range ----------
+    comfort = comfortTable(indoorTemp.iloc[datastart:dataend], outdoorTemp.iloc[datastart:dataend],
+                           shared['occupancy'].iloc[datastart:dataend])
+    # Compare what percent of the time it is comfortable when occupied with the total occupied time
+    res['pctTimeComf90'] = pctOccupiedComfortable(comfort['is90'], comfort['occupancy'])
+    say('Percent of occupied time indoor temperature is within 90% comfortable:', res['pctTimeComf90'])
+    res['pctTimeComf80'] = pctOccupiedComfortable(comfort['is80'], comfort['occupancy'])
+    say('Percent of occupied time indoor temperature is within 80% comfortable:', res['pctTimeComf80'])
+
+    if verbose: #Optional output of the first few lines of the data table
+        say("Percent of Occupied Time that is Comfortable Dataframe")
+        say(comfort.head(20))
+
+    recordSince('comfort', stageStart, f, len(comfort))
+
+    # Output detailed comfort data -------------------------------------------
+    comfortFile = comfortExportFile(f, shared)
+    if comfortFile is not None:
+        stageStart = clock()
+        addExportColumns(comfort, data, shared, stepCost)
+        # Create and export comfort data
+        writeTable(comfort, comfortFile, shared['exportFormat'], shared['float32'])
+        say("\nComfort Data Exported to: ", comfortFile)
+        recordSince('comfort export', stageStart, f, len(comfort))
+
+    # Every zone at once ----------------------------------------------------
+    if zones:
+        stageStart = clock()
+        finishZones(res, addZoneRows(None, data.iloc[datastart:dataend], zones, shared), zones, shared, say)
+        recordSince('zones', stageStart, f, len(comfort)*len(zones))
+
+    # Series needed by eppp.py to plot this file, only over the plotted range
+    if shared['graph']:
+        res['indoorTemp'] = indoorTemp.to_numpy()[datastart:dataend]
+        res['heatTemp'] = data['LIVING_UNIT1:Zone Thermostat Heating Setpoint Temperature [C](TimeStep)'].to_numpy()[datastart:dataend]
+        res['coolTemp'] = data['LIVING_UNIT1:Zone Thermostat Cooling Setpoint Temperature [C](TimeStep)'].to_numpy()[datastart:dataend]
+    return res
+
+# Running totals of one file for analyzeFileStream and epwatch.py: [total, heating, cooling] cost and
+# [heating, cooling] energy over the range, sum and count of temp difference and percent comfortable,
+# occupied and comfortable counts, and rows added inside the range
+def newTotals():
+    return {'cost': np.zeros(3), 'energy': np.zeros(2), 'diffSum': 0.0, 'pctSum': 0.0, 'count': 0,
+            'comf90': 0.0, 'comf80': 0.0, 'occupied': 0.0, 'rows': 0}
+
+# Add a chunk of EnergyPlus rows into totals. data must be indexed by row number from the first
+# non-calibration row. Only rows in [datastart, dataend) count, except that legacy prices apply to
+# every row. If shared['outdoorTemp'] is None, the comfort bounds come from the chunk's own outdoor
+# temperature column instead. occupancy is the occupancy status Series holding the rows of data, or
+# None for shared['occupancy'].
+# Returns [win, comfort, stepCost] for the rows in the range, or [None, None, None] if there are none:
+#   win       the rows of data in the range
+#   comfort   comfortTable of win
+#   stepCost  per-step cost array from computeCost, or None for legacy prices
+def addChunk(totals, data, shared, occupancy=None):
+    if occupancy is None: occupancy = shared['occupancy']
+    legacy = 'l' in shared['priceType']
+    if legacy: # Legacy price is applied to every row, not just the range
+        price = shared['legacyPrice']['Price [$/MWh]'].reindex(data.index)
+        totals['cost'][0] += (price*data[FACILITY_COL]*convTokWh).sum()
+    if len(data) == 0: return [None, None, None]
+    # Part of this chunk inside [datastart, dataend)
+    lo, hi = max(shared['datastart'], data.index[0]), min(shared['dataend'], data.index[-1] + 1)
+    if lo >= hi: return [None, None, None]
+    win = data.loc[lo:hi-1]
+    if not legacy:
+        t, h, c, stepCost = computeCost(shared['eprice'][lo:hi], win[FACILITY_COL], win[HEATING_COL],
+                                        win[COOLING_COL], 0, hi-lo, perStep=True)
+        totals['cost'] += [t, h, c]
+    else:
+        stepCost = None
+    totals['energy'] += [win[HEATING_COL].sum()*convTokWh, win[COOLING_COL].sum()*convTokWh]
+
+    if shared['outdoorTemp'] is not None:
+        outdoor = shared['outdoorTemp'].iloc[lo:hi]
+        heat100, cool100 = shared['comfHeat100'].iloc[lo:hi], shared['comfCool100'].iloc[lo:hi]
+    else:
+        outdoor = win[OUTDOOR_COL]
+        heat100, cool100 = adaptiveBounds(outdoor)
+    delta = tempDifference(win[INDOOR_COL], heat100, cool100)
+    totals['diffSum'] += np.nansum(delta)
+    totals['pctSum'] += np.nansum(percentComfortable(delta))
+    totals['count'] += np.count_nonzero(~np.isnan(delta))
+
+    comfort = comfortTable(win[INDOOR_COL], outdoor, occupancy.reindex(win.index))
+    both90, occ = occupiedComfortCounts(comfort['is90'], comfort['occupancy'])
+    both80, occ = occupiedComfortCounts(comfort['is80'], comfort['occupancy'])
+    totals['comf90'] += both90
+    totals['comf80'] += both80
+    totals['occupied'] += occ
+    totals['rows'] += hi - lo
+    return [win, comfort, stepCost]
+
+# Summary metrics from totals, with the same keys as analyzeFile results. Daily averages are over ndays.
+def totalsResult(totals, ndays, legacy=False):
+    res = {}
+    cost = totals['cost']
+    if legacy: res['totalPrice'], res['heatPrice'], res['coolPrice'] = cost[0], 0, 0
+    else: res['totalPrice'], res['heatPrice'], res['coolPrice'] = cost
+    res['avgDailyCost'] = res['totalPrice'] / ndays
+    res['totHeatElec'], res['totCoolElec'] = totals['energy']
+    res['avgDailyEnergy'] = (res['totHeatElec'] + res['totCoolElec']) / ndays
+    count, occupied = totals['count'], totals['occupied']
+    res['meanDiff100'] = totals['diffSum']/count if count else np.nan
+    res['meanComfBand'] = totals['pctSum']/count if count else np.nan
+    res['pctTimeComf90'] = 100*totals['comf90']/occupied if occupied else np.nan
+    res['pctTimeComf80'] = 100*totals['comf80']/occupied if occupied else np.nan
+    return res
+
+# Streaming version of analyzeFile for long, fine-timestep runs. Reads the EnergyPlus output
+# chunkRows rows at a time and adds each chunk into running totals, so memory used for the file
+# does not grow with the run length. The comfort data is exported chunk by chunk. Results are the
+# same as analyzeFile. Only the plotted series (if graph is on) and electricity per timestep (if
+# sweep is on) are kept for the whole run.
+# If shared['occupancy'] is None, occupancy is read in chunks from shared['occupancyFile'] (first
+# shared['occupancyRows'] rows), and if shared['outdoorFile'] is another file than f, its outdoor
+# temperature (after shared['outdoorSkip'] warmup rows) is read in chunks and used in place of f's.
+def analyzeFileStream(f, shared, chunkRows):
+    log = []
+    def say(*args):
+        log.append(' '.join(str(a) for a in args))
+    res = {'file': f, 'found': False, 'log': log}
+
+    dataend = shared['dataend']
+    ndays = shared['lastDay'] - shared['firstDay']
+    legacy = 'l' in shared['priceType']
+    comfortFile = comfortExportFile(f, shared)
+    table = openTable(comfortFile, shared['exportFormat'], shared['float32']) if comfortFile is not None else None
+
+    skiprows = shared['calibration']
+    try:
+        zones, columns = fileColumns(f, shared)
+        if skiprows == 'auto': skiprows = findRunPeriodStart(f, shared['startDate'], chunkRows)
+        chunks = pd.read_csv(f, usecols=lambda c: c in columns, dtype=columnTypes(columns),
+                             skiprows=range(1, skiprows + 1), chunksize=chunkRows)
+    except FileNotFoundError:
+        say("Input file ", f, " does not exist, skipping.")
+        return res
+    res['found'] = True
+    say("-------------------------------------------------\n\nDataset: " + f + "   (streaming, " + str(chunkRows) + " rows per chunk)")
+    # Outdoor temperature of the first file and occupancy, read alongside in the same chunks
+    outdoor, outdoorPart = None, None
+    if shared.get('outdoorFile') and os.path.abspath(shared['outdoorFile']) != os.path.abspath(f):
+        outdoor = outdoorChunks(shared['outdoorFile'], shared['outdoorSkip'], chunkRows)
+    occupancy, occPart = None, None
+    if shared['occupancy'] is None:
+        occupancy = occupancyStatusChunks(shared['occupancyFile'], shared['occupancyRows'], chunkRows)
+
+    totals = newTotals()
+    zoneTotals = None
+    plot = {'indoorTemp': [], 'heatTemp': [], 'coolTemp': []}
+    sweepEnergy = []
+    g0 = 0 # row number of the first row of the chunk
+    stageStart = clock()
+    for data in chunks:
+        recordSince('load', stageStart, f, len(data))
+        g1 = g0 + len(data)
+        data.index = pd.RangeIndex(g0, g1)
+        if outdoor is not None:
+            outdoorPart = chunkWindow(outdoor, outdoorPart, g0, g1)
+            data[OUTDOOR_COL] = outdoorPart.reindex(data.index)
+        if occupancy is not None: occPart = chunkWindow(occupancy, occPart, g0, g1)
+        win, comfort, stepCost = addChunk(totals, data, shared, occPart)
+        if win is not None:
+            if shared['sweep']:
+                sweepEnergy.append(energyMatrix(win[FACILITY_COL], win[HEATING_COL], win[COOLING_COL], 0, len(win)))
+            if table is not None:
+                addExportColumns(comfort, win, shared, stepCost)
+                writeChunk(table, comfort)
+            if shared['graph']:
+                plot['indoorTemp'].append(win[INDOOR_COL].to_numpy())
+                plot['heatTemp'].append(win[HEAT_SETPT_COL].to_numpy())
+                plot['coolTemp'].append(win[COOL_SETPT_COL].to_numpy())
+            if zones: zoneTotals = addZoneRows(zoneTotals, win, zones, shared, occPart)
+        g0 = g1
+        # Nothing more is needed after the range, except for legacy prices
+        if g0 >= dataend and not legacy: break
+        stageStart = clock()
+
+    wrote = table is not None and closeTable(table) is not None
+    # Same check as computeCost on the whole range, which the chunks only see a part of each
+    rangeRows = dataend - shared['datastart']
+    if not legacy and totals['rows'] < rangeRows:
+        raise ValueError("Price data has " + str(rangeRows) + " timesteps in range, but electricity data in " + f
+                         + " has " + str(totals['rows']))
+    res.update(totalsResult(totals, ndays, legacy))
+    say("Total HVAC Electric Bill [$] = ",res['totalPrice'])
+    say("total heating electricity [kWh]:",res['totHeatElec'])
+    say("total cooling electricity [kWh]:",res['totCoolElec'])
+    say("Average Daily HVAC Electricity [kWh] = ", res['avgDailyEnergy'])
+    say("\nMean temperature difference from 100% comfortable temperature:", res['meanDiff100'])
+    say("Mean comfort band percent:", res['meanComfBand'])
+    say('Percent of occupied time indoor temperature is within 90% comfortable:', res['pctTimeComf90'])
+    say('Percent of occupied time indoor temperature is within 80% comfortable:', res['pctTimeComf80'])
+    if wrote: say("\nComfort Data Exported to: ", comfortFile)
+    if zones and zoneTotals is not None: finishZones(res, zoneTotals, zones, shared, say)
+    if shared['sweep']: res['energy'] = np.hstack(sweepEnergy) if sweepEnergy else np.zeros((3, 0))
+    if shared['graph']:
+        for k in plot: res[k] = np.concatenate(plot[k]) if plot[k] else np.array([])
+    return res
+
+# Pool initializer: keep the shared inputs for every task run by this worker process
+def initWorker(shared):
+    global _shared
+    _shared = shared
+
+# Analyze one file, streaming it in chunks if shared['stream'] is a number of rows.
+# Uses the saved result instead if this file was already analyzed with the same inputs and parameters.
+def analyzeOne(f, shared):
+    if shared.get('profile') and not profileOn(): enableProfile()
+    fileStart = clock()
+    key = resultKey(shared['results'], f) if shared.get('results') else None
+    comfortFile = comfortExportFile(f, shared)
+    if key is not None:
+        # Arrays the saved result must include for this run
+        need = []
+        if shared['graph']: need += ['indoorTemp', 'heatTemp', 'coolTemp']
+        if shared['sweep']: need += ['energy']
+        res = loadResult(key, need, comfortFile)
+        if res is not None:
+            res['log'].insert(1, "(Unchanged since an earlier run, using saved results)")
+            # The zone file is small, so it is written again if it was deleted
+            if res.get('zones') and not os.path.exists(zoneFileName(f)): writeZones(zoneFileName(f), res['zones'])
+            recordSince('saved result', fileStart, f)
+            if profileOn(): res['profile'] = takeRecords(f)
+            return res
+    if shared.get('stream'): res = analyzeFileStream(f, shared, shared['stream'])
+    else: res = analyzeFile(f, shared)
+    if key is not None and res['found']: storeResult(key, res, comfortFile)
+    recordSince('file total', fileStart, f, shared['dataend'] - shared['datastart'] if res['found'] else 0)
+    # Taken after storeResult so the records are not saved with the results
+    if profileOn(): res['profile'] = takeRecords(f)
+    return res
+
+# Pool task: analyze one file using this worker's shared inputs
+def _poolTask(f):
+    return analyzeOne(f, _shared)
+
+# Generator of analyzeFile results for each file in files, always in the original file order.
+# jobs > 1 spreads the files over a pool of that many worker processes.
+def analyzeFiles(files, shared, jobs=1):
+    if jobs <= 1 or len(files) <= 1:
+        for f in files:
+            yield analyzeOne(f, shared)
+        return
+    # Workers must not re-run the calling script, so they are forked from it
+    if 'fork' not in mp.get_all_start_methods():
+        print('Warning: Parallel mode needs the fork start method, processing files one at a time instead.')
+        for f in files:
+            yield analyzeOne(f, shared)
+        return
+    jobs = min(jobs, len(files))
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=mp.get_context('fork'),
+                             initializer=initWorker, initargs=(shared,)) as pool:
+        # map returns results in the order of files, regardless of which finishes first
+        for res in pool.map(_poolTask, files):
+            yield res
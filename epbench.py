@@ -0,0 +1,282 @@
+# epbench.py
+# Stage-by-stage benchmarks of the post-processing and weather pipeline on synthetic inputs
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# Generates synthetic inputs for each run length and timestep asked for:
+#   - an EnergyPlus output csv with the columns eppp.py reads (EPPP_COLUMNS) and warmup rows
+#   - occupancy_5min.csv / occupancy_1hr.csv, a WholesaleRealTime_<date_range>.csv price file
+#   - a MesoWest csv for mesohourly.py
+# then times each stage of the pipeline on them, and records the peak memory it allocates:
+#   load       parse the EnergyPlus csv (no sidecar cache)
+#   setpoints  occupancy adaptive setpoints (without the saved copy)
+#   cost       read the price file and compute the bill
+#   comfort    temperature difference, percent comfortable and the comfort table
+#   export     write the comfort csv
+#   plot       plot indoor temperature and setpoints to a png, decimated as in eppp.py (see epplot.py)
+#   mesowest   average the MesoWest csv into hours
+# Time is the best of repeat runs. Memory is the peak of allocations traced by tracemalloc
+# (numpy and pandas arrays included) in one more run.
+#
+# Results can be saved as a baseline json file and later runs compared against it, stage by stage.
+#
+# Run As:
+#           python3 epbench.py < parameters >
+#   size=week,month,year   Run lengths. Default week,month
+#   ts=1,5,15              Timesteps [minutes]. Default 5
+#   stages=load,cost       Stages to run. Default all
+#   repeat=N               Timed runs per stage. Default 3
+#   dir=folder             Where to write the synthetic inputs. Default epbench_data
+#   save                   Save the results as the baseline
+#   baseline=file.json     Baseline file. Default epbench_baseline.json
+
+import os
+import sys
+import json
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from eploader import loadEPlusCSV, EPPP_COLUMNS, DATETIME_COL, OUTDOOR_COL, INDOOR_COL, HEAT_SETPT_COL, \
+    COOL_SETPT_COL, FACILITY_COL, HEATING_COL, COOLING_COL
+from epcost import readPriceFile, computeCost
+from epcomfort import adaptiveBounds, tempDifference, percentComfortable
+from epanalysis import comfortTable
+from epoccupancy import occupancyStatus, occupancyProbability, occupancySetpoints
+from epplot import overlaySpec, renderFigure
+from mesohourly import hourlyWeather, STATIONS
+
+# Run lengths [days]
+SIZES = {'week': 7, 'month': 31, 'year': 365}
+STAGES = ['load', 'setpoints', 'cost', 'comfort', 'export', 'plot', 'mesowest']
+
+# All synthetic runs start here, so that the date ranges exist in any tariff or price data
+START = np.datetime64('2019-01-01')
+# Warmup days before the run period, in the EnergyPlus csv
+WARMUP_DAYS = 2
+
+# Input generation --------------------------------------------------------
+
+# EnergyPlus Date/Time strings for the timesteps ending at minutes after midnight on day0, eg. ' 01/01  00:05:00'
+def eplusDateTimes(day0, minutes):
+    day = (minutes - 1)//1440
+    clock = minutes - day*1440 # 1 - 1440, so midnight is 24:00:00 of the day before
+    dates = pd.DatetimeIndex(np.datetime64(day0, 'D') + day.astype('timedelta64[D]'))
+    return (' ' + pd.Series(dates.strftime('%m/%d')) + '  ' + pd.Series(clock//60).astype(str).str.zfill(2) + ':' +
+            pd.Series(clock % 60).astype(str).str.zfill(2) + ':00').to_numpy()
+
+# Synthetic EnergyPlus output csv for days at timestep [minutes]. Returns the number of warmup rows.
+def makeEPlusCSV(path, days, timestep, rng):
+    perDay = 1440//timestep
+    warm = WARMUP_DAYS*perDay
+    n = days*perDay
+    # Warmup days are repeated design days in July, then the run period from START
+    steps = np.arange(1, n + 1)*timestep
+    warmSteps = (np.arange(warm) % perDay + 1)*timestep + (np.arange(warm)//perDay)*1440
+    dt = np.concatenate([eplusDateTimes('2019-07-21', warmSteps), eplusDateTimes(START, steps)])
+    t = np.arange(warm + n)*timestep/1440
+    data = pd.DataFrame({
+        DATETIME_COL: dt,
+        OUTDOOR_COL: 15 + 8*np.sin(2*np.pi*t) + rng.normal(0, 1, warm + n),
+        INDOOR_COL: 22 + 2*np.sin(2*np.pi*t + 1) + rng.normal(0, 0.5, warm + n),
+        HEAT_SETPT_COL: 20 + rng.random(warm + n),
+        COOL_SETPT_COL: 25 + rng.random(warm + n),
+        FACILITY_COL: rng.random(warm + n)*3e5*timestep/5,
+        HEATING_COL: rng.random(warm + n)*1e5*timestep/5,
+        COOLING_COL: rng.random(warm + n)*1e5*timestep/5,
+    })
+    data.to_csv(path, index=False)
+    return warm
+
+# Synthetic occupancy status per timestep and hourly occupancy probability
+def makeOccupancy(statusFile, probFile, days, timestep, rng):
+    n = days*1440//timestep
+    hour = (np.arange(n)*timestep//60) % 24
+    status = ((hour < 8) | (hour >= 18) | (rng.random(n) < 0.2)).astype(int)
+    pd.DataFrame({'occupancy': status}).to_csv(statusFile, index=False)
+    hours = pd.date_range(str(START), periods=24*days + 2, freq='h')
+    prob = 0.5 + 0.4*np.cos(2*np.pi*hours.hour.to_numpy()/24) + rng.normal(0, 0.05, len(hours))
+    pd.DataFrame({'Dates/Times': hours, 'Probability': prob.clip(0.01, 0.99)}).to_csv(probFile, index=False)
+
+# Synthetic CAISO real-time price file [$/MWh], one value per 5 minutes with one extra day
+def makePrices(path, days, rng):
+    n = (days + 1)*288
+    price = 30 + 20*np.sin(2*np.pi*np.arange(n)/288) + rng.normal(0, 5, n)
+    np.savetxt(path, price)
+
+# Synthetic MesoWest csv for an NWS station, one observation per timestep
+def makeMesoWest(path, days, timestep, rng):
+    getcols, headers = STATIONS['NWS']
+    n = days*1440//timestep
+    times = pd.DatetimeIndex(START + np.arange(n)*np.timedelta64(timestep, 'm'))
+    width = max(getcols) + 1
+    table = pd.DataFrame(np.zeros((n, width)), columns=range(width))
+    table[0] = 'KSJC'
+    table[1] = times.strftime('%m/%d/%Y %H:%M') + ' PST'
+    for c in getcols:
+        table[c] = np.round(rng.normal(50, 10, n), 1)
+    with open(path, 'w') as out:
+        for r in range(8): out.write('# Synthetic MesoWest header row ' + str(r) + '\n')
+        table.to_csv(out, header=False, index=False)
+
+# Write every input for a run of days at timestep into folder. Returns a dict of paths and parameters.
+def makeInputs(folder, days, timestep, seed=0):
+    rng = np.random.default_rng(seed)
+    os.makedirs(folder, exist_ok=True)
+    end = START + np.timedelta64(days - 1, 'D')
+    inputs = {'days': days, 'timestep': timestep, 'date_range': str(START) + '_' + str(end),
+              'eplus': os.path.join(folder, 'EP_Data.csv'), 'status': os.path.join(folder, 'occupancy_5min.csv'),
+              'prob': os.path.join(folder, 'occupancy_1hr.csv'), 'mesowest': os.path.join(folder, 'MesoWest.csv')}
+    inputs['price'] = os.path.join(folder, 'WholesaleRealTime_' + inputs['date_range'] + '.csv')
+    inputs['calibration'] = makeEPlusCSV(inputs['eplus'], days, timestep, rng)
+    makeOccupancy(inputs['status'], inputs['prob'], days, timestep, rng)
+    makePrices(inputs['price'], days, rng)
+    makeMesoWest(inputs['mesowest'], days, timestep, rng)
+    return inputs
+
+# Stages ------------------------------------------------------------------
+# Each stage takes the inputs dict and a state dict with the output of earlier stages.
+
+def stageLoad(inputs, state):
+    state['data'] = loadEPlusCSV(inputs['eplus'], EPPP_COLUMNS, inputs['calibration'], useCache=False)
+
+def stageSetpoints(inputs, state):
+    outdoor = state['data'][OUTDOOR_COL]
+    state['occupancy'] = occupancyStatus(inputs['status'])
+    state['setpoints'] = occupancySetpoints(outdoor, state['occupancy'],
+                                            occupancyProbability(inputs['prob'], timestep=inputs['timestep']))
+
+def stageCost(inputs, state):
+    data = state['data']
+    # Price file is always 5 minute, hold each value over the timestep
+    price = readPriceFile(inputs['price'], None)
+    price = np.repeat(price, max(1, 5//inputs['timestep']))[::max(1, inputs['timestep']//5)]
+    state['cost'] = computeCost(price, data[FACILITY_COL], data[HEATING_COL], data[COOLING_COL], 0, len(data), perStep=True)
+
+def stageComfort(inputs, state):
+    data = state['data']
+    heat100, cool100 = adaptiveBounds(data[OUTDOOR_COL])
+    delta = tempDifference(data[INDOOR_COL], heat100, cool100)
+    state['pct'] = percentComfortable(delta)
+    state['comfort'] = comfortTable(data[INDOOR_COL], data[OUTDOOR_COL], state['occupancy'].reindex(data.index))
+
+def stageExport(inputs, state):
+    state['comfort'].to_csv(os.path.join(os.path.dirname(inputs['eplus']), 'EP_Data_comfort.csv'), header=True)
+
+def stagePlot(inputs, state):
+    data = state['data']
+    time = np.linspace(0, 24*inputs['days'], len(data))
+    lines = [['Indoor Temperature', data[INDOOR_COL], '-'], ['Heating Setpoint', data[HEAT_SETPT_COL], '--'],
+             ['Cooling Setpoint', data[COOL_SETPT_COL], '-.']]
+    renderFigure(overlaySpec(time, lines, os.path.join(os.path.dirname(inputs['eplus']), 'EP_Data_plot.png'),
+                             size=(10, 5)))
+
+def stageMesoWest(inputs, state):
+    with open(os.devnull, 'w') as quiet:
+        stdout, sys.stdout = sys.stdout, quiet
+        try: state['hourly'] = hourlyWeather(inputs['mesowest'], 'NWS', (2019, 1, 1, 0), 24*inputs['days'], 8, verbosity=0)
+        finally: sys.stdout = stdout
+
+STAGE_FUNCTIONS = {'load': stageLoad, 'setpoints': stageSetpoints, 'cost': stageCost, 'comfort': stageComfort,
+                   'export': stageExport, 'plot': stagePlot, 'mesowest': stageMesoWest}
+
+# Stages that need the output of another stage first
+STAGE_NEEDS = {'setpoints': ['load'], 'cost': ['load'], 'comfort': ['load', 'setpoints'], 'export': ['load', 'setpoints', 'comfort'],
+               'plot': ['load']}
+
+# Timing ------------------------------------------------------------------
+
+# Returns [best time of repeat runs [s], peak traced memory of one more run [MB]]
+def timeStage(fn, inputs, state, repeat=3):
+    best = np.inf
+    for r in range(repeat):
+        start = time.perf_counter()
+        fn(inputs, state)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn(inputs, state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return [best, peak/1e6]
+
+# Runs stages for every size and timestep. Returns {case: {stage: {'seconds', 'peakMB'}}}, case eg. 'week_5min'
+def runBenchmarks(sizes=('week', 'month'), timesteps=(5,), stages=STAGES, repeat=3, folder='epbench_data'):
+    results = {}
+    for size in sizes:
+        for ts in timesteps:
+            case = size + '_' + str(ts) + 'min'
+            print('Generating inputs for ', case, '...')
+            inputs = makeInputs(os.path.join(folder, case), SIZES[size], ts)
+            state = {}
+            done = set()
+            results[case] = {}
+            for stage in stages:
+                # Untimed runs of the stages this one needs that have not run yet, in any order of stages
+                for need in STAGE_NEEDS.get(stage, []):
+                    if need not in done:
+                        STAGE_FUNCTIONS[need](inputs, state)
+                        done.add(need)
+                seconds, peak = timeStage(STAGE_FUNCTIONS[stage], inputs, state, repeat)
+                done.add(stage)
+                results[case][stage] = {'seconds': seconds, 'peakMB': peak}
+                print('  {:<10}{:>10.4f} s{:>10.1f} MB'.format(stage, seconds, peak))
+    return results
+
+# Save results as the baseline, keeping baseline cases that were not run this time
+def saveBaseline(results, path):
+    baseline = readBaseline(path)
+    baseline.update(results)
+    with open(path, 'w') as out:
+        json.dump(baseline, out, indent=1)
+
+def readBaseline(path):
+    try:
+        with open(path) as src:
+            return json.load(src)
+    except (OSError, ValueError):
+        return {}
+
+# Print each stage against the baseline. Ratio > 1 is slower or more memory than the baseline.
+def compareBaseline(results, baseline):
+    print('\n{:<16}{:<10}{:>10}{:>10}{:>8}{:>10}{:>10}{:>8}'.format('Case', 'Stage', 'Time [s]', 'Base', 'Ratio',
+                                                                  'Mem [MB]', 'Base', 'Ratio'))
+    for case, stages in results.items():
+        for stage, r in stages.items():
+            b = baseline.get(case, {}).get(stage)
+            if b is None:
+                print('{:<16}{:<10}{:>10.4f}{:>10}{:>8}{:>10.1f}{:>10}{:>8}'.format(case, stage, r['seconds'], '-', '-',
+                                                                                  r['peakMB'], '-', '-'))
+                continue
+            print('{:<16}{:<10}{:>10.4f}{:>10.4f}{:>8.2f}{:>10.1f}{:>10.1f}{:>8.2f}'.format(case, stage,
+                  r['seconds'], b['seconds'], r['seconds']/b['seconds'] if b['seconds'] else np.nan,
+                  r['peakMB'], b['peakMB'], r['peakMB']/b['peakMB'] if b['peakMB'] else np.nan))
+
+
+if __name__ == '__main__':
+    sizes = ['week', 'month']
+    timesteps = [5]
+    stages = STAGES
+    repeat = 3
+    folder = 'epbench_data'
+    save = False
+    baselineFile = 'epbench_baseline.json'
+    for arg in sys.argv[1:]:
+        if arg.startswith('size='): sizes = [s for s in arg[5:].split(',') if s in SIZES]
+        elif arg.startswith('ts='): timesteps = [int(t) for t in arg[3:].split(',')]
+        elif arg.startswith('stages='): stages = [s for s in arg[7:].split(',') if s in STAGE_FUNCTIONS]
+        elif arg.startswith('repeat='): repeat = int(arg[7:])
+        elif arg.startswith('dir='): folder = arg[4:]
+        elif arg.startswith('baseline='): baselineFile = arg[9:]
+        elif arg == 'save': save = True
+        else: print('Warning: Unrecognized parameter ', arg)
+
+    print('\n================== eppp pipeline benchmarks ==================')
+    results = runBenchmarks(sizes, timesteps, stages, repeat, folder)
+    compareBaseline(results, readBaseline(baselineFile))
+    if save:
+        saveBaseline(results, baselineFile)
+        print('\nBaseline saved to: ' + baselineFile)
+    print('\n=======================================================\n')
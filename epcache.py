@@ -0,0 +1,239 @@
+# epcache.py
+# Columnar sidecar cache for parsed EnergyPlus output CSVs
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# The first time a CSV is parsed, each column is saved as a binary .npy file in a sidecar folder
+# next to it:   run1.csv  ->  run1.eppcache/
+# Later runs memory-map those columns instead of parsing the text again.
+#
+# A sidecar is only used if it still matches its source CSV. It is keyed by the source path, size,
+# modification time and a SHA-1 hash of its contents. The hash is taken over the bytes as they are
+# parsed (readCSVHashed), so making a sidecar costs no second read of the file. If the size and
+# mtime are unchanged the cache is trusted as-is; if only the mtime changed (eg. file copied or
+# touched) the contents are re-hashed and the cache is kept if they are still identical.
+#
+# The warmup/calibration rows are skipped while parsing, so a sidecar holds the rows after them
+# and is only used for the same number of skipped rows (or skiprows='auto' with the same start date).
+#
+# All sidecars are listed in an index file (default ~/.cache/eppp/sidecars.json, or set the
+# environment variable EPPP_CACHE_INDEX). When the total size or number of sidecars passes the
+# limits, the least recently used ones are deleted.
+
+import os
+import io
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Default index of all sidecars and eviction limits
+CACHE_INDEX = os.environ.get('EPPP_CACHE_INDEX', os.path.join(os.path.expanduser('~'), '.cache', 'eppp', 'sidecars.json'))
+CACHE_MAX_BYTES = int(float(os.environ.get('EPPP_CACHE_MAX_BYTES', 4e9))) # 4 GB
+CACHE_MAX_ENTRIES = int(os.environ.get('EPPP_CACHE_MAX_ENTRIES', 200))
+
+# Bump when the sidecar layout changes so old sidecars are rebuilt
+CACHE_FORMAT = 3
+
+# Returns the sidecar folder for a source file: run1.csv -> run1.eppcache
+def sidecarPath(path):
+    root, ext = os.path.splitext(path)
+    return root + '.eppcache'
+
+# SHA-1 hash of a file's contents, read in 1 MB blocks
+def fileHash(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as src:
+        for block in iter(lambda: src.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+# Raw reader over binary file src that hashes every byte read, for readCSVHashed
+class _HashingReader(io.RawIOBase):
+    def __init__(self, src):
+        self.src = src
+        self.sha1 = hashlib.sha1()
+    def readable(self):
+        return True
+    def readinto(self, b):
+        n = self.src.readinto(b)
+        if n: self.sha1.update(memoryview(b)[:n])
+        return n
+
+# Parse CSV path with pandas.read_csv(path, **kwargs), hashing its contents in the same read.
+# Returns [DataFrame, SHA-1 hash as from fileHash]
+def readCSVHashed(path, **kwargs):
+    with open(path, 'rb') as raw:
+        src = _HashingReader(raw)
+        data = pd.read_csv(io.BufferedReader(src, 1 << 20), **kwargs)
+        # Hash anything the parser did not need to read
+        for block in iter(lambda: raw.read(1 << 20), b''):
+            src.sha1.update(block)
+    return [data, src.sha1.hexdigest()]
+
+# Returns the identity of a file as a dict {path, size, mtime}. Hash is only computed when needed.
+def fileKey(path):
+    st = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': st.st_size, 'mtime': st.st_mtime_ns}
+
+# Total size of all files in a folder [bytes]
+def dirSize(path):
+    total = 0
+    for root, dirs, names in os.walk(path):
+        for n in names:
+            try: total += os.path.getsize(os.path.join(root, n))
+            except OSError: pass
+    return total
+
+# Index and eviction ----------------------------------------------------
+# The index is a dict {entry path: {'bytes': size, 'used': last used time}}.
+# Shared by other caches in this repo, each with their own index file.
+
+def readIndex(index):
+    try:
+        with open(index) as src:
+            return json.load(src)
+    except (OSError, ValueError):
+        return {}
+
+# Write index atomically so that parallel eppp workers never see a half written file
+def writeIndex(index, entries):
+    try:
+        os.makedirs(os.path.dirname(index), exist_ok=True)
+        tmp = index + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp, 'w') as out:
+            json.dump(entries, out)
+        os.replace(tmp, index)
+    except OSError as e:
+        print('Warning: Could not update cache index ', index, ': ', e)
+
+# Delete a cache entry (file or folder) from disk
+def removeEntry(path):
+    if os.path.isdir(path): shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        try: os.remove(path)
+        except OSError: pass
+
+# Record that entry was just used, then evict least recently used entries over the limits.
+# nbytes = None keeps the size already recorded.
+def touchEntry(index, entry, nbytes=None, maxBytes=CACHE_MAX_BYTES, maxEntries=CACHE_MAX_ENTRIES):
+    entries = readIndex(index)
+    entry = os.path.abspath(entry)
+    if nbytes is None: nbytes = entries.get(entry, {}).get('bytes', 0)
+    entries[entry] = {'bytes': nbytes, 'used': time.time()}
+    # Forget entries that were deleted by hand
+    entries = {k: v for k, v in entries.items() if os.path.exists(k)}
+    # Oldest first
+    order = sorted(entries, key=lambda k: entries[k]['used'])
+    total = sum(v['bytes'] for v in entries.values())
+    for k in order:
+        if total <= maxBytes and len(entries) <= maxEntries: break
+        if k == entry: continue # Never evict the entry just used
+        removeEntry(k)
+        total -= entries.pop(k)['bytes']
+    writeIndex(index, entries)
+
+# Delete entries from disk and index. entry = None clears the whole cache.
+def invalidate(index, entry=None):
+    entries = readIndex(index)
+    if entry is None: targets = list(entries)
+    else: targets = [os.path.abspath(entry)]
+    for k in targets:
+        removeEntry(k)
+        entries.pop(k, None)
+    writeIndex(index, entries)
+
+# Sidecar read/write ----------------------------------------------------
+
+# Returns the sidecar meta data if the sidecar exists and still matches the source file, else None.
+# side and fmt are the sidecar folder and layout version, for other kinds of sidecars (eg. epw.py).
+def validSidecar(path, side=None, fmt=CACHE_FORMAT):
+    if side is None: side = sidecarPath(path)
+    try:
+        with open(os.path.join(side, 'meta.json')) as src:
+            meta = json.load(src)
+    except (OSError, ValueError):
+        return None
+    key = fileKey(path)
+    if meta.get('format') != fmt or meta['path'] != key['path'] or meta['size'] != key['size']:
+        return None
+    if meta['mtime'] != key['mtime']:
+        # Same size but touched: only keep if contents are identical
+        if fileHash(path) != meta['sha1']: return None
+        meta['mtime'] = key['mtime']
+        try:
+            with open(os.path.join(side, 'meta.json'), 'w') as out:
+                json.dump(meta, out)
+        except OSError: pass
+    return meta
+
+# Load cached columns of path as a DataFrame backed by memory-mapped arrays.
+# skiprows is the number of data rows dropped at the top when the sidecar was made, or 'auto' for
+# a sidecar made with skiprows found from startDate (see storeSidecar).
+# columns = None means all columns of the source. Returns None on a cache miss.
+def loadSidecar(path, columns=None, skiprows=0, index=CACHE_INDEX, startDate=None):
+    meta = validSidecar(path)
+    if meta is None: return None
+    if skiprows == 'auto':
+        if meta.get('auto') != [list(startDate) if startDate is not None else None]: return None
+    elif meta['skiprows'] != skiprows or meta.get('auto') is not None: return None
+    stored = [c['name'] for c in meta['columns']]
+    if columns is None:
+        if not meta['complete']: return None
+        columns = stored
+    elif not set(columns) <= set(stored): return None
+    side = sidecarPath(path)
+    files = {c['name']: c['file'] for c in meta['columns']}
+    try:
+        data = {c: pd.Series(np.load(os.path.join(side, files[c]), mmap_mode='r'), copy=False) for c in columns}
+    except (OSError, ValueError):
+        return None
+    touchEntry(index, side)
+    return pd.DataFrame(data, columns=columns, copy=False)
+
+# Save every column of df as a sidecar of path. complete = True if df holds all columns of the source.
+# skiprows is the number of data rows dropped at the top of df. auto = [startDate] if they were
+# found with skiprows='auto', so the sidecar is used again for that.
+# key is the fileKey of path taken before it was parsed, so that a file changed while it was
+# being parsed does not get a sidecar that looks up to date. sha1 is the hash of the contents that
+# were parsed (see readCSVHashed), or None to hash the file here.
+def storeSidecar(path, df, skiprows=0, complete=True, index=CACHE_INDEX, key=None, auto=None, sha1=None):
+    side = sidecarPath(path)
+    if key is None: key = fileKey(path)
+    if sha1 is None: sha1 = fileHash(path)
+    meta = dict(key, format=CACHE_FORMAT, sha1=sha1, skiprows=skiprows, auto=auto, complete=complete,
+                nrows=len(df), columns=[])
+    tmp = side + '.' + str(os.getpid()) + '.tmp'
+    try:
+        removeEntry(tmp)
+        os.makedirs(tmp)
+        for n, c in enumerate(df.columns):
+            col = df[c].to_numpy()
+            # Strings (eg. Date/Time) are stored as fixed width unicode so they can be memory-mapped
+            if col.dtype == object: col = col.astype(str)
+            name = 'col' + str(n) + '.npy'
+            np.save(os.path.join(tmp, name), col)
+            meta['columns'].append({'name': c, 'file': name, 'dtype': str(col.dtype)})
+        with open(os.path.join(tmp, 'meta.json'), 'w') as out:
+            json.dump(meta, out)
+        removeEntry(side)
+        os.replace(tmp, side)
+    except OSError as e:
+        print('Warning: Could not write cache for ', path, ': ', e)
+        removeEntry(tmp)
+        return
+    touchEntry(index, side, dirSize(side))
+
+# Read a CSV through the sidecar cache. Parses the text and saves a sidecar on a miss.
+def readCSVCached(path, useCache=True, index=CACHE_INDEX):
+    if useCache:
+        data = loadSidecar(path, index=index)
+        if data is not None: return data
+    if not useCache: return pd.read_csv(path)
+    key = fileKey(path)
+    data, sha1 = readCSVHashed(path)
+    storeSidecar(path, data, index=index, key=key, sha1=sha1)
+    return data
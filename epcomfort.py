@@ -0,0 +1,160 @@
+# epcomfort.py
+# Vectorized adaptive thermal comfort kernels for eppp.py and the occupancy setpoint generator
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# Every function works on whole arrays (or Series) at once using NumPy/SciPy ufuncs, instead of
+# calling a Python lambda and scipy once per element through Series.apply.
+#
+# Adaptive comfort: 100% comfortable band is 0.31*outdoor + 16.3 to 0.31*outdoor + 19.3 [°C],
+# clipped to fixed limits. Comfort is assumed normally distributed about the band with
+# sigma = 3.937 °C, so the band for a fraction pb of people is expanded by norm.ppf((1-pb)/2 + 1/2)*sigma.
+#
+# Run as a script to benchmark against the Series.apply implementation:
+#           python3 epcomfort.py [rows]
+
+import numpy as np
+from scipy.special import ndtr, ndtri
+
+# Standard deviation of adaptive comfort [°C]
+SIGMA = 3.937
+
+# Slope of adaptive comfort vs. outdoor temperature
+SLOPE = 0.31
+HEAT_OFFSET_100 = 16.3
+COOL_OFFSET_100 = 19.3
+
+# Max and min for heating and cooling in adaptive setpoint control for 100% of people [°C]
+HEAT_TEMP_MAX_100 = 25.7
+HEAT_TEMP_MIN_100 = 18.4
+COOL_TEMP_MAX_100 = 29.7
+COOL_TEMP_MIN_100 = 22.4
+
+# Adaptive setpoint control for 90% of people [°C]. These use a rounded 0.5 °C comfort range.
+HEAT_OFFSET_90 = 15.8
+COOL_OFFSET_90 = 19.8
+HEAT_TEMP_MAX_90 = 26.2
+HEAT_TEMP_MIN_90 = 18.9
+COOL_TEMP_MAX_90 = 30.2
+COOL_TEMP_MIN_90 = 22.9
+
+# Comfort range expansion [°C] for probability pb that people are comfortable. pb may be an array,
+# eg. the occupancy probability, which gives a wider range when the space is less likely occupied.
+def comfortRange(pb, sigma=SIGMA):
+    return ndtri((1 - np.asarray(pb, dtype=np.float64))/2 + 1/2)*sigma
+
+# Adaptive line 0.31*outdoor + offset, clipped to [lo, hi]. lo, hi and offset may be arrays.
+def adaptiveLine(outdoor, offset, lo, hi):
+    return np.clip(SLOPE*np.asarray(outdoor, dtype=np.float64) + offset, lo, hi)
+
+# Returns [heat, cool] clipped adaptive comfort bounds expanded by comfort range cr [°C].
+# cr may be a scalar or an array with one value per timestep.
+def adaptiveBounds(outdoor, cr=0.0):
+    heat = adaptiveLine(outdoor, HEAT_OFFSET_100 - cr, HEAT_TEMP_MIN_100 - cr, HEAT_TEMP_MAX_100 - cr)
+    cool = adaptiveLine(outdoor, COOL_OFFSET_100 + cr, COOL_TEMP_MIN_100 + cr, COOL_TEMP_MAX_100 + cr)
+    return [heat, cool]
+
+# Returns [heat, cool] adaptive comfort bounds for a fraction pb of people comfortable
+def boundsAt(outdoor, pb):
+    return adaptiveBounds(outdoor, comfortRange(pb))
+
+# Returns [heat, cool] 90% adaptive setpoint bounds, as used by the adaptive setpoint controllers
+def bounds90(outdoor):
+    heat = adaptiveLine(outdoor, HEAT_OFFSET_90, HEAT_TEMP_MIN_90, HEAT_TEMP_MAX_90)
+    cool = adaptiveLine(outdoor, COOL_OFFSET_90, COOL_TEMP_MIN_90, COOL_TEMP_MAX_90)
+    return [heat, cool]
+
+# Temperature difference [°C] from indoor to the 100% comfortable band; 0 inside the band
+def tempDifference(indoor, heat100, cool100):
+    indoor = np.asarray(indoor, dtype=np.float64)
+    # fmax ignores NaN the same way DataFrame.max does
+    return np.maximum(np.fmax(np.asarray(heat100) - indoor, indoor - np.asarray(cool100)), 0)
+
+# Percent of people comfortable [%] at temperature difference delta from the 100% band
+def percentComfortable(delta, sigma=SIGMA):
+    return 100*(2 - 2*ndtr(np.asarray(delta, dtype=np.float64)/sigma))
+
+# 1.0 where lo < indoor < hi, else 0.0
+def isComfortable(indoor, lo, hi):
+    indoor = np.asarray(indoor, dtype=np.float64)
+    return ((indoor > lo) & (indoor < hi)).astype(np.float64)
+
+# 1.0 where occupied (occupancy == 1), else 0.0
+def isOccupied(occupancy):
+    return (np.asarray(occupancy) == 1).astype(np.float64)
+
+# Returns [comfortable and occupied timesteps, occupied timesteps]. comf and occupancy are arrays
+# of 1 or 0; missing (NaN) values are ignored. Sums can be added up over chunks of data.
+def occupiedComfortCounts(comf, occupancy):
+    occupancy = np.asarray(occupancy, dtype=np.float64)
+    return [np.nansum(np.asarray(comf)*occupancy), np.nansum(occupancy)]
+
+# Percent of occupied time that is comfortable [%]. comf and occupancy are arrays of 1 or 0.
+def pctOccupiedComfortable(comf, occupancy):
+    both, occupied = occupiedComfortCounts(comf, occupancy)
+    return 100*both/occupied
+
+
+# Benchmark ---------------------------------------------------------------
+# Compare against the Series.apply implementation previously used in eppp.py
+
+# Old per-element implementation, kept only for the benchmark
+def _legacyComfort(outdoorTemp, indoorTemp, occupancy, occ_prob):
+    import pandas as pd
+    from scipy.stats import norm
+    heat100 = outdoorTemp.apply(lambda x: 0.31*x + 16.3)
+    cool100 = outdoorTemp.apply(lambda x: 0.31*x + 19.3)
+    cool100.loc[(cool100 < COOL_TEMP_MIN_100)] = COOL_TEMP_MIN_100
+    cool100.loc[(cool100 > COOL_TEMP_MAX_100)] = COOL_TEMP_MAX_100
+    heat100.loc[(heat100 < HEAT_TEMP_MIN_100)] = HEAT_TEMP_MIN_100
+    heat100.loc[(heat100 > HEAT_TEMP_MAX_100)] = HEAT_TEMP_MAX_100
+    delta = pd.DataFrame({'heating': heat100 - indoorTemp, 'cooling': indoorTemp - cool100})
+    delta.loc[delta['heating'] < 0, 'heating'] = 0
+    delta.loc[delta['cooling'] < 0, 'cooling'] = 0
+    delta['maximum'] = delta[['heating', 'cooling']].max(axis=1)
+    pct = delta['maximum'].apply(lambda x: 100*(2 - 2*norm.cdf(x/3.937)))
+    cr = norm.ppf(((1-0.80)/2)+1/2)*SIGMA
+    lo80 = outdoorTemp.apply(lambda x: x*0.31 + 16.3 - cr).clip(HEAT_TEMP_MIN_100-cr, HEAT_TEMP_MAX_100-cr)
+    hi80 = outdoorTemp.apply(lambda x: x*0.31 + 19.3 + cr).clip(COOL_TEMP_MIN_100+cr, COOL_TEMP_MAX_100+cr)
+    is80 = ((indoorTemp > lo80) & (indoorTemp < hi80)).astype(float)
+    pct80 = 100*(is80*occupancy).sum()/occupancy.sum()
+    op = occ_prob.apply(lambda x: (1-x)/2)+1/2
+    op = op.apply(lambda y: norm.ppf(y)*SIGMA)
+    return [delta['maximum'].to_numpy(), pct.to_numpy(), pct80, op.to_numpy()]
+
+# Same outputs as _legacyComfort using the kernels above
+def _vectorComfort(outdoorTemp, indoorTemp, occupancy, occ_prob):
+    heat100, cool100 = adaptiveBounds(outdoorTemp)
+    delta = tempDifference(indoorTemp, heat100, cool100)
+    pct = percentComfortable(delta)
+    lo80, hi80 = boundsAt(outdoorTemp, 0.80)
+    pct80 = pctOccupiedComfortable(isComfortable(indoorTemp, lo80, hi80), occupancy)
+    op = comfortRange(occ_prob)
+    return [delta, pct, pct80, op]
+
+if __name__ == '__main__':
+    import sys
+    import time
+    import pandas as pd
+    # Default: one year at 5 minute timesteps
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 365*288
+    rng = np.random.default_rng(0)
+    t = np.arange(n)
+    outdoorTemp = pd.Series(15 + 12*np.sin(2*np.pi*t/288) + rng.normal(0, 2, n))
+    indoorTemp = pd.Series(23 + 3*np.sin(2*np.pi*t/288 + 1) + rng.normal(0, 1, n))
+    occupancy = pd.Series((rng.random(n) > 0.4).astype(int))
+    occ_prob = pd.Series(rng.random(n))
+
+    print('\n============ epcomfort.py benchmark: ', n, ' rows ============')
+    results = []
+    for name, fn in [('Series.apply', _legacyComfort), ('ufunc kernels', _vectorComfort)]:
+        start = time.perf_counter()
+        out = fn(outdoorTemp, indoorTemp, occupancy, occ_prob)
+        elapsed = time.perf_counter() - start
+        results.append([elapsed, out])
+        print('{:<16}{:>10.4f} s'.format(name, elapsed))
+    old, new = results[0][1], results[1][1]
+    err = max(np.max(np.abs(old[0] - new[0])), np.max(np.abs(old[1] - new[1])),
+              abs(old[2] - new[2]), np.max(np.abs(old[3] - new[3])))
+    print('Speedup: {:.1f}x    Max abs difference: {:.3g}'.format(results[0][0]/results[1][0], err))
@@ -0,0 +1,200 @@
+# epcost.py
+# Vectorized electricity cost engine for EnergyPlus post-processing (eppp.py)
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.2
+# Last Updated: 2026-10-17
+#
+# Computes the total, heating and cooling electricity bill as whole-array dot products of the
+# electricity price [$/kWh] with the EnergyPlus electricity columns [J], instead of looping
+# over every timestep with .iloc lookups.
+#
+# Tariff sweep: evaluate many price scenarios at once. A tariff grid file lists one scenario per
+# row with columns
+#       name,price,multiplier,offset
+# where price is a price= code from eppp.py (r, d, E-1, E-TOU-C, E-TOU-C_S, E-TOU-C_W, E-TD-Z). Multiplier
+# and offset only apply to CAISO wholesale prices (r, d). Several values separated by ';' in the
+# multiplier or offset column expand to every combination, eg.
+#       caiso_rt,r,4;8;12,0.015;0.1
+# gives 6 tariffs. All tariffs are stacked into one price matrix and the cost of every
+# (file, tariff) pair is found with a single matrix product.
+#
+# PG&E rates are read from their 5 minute price file, or, if tariff rules are given (see eptariff.py)
+# and have the rate, expanded from the rules for the date range and timestep. CAISO prices are taken from the price store
+# (epprices.py), which the price file is added to the first time it is read.
+
+import os
+import csv
+import itertools
+import numpy as np
+from eptariff import tariffRules, tariffStart, expandTariff
+from epprices import MARKETS, PRICE_TIMESTEP, priceWindow, ingestWindowFile, ingestedRows
+
+# Constant for energy: Joules -> kWh
+convTokWh = 2.77778e-7
+
+# Stack the three electricity columns [J] for timesteps [start, end) into one (3 x n) matrix in kWh
+def energyMatrix(facility, heating, cooling, start, end):
+    return np.vstack([np.asarray(facility, dtype=np.float64)[start:end],
+                      np.asarray(heating, dtype=np.float64)[start:end],
+                      np.asarray(cooling, dtype=np.float64)[start:end]]) * convTokWh
+
+# Returns cost [$] of the timestep window [start, end) as [totalPrice, heatPrice, coolPrice]
+#   eprice      electricity price for each timestep [$/kWh], indexed from the first data row
+#   facility, heating, cooling   EnergyPlus electricity per timestep [J] (Series or arrays)
+#   perStep     if True, also return a (3 x end-start) array of per-timestep cost [$] in the
+#               same pass. Rows are facility, heating, cooling.
+def computeCost(eprice, facility, heating, cooling, start, end, perStep=False):
+    price = np.asarray(eprice, dtype=np.float64)[start:end]
+    energy = energyMatrix(facility, heating, cooling, start, end)
+    if len(price) != energy.shape[1]:
+        raise ValueError("Price data has " + str(len(price)) + " timesteps in range, but electricity data has "
+                         + str(energy.shape[1]))
+    if perStep:
+        steps = energy * price
+        totals = steps.sum(axis=1)
+        return [totals[0], totals[1], totals[2], steps]
+    totals = energy @ price
+    return [totals[0], totals[1], totals[2]]
+
+# Price files ------------------------------------------------------------
+
+# Converts a price= code to the priceType used by eppp.py, or None if not recognized
+def priceCode(code):
+    code = code.strip()
+    for key, pt in [('E-1', 'E-1'), ('E-TOU-C_S', 'E-TOU-C_Summer'), ('E-TOU-C_W', 'E-TOU-C_Winter'), ('E-TOU-C', 'E-TOU-C'),
+                    ('E-TD-Z', 'E-TD-Z')]:
+        if key in code: return pt
+    if code.lower() in ['d', 'dayahead', 'day-ahead']: return 'd'
+    if code.lower() in ['r', 'realtime', 'real-time']: return 'r'
+    return None
+
+# Returns the price file name for a priceType and date_range
+def priceFile(priceType, date_range):
+    # Matches existing PG&E Rates
+    if 'E' in priceType:
+        if 'E-1' in priceType: return 'E-1_5min.csv'
+        elif 'E-TOU-C_Summer' in priceType: return 'E-TOU-C_5min_Summer.csv'
+        elif 'E-TOU-C_Winter' in priceType: return 'E-TOU-C_5min_Winter.csv'
+        elif 'E-TD-Z' in priceType: return 'E-TD-Z_5min.csv'
+        else: return 'Zero.csv' #error
+    # Using Demand-based CAISO pricing
+    if 'd' in priceType.lower(): return "WholesaleDayAhead_" + date_range + ".csv"
+    elif 'r' in priceType.lower(): return "WholesaleRealTime_" + date_range + ".csv"
+    return 'Zero.csv'
+
+# Reads the first nrows values of a single column price file
+def readPriceFile(pfile, nrows):
+    return np.genfromtxt(pfile, skip_header=0, max_rows=nrows, delimiter=',', usecols=0)
+
+# Returns CAISO prices [$/MWh] for the first nrows timesteps of timestep [minutes] from the price store,
+# or None to read the price file instead. The price file holds one price per run timestep and is
+# ingested first if it is new or has changed. Only prices ingested from this price file are used, so
+# they are the same as reading it: None if it does not exist, is shorter than nrows, could not be
+# ingested (eg. it differs from prices already stored from another file, see epprices.py) or the
+# timestep is finer than the store.
+def storedPrice(priceType, date_range, nrows, timestep=5):
+    start = tariffStart(date_range)
+    if priceType not in MARKETS or start is None or timestep % PRICE_TIMESTEP != 0: return None
+    pfile = priceFile(priceType, date_range)
+    if not os.path.exists(pfile): return None
+    market = MARKETS[priceType]
+    day = '{:04d}-{:02d}-{:02d}'.format(*start)
+    try:
+        rows = ingestedRows(pfile, market, timestep)
+        if rows is None: rows = ingestWindowFile(pfile, market, day, timestep)
+        # Past the end of the file the store may hold another file's prices
+        if nrows > rows: return None
+        return priceWindow(market, day, nrows, timestep)
+    except (OSError, ValueError) as e:
+        print('Warning: Could not use the price store, reading ', pfile, ': ', e)
+        return None
+
+# Returns the price for the first nrows timesteps of timestep [minutes]: expanded from tariffs
+# (rules from eptariff.loadTariffRules, or None) if they have rules for priceType and date_range
+# has a date, from the price store for CAISO prices, else read from the price file
+def rawPrice(priceType, date_range, nrows, timestep=5, tariffs=None):
+    start = tariffStart(date_range)
+    if tariffRules(priceType, tariffs) is not None:
+        if start is not None: return expandTariff(priceType, start, nrows, timestep, tariffs)
+        print('Warning: Tariff rules need a dated date range, reading the price file for ', priceType, ' instead.')
+    if priceType == 'E-TOU-C':
+        # Season by date only exists as rules, the price files each hold one season
+        raise ValueError("price=E-TOU-C needs tariff rules (rules or rules=file.json); "
+                         + "use price=E-TOU-C_S or E-TOU-C_W for the price files")
+    prices = storedPrice(priceType, date_range, nrows, timestep)
+    if prices is not None: return prices
+    return readPriceFile(priceFile(priceType, date_range), nrows)
+
+# Returns electricity price [$/kWh] for each timestep, for every priceType except legacy
+#   PG&E rates are used directly, no extra multiplier or offset
+#   CAISO wholesale price [$/MWh] is converted as wholesale*pmultiplier/1000 + poffset
+#   tariffs  tariff rules for PG&E rates (see eptariff.loadTariffRules), or None to read the price files
+def loadPrice(priceType, date_range, pmultiplier, poffset, nrows, timestep=5, tariffs=None):
+    raw = rawPrice(priceType, date_range, nrows, timestep, tariffs)
+    if 'E' in priceType: return raw
+    return raw*pmultiplier/1000 + poffset
+
+# Tariff sweep -----------------------------------------------------------
+
+# Reads a tariff grid file (see top of file). Returns a list of dicts {name, priceType, multiplier, offset}.
+# defaults = [multiplier, offset] used when those columns are blank.
+def readTariffGrid(path, defaults=(8, 0.015)):
+    tariffs = []
+    with open(path, newline='') as src:
+        for row in csv.DictReader(src):
+            row = {k.strip().lower(): (v or '').strip() for k, v in row.items() if k is not None}
+            priceType = priceCode(row.get('price', ''))
+            if priceType is None:
+                print('Warning: Unrecognized price type ', row.get('price', ''), ' in tariff grid, skipping.')
+                continue
+            mults = [float(x) for x in row.get('multiplier', '').split(';') if x.strip()] or [defaults[0]]
+            offs = [float(x) for x in row.get('offset', '').split(';') if x.strip()] or [defaults[1]]
+            # Multiplier and offset do nothing for PG&E rates
+            if 'E' in priceType: mults, offs = [1.0], [0.0]
+            for m, o in itertools.product(mults, offs):
+                name = row.get('name') or row.get('price')
+                if len(mults) > 1 or len(offs) > 1: name = name + '_x' + str(m) + '_+' + str(o)
+                tariffs.append({'name': name, 'priceType': priceType, 'multiplier': m, 'offset': o})
+    return tariffs
+
+# Returns the (tariffs x end-start) price matrix [$/kWh] for timesteps [start, end).
+# Each price file is read (or tariff expanded) only once, however many tariffs use it.
+# rules are the tariff rules for PG&E rates, as in loadPrice.
+def priceMatrix(tariffs, date_range, start, end, timestep=5, rules=None):
+    raw = {}
+    P = np.empty((len(tariffs), end - start))
+    for k, t in enumerate(tariffs):
+        pt = t['priceType']
+        if pt not in raw: raw[pt] = rawPrice(pt, date_range, end + 1, timestep, rules)
+        r = raw[pt][start:end]
+        if len(r) != end - start:
+            raise ValueError("Price for " + pt + " has " + str(len(r)) + " timesteps in range, expected " + str(end - start))
+        P[k] = r if 'E' in t['priceType'] else r*t['multiplier']/1000 + t['offset']
+    return P
+
+# Cost of every (file, tariff) pair with one matrix product.
+#   P        (tariffs x n) price matrix from priceMatrix
+#   energies list of (3 x n) energyMatrix per file, rows facility, heating, cooling [kWh]
+#   files    names of the files, for the error if one has the wrong number of timesteps
+# Returns a (files x tariffs x 3) array of [total, heating, cooling] cost [$]
+def sweepCost(P, energies, files=None):
+    if files is None: files = ['file ' + str(i) for i in range(len(energies))]
+    for f, e in zip(files, energies):
+        if np.shape(e) != (3, P.shape[1]):
+            raise ValueError("Electricity data of " + str(f) + " has shape " + str(np.shape(e)) + " for the tariff sweep, "
+                             + "expected (3, " + str(P.shape[1]) + ") timesteps in range")
+    E = np.stack(energies)           # files x 3 x n
+    nf = E.shape[0]
+    cost = P @ E.reshape(nf*3, -1).T # tariffs x (files*3)
+    return cost.reshape(P.shape[0], nf, 3).transpose(1, 0, 2)
+
+# Writes the sweep result as a tidy table, one row per (file, tariff) pair
+def writeSweep(outFile, files, tariffs, cost, ndays):
+    with open(outFile, 'w', newline='') as out:
+        writer = csv.writer(out)
+        writer.writerow(['File', 'Tariff', 'Price Type', 'Multiplier', 'Offset', 'Total HVAC Electricity Bill [$]',
+                         'Total Heating Energy Cost [$]', 'Total Cooling Energy Cost [$]', 'Avg Daily Electricity Cost [$/day]'])
+        for i, f in enumerate(files):
+            for k, t in enumerate(tariffs):
+                total, heat, cool = cost[i, k]
+                writer.writerow([f, t['name'], t['priceType'], t['multiplier'], t['offset'], total, heat, cool, total/ndays])
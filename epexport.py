@@ -0,0 +1,131 @@
+# epexport.py
+# Comfort and occupancy setpoint tables in binary column formats for eppp.py (format=, float32, dataset=)
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# The comfort export of a year-long 1 minute run is over half a million rows of about 20 columns,
+# which as csv is large, slow to write and slow to parse again for later analysis. Tables can
+# instead be written as:
+#   csv      text, as before. The default
+#   parquet  compressed (zstd) column file, read with pandas.read_parquet. Needs pyarrow
+#   feather  Arrow IPC file (zstd), the fastest to read back, read with pandas.read_feather. Needs pyarrow
+#   hdf5     PyTables table (blosc), read with pandas.read_hdf(path, 'data'). Needs tables
+# If the library for a format is not installed, a warning is printed and csv is written instead.
+#
+# With float32, 64 bit float columns are stored as 32 bit, which halves their size. That is about 7
+# significant digits, plenty for temperatures, energy and prices, but sums over a run read back from
+# the file may differ in the last digits from the eppp.py summary, which always uses 64 bit.
+#
+# Tables are written through a writer (openTable, writeChunk, closeTable), so eppp.py stream mode can
+# write one file chunk by chunk in every format; writeTable() writes a whole DataFrame at once.
+#
+# Dataset: with dataset=dir, each input file's comfort table goes to dir/run=[file name]/comfort.[ext]
+# instead of next to the input file. This is the hive partition layout, so every run can be read back
+# as one table with a 'run' column, eg. pandas.read_parquet(dir), and one run with a filter on 'run'
+# without reading the others. Writing a run again replaces its file. Use one dataset folder per
+# format.
+
+import os
+import importlib.util
+import numpy as np
+
+# File extension of each export format
+EXPORT_FORMATS = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather', 'hdf5': '.h5'}
+
+# Library each binary format needs
+FORMAT_MODULES = {'parquet': 'pyarrow', 'feather': 'pyarrow', 'hdf5': 'tables'}
+
+# Compression of the binary formats
+ARROW_COMPRESSION = 'zstd'
+HDF_COMPLIB = 'blosc'
+HDF_COMPLEVEL = 5
+
+# Key of the table in hdf5 files
+HDF_KEY = 'data'
+
+# Returns the export format to use for format name fmt: fmt if it is known and its library is
+# installed, else 'csv' with a warning
+def exportFormat(fmt):
+    fmt = str(fmt).lower()
+    if fmt in ['h5', 'hdf']: fmt = 'hdf5'
+    if fmt not in EXPORT_FORMATS:
+        print('Warning: unknown export format ', fmt, ', using csv instead.')
+        return 'csv'
+    if fmt in FORMAT_MODULES and importlib.util.find_spec(FORMAT_MODULES[fmt]) is None:
+        print('Warning: ', fmt, ' export needs the ', FORMAT_MODULES[fmt], ' library, using csv instead.')
+        return 'csv'
+    return fmt
+
+# path with its .csv extension (if any) replaced by the extension of format fmt
+def exportPath(path, fmt):
+    root, ext = os.path.splitext(path)
+    if ext != '.csv': root = path
+    return root + EXPORT_FORMATS[fmt]
+
+# Run name of input file f in a dataset: the file name without folder and extension
+def runName(f):
+    return os.path.splitext(os.path.basename(f))[0]
+
+# File of the table of input file f in dataset folder dataset, for format fmt
+def datasetPath(dataset, f, fmt, table='comfort'):
+    return os.path.join(dataset, 'run=' + runName(f), table + EXPORT_FORMATS[fmt])
+
+# Copy of DataFrame df with 64 bit float columns as 32 bit
+def downcast(df):
+    cols = {c: np.float32 for c in df.columns if df[c].dtype == np.float64}
+    return df.astype(cols) if cols else df
+
+# Writer for a table file at path. Nothing is written until the first writeChunk.
+def openTable(path, fmt='csv', float32=False):
+    return {'path': path, 'format': fmt, 'float32': float32, 'rows': 0, 'started': False, 'writer': None, 'schema': None}
+
+# Create the folder of a new table file, and remove any earlier file there
+def _startFile(path):
+    folder = os.path.dirname(path)
+    if folder: os.makedirs(folder, exist_ok=True)
+    if os.path.exists(path): os.remove(path)
+
+# Append DataFrame df (with the same columns as earlier chunks) to the table of writer table
+def writeChunk(table, df):
+    fmt = table['format']
+    path = table['path']
+    first = not table['started']
+    if first: _startFile(path)
+    table['started'] = True
+    if table['float32']: df = downcast(df)
+    if fmt == 'csv':
+        df.to_csv(path, header=first, mode='w' if first else 'a')
+    elif fmt == 'hdf5':
+        df.to_hdf(path, key=HDF_KEY, mode='a', format='table', append=not first,
+                  complib=HDF_COMPLIB, complevel=HDF_COMPLEVEL)
+    else:
+        import pyarrow as pa
+        t = pa.Table.from_pandas(df, preserve_index=True)
+        if first:
+            table['schema'] = t.schema
+            if fmt == 'parquet':
+                import pyarrow.parquet as pq
+                table['writer'] = pq.ParquetWriter(path, t.schema, compression=ARROW_COMPRESSION)
+            else:
+                table['writer'] = pa.ipc.new_file(path, t.schema,
+                                                  options=pa.ipc.IpcWriteOptions(compression=ARROW_COMPRESSION))
+        else:
+            # A chunk can infer a different type for a column, eg. int where all values are whole
+            t = t.cast(table['schema'])
+        table['writer'].write_table(t)
+    table['rows'] += len(df)
+
+# Finish the table of writer table. Returns its file name, or None if nothing was written.
+def closeTable(table):
+    if table['writer'] is not None:
+        table['writer'].close()
+        table['writer'] = None
+    return table['path'] if table['started'] else None
+
+# Write DataFrame df to path in format fmt. Returns path.
+def writeTable(df, path, fmt='csv', float32=False):
+    table = openTable(path, fmt, float32)
+    writeChunk(table, df)
+    closeTable(table)
+    return path
@@ -0,0 +1,191 @@
+# eploader.py
+# Selective-column, typed, warmup-aware loader for EnergyPlus output CSVs
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# EnergyPlus output files can have hundreds of output variables, but eppp.py only needs a few of
+# them. loadEPlusCSV() parses only the requested columns, with explicit dtypes instead of type
+# inference, and skips the warmup/sizing ("calibration") rows while parsing instead of after.
+# findRunPeriodStart() finds how many of those rows there are from the Date/Time column, so the
+# number does not have to be known in advance (calibration=auto in eppp.py).
+
+import re
+import numpy as np
+import pandas as pd
+from epcache import loadSidecar, storeSidecar, readCSVHashed, fileKey, CACHE_INDEX
+
+# Columns used by eppp.py
+DATETIME_COL = 'Date/Time'
+OUTDOOR_COL = 'Environment:Site Outdoor Air Drybulb Temperature [C](TimeStep)'
+INDOOR_COL = 'LIVING_UNIT1:Zone Air Temperature [C](TimeStep)'
+HEAT_SETPT_COL = 'LIVING_UNIT1:Zone Thermostat Heating Setpoint Temperature [C](TimeStep)'
+COOL_SETPT_COL = 'LIVING_UNIT1:Zone Thermostat Cooling Setpoint Temperature [C](TimeStep)'
+FACILITY_COL = 'Electricity:Facility [J](TimeStep)'
+HEATING_COL = 'Heating:Electricity [J](TimeStep)'
+COOLING_COL = 'Cooling:Electricity [J](TimeStep)'
+EPPP_COLUMNS = [DATETIME_COL, OUTDOOR_COL, INDOOR_COL, HEAT_SETPT_COL, COOL_SETPT_COL, FACILITY_COL, HEATING_COL, COOLING_COL]
+
+# Zone columns, with the zone name in place of {}
+ZONE_TEMP_COL = '{}:Zone Air Temperature [C](TimeStep)'
+ZONE_HEAT_SETPT_COL = '{}:Zone Thermostat Heating Setpoint Temperature [C](TimeStep)'
+ZONE_COOL_SETPT_COL = '{}:Zone Thermostat Cooling Setpoint Temperature [C](TimeStep)'
+ZONE_PATTERN = r'^(.+):Zone Air Temperature \[C\]\(TimeStep\)$'
+
+# Cumulative days before each month, using a leap year so that Feb 29 has its own day
+CUMDAYS = np.array([0,31,60,91,121,152,182,213,244,274,305,335])
+
+# EnergyPlus Date/Time, eg. ' 08/01  00:05:00'
+DATETIME_PATTERN = r'(\d{1,2})/(\d{1,2})\s+(\d{1,2}):(\d{2})'
+
+# Returns the start of a date_range string as [month, day], eg '2020-08-01_2020-08-31' -> [8, 1]
+# Returns None for legacy date ranges (eg. 'Jan1thru7') that do not contain a date
+def dateRangeStart(date_range):
+    m = re.match(r'(\d{4})-(\d{2})-(\d{2})', date_range)
+    if m is None: return None
+    return [int(m.group(2)), int(m.group(3))]
+
+# Converts an array of EnergyPlus Date/Time strings to [month, day, minutes since start of year]
+def decodeEPlusTimes(datetimes):
+    parts = pd.Series(datetimes).astype(str).str.extract(DATETIME_PATTERN).astype(float).to_numpy()
+    month = parts[:,0]
+    day = parts[:,1]
+    minutes = (CUMDAYS[np.nan_to_num(month, nan=1).astype(int) - 1] + day - 1)*1440 + parts[:,2]*60 + parts[:,3]
+    return [month, day, minutes]
+
+# Longest allowed gap between rows of one period [minutes]: a day (for a missing Feb 29) plus an hour,
+# the longest EnergyPlus timestep.
+MAX_GAP = 1440 + 60
+
+# Returns [row, month, day] arrays of rows that start a new period in decoded Date/Time arrays, not
+# counting row 0. A period starts where time goes backwards or jumps by more than MAX_GAP, except
+# over the end of the year: 12/31 24:00 -> 01/01 00:xx
+def periodStarts(month, day, minutes):
+    diff = np.diff(minutes)
+    yearWrap = (month[:-1] == 12) & (month[1:] == 1) & (day[1:] == 1)
+    breaks = ((diff <= 0) | (diff > MAX_GAP)) & ~yearWrap
+    rows = np.nonzero(breaks)[0] + 1
+    return [rows, month[rows], day[rows]]
+
+# Returns the number of rows before the run period starts, ie. the number of warmup/sizing rows.
+# EnergyPlus writes each sizing period, then the run period. The timestamps restart or jump at
+# the start of each period, so the run period begins at the last break in the Date/Time column.
+#   datetimes   Date/Time column, or a file path to read it from
+#   startDate   optional [month, day] of the first day of the run period. If given, uses the last
+#               break that starts on that date, in case the run period itself has breaks.
+#   chunkRows   when reading from a file, scan it this many rows at a time to bound memory
+def findRunPeriodStart(datetimes, startDate=None, chunkRows=None):
+    if isinstance(datetimes, str):
+        reader = pd.read_csv(datetimes, usecols=[DATETIME_COL], dtype={DATETIME_COL: str}, chunksize=chunkRows)
+        chunks = (c[DATETIME_COL] for c in reader) if chunkRows else [reader[DATETIME_COL]]
+    else:
+        chunks = [datetimes]
+    rows, months, days = [], [], []
+    prev = None  # Last decoded row of the previous chunk, to find a break on the chunk boundary
+    offset = 0   # Row number of the first row of the current chunk
+    for chunk in chunks:
+        month, day, minutes = decodeEPlusTimes(chunk)
+        if len(minutes) == 0: continue
+        if prev is None:
+            # First row always starts a period
+            rows.append([0])
+            months.append(month[:1])
+            days.append(day[:1])
+            first = offset
+        else:
+            month, day, minutes = [np.concatenate([[p], a]) for p, a in zip(prev, [month, day, minutes])]
+            first = offset - 1
+        r, m, d = periodStarts(month, day, minutes)
+        rows.append(r + first)
+        months.append(m)
+        days.append(d)
+        offset = first + len(minutes)
+        prev = [month[-1], day[-1], minutes[-1]]
+    if prev is None: return 0
+    rows, months, days = np.concatenate(rows), np.concatenate(months), np.concatenate(days)
+    if startDate is not None:
+        onDate = rows[(months == startDate[0]) & (days == startDate[1])]
+        if len(onDate) > 0: return int(onDate[-1])
+        print('Warning: No period in the data starts on ', startDate[0], '/', startDate[1], ', using the last period instead.')
+    return int(rows[-1])
+
+# Outdoor temperature column of EnergyPlus output path, chunkRows rows at a time after the skiprows
+# warmup rows, as Series indexed by row number from the first row kept (see chunkWindow)
+def outdoorChunks(path, skiprows=0, chunkRows=50000):
+    reader = pd.read_csv(path, usecols=[OUTDOOR_COL], dtype={OUTDOOR_COL: np.float64}, skiprows=range(1, skiprows + 1),
+                         chunksize=chunkRows)
+    return (c[OUTDOOR_COL] for c in reader)
+
+# Rows [lo, hi) of a column read in chunks: chunks is an iterator of Series indexed by row number, in
+# order, read on only as far as needed. part is what the call for the previous rows returned, or None.
+# Returns a Series holding at least the rows [lo, hi) that the column has.
+def chunkWindow(chunks, part, lo, hi):
+    if part is not None: part = part[part.index >= lo]
+    while part is None or len(part) == 0 or part.index[-1] < hi - 1:
+        more = next(chunks, None)
+        if more is None: break
+        part = more if part is None or len(part) == 0 else pd.concat([part, more])
+    return part if part is not None else pd.Series(dtype=np.float64)
+
+# Zones with a Zone Air Temperature column in the header of EnergyPlus output file path, in column order.
+# names = 'all' for every zone, or a list of zone names to keep (in that order).
+# Returns [zones, the columns of zoneColumns(zones) that are in the file]
+def findZones(path, names='all'):
+    header = pd.read_csv(path, nrows=0).columns
+    found = []
+    for c in header:
+        m = re.match(ZONE_PATTERN, c)
+        if m is not None: found.append(m.group(1))
+    if names != 'all':
+        missing = [z for z in names if z not in found]
+        if missing: print('Warning: Zones not found in ', path, ': ', missing)
+        found = [z for z in names if z in found]
+    present = set(header)
+    return [found, [c for c in zoneColumns(found) if c in present]]
+
+# Air temperature, heating and cooling setpoint columns of each zone
+def zoneColumns(zones):
+    return [col.format(z) for z in zones for col in [ZONE_TEMP_COL, ZONE_HEAT_SETPT_COL, ZONE_COOL_SETPT_COL]]
+
+# Returns the dtype to parse each column as. Date/Time is a string, everything else is floatType.
+def columnTypes(columns, floatType=np.float64):
+    return {c: (str if c == DATETIME_COL else floatType) for c in columns}
+
+# Load an EnergyPlus output CSV. Returns a DataFrame indexed from 0 at the first row kept.
+#   columns     list of column names to load, or None for all. Default: the columns eppp.py uses
+#   skiprows    number of warmup/calibration data rows to drop at the top (header is always kept),
+#               or 'auto' to find them with findRunPeriodStart
+#   startDate   [month, day] the run period starts on, used by skiprows='auto'
+#   floatType   dtype for all numeric columns, eg. np.float32 to halve memory
+#   useCache    use the binary sidecar cache (epcache.py). The sidecar holds the rows after the
+#               skipped ones, so it is made again if skiprows changes. The file's hash for the
+#               sidecar is taken in the same read as the parse.
+def loadEPlusCSV(path, columns=EPPP_COLUMNS, skiprows=0, startDate=None, floatType=np.float64,
+                 useCache=True, index=CACHE_INDEX):
+    if useCache:
+        data = loadSidecar(path, columns, skiprows, index=index, startDate=startDate)
+        if data is not None:
+            if columns is not None:
+                # Cast only if the cached type differs from the one requested
+                types = columnTypes(columns, floatType)
+                data = data.astype({c: t for c, t in types.items() if t is not str and data[c].dtype != t}, copy=False)
+            return data
+        # Taken before parsing, see storeSidecar
+        key = fileKey(path)
+    usecols = None
+    parseTypes = None
+    if columns is not None:
+        wanted = set(columns)
+        usecols = lambda c: c in wanted
+        parseTypes = columnTypes(columns, floatType)
+    # Find the warmup rows from the Date/Time column alone, then skip them while parsing.
+    auto = None
+    if skiprows == 'auto':
+        auto = [list(startDate) if startDate is not None else None]
+        skiprows = findRunPeriodStart(path, startDate)
+    # Row 0 is the header
+    if not useCache: return pd.read_csv(path, usecols=usecols, dtype=parseTypes, skiprows=range(1, skiprows + 1))
+    # Hash the contents for the sidecar in the same read as the parse
+    data, sha1 = readCSVHashed(path, usecols=usecols, dtype=parseTypes, skiprows=range(1, skiprows + 1))
+    storeSidecar(path, data, skiprows, complete=(columns is None), index=index, key=key, auto=auto, sha1=sha1)
+    return data
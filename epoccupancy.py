@@ -0,0 +1,220 @@
+# epoccupancy.py
+# Occupancy-based adaptive setpoints as a stand-alone, cached pipeline stage
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# The occupancy adaptive setpoints only depend on the occupancy files, the outdoor temperature,
+# the date range, the timestep, the comfort probability pb and sigma. They are computed here with
+# array operations (epcomfort.py), then saved in the eppp results folder (see epresults.py) keyed
+# by a hash of all of these, so a rerun with only new EnergyPlus results, or a co-sim controller
+# asking for the same setpoints, gets them straight from the saved copy.
+#
+# Setpoints: when occupied, the adaptive band for pb = 90% of people comfortable. When not
+# occupied, the occupancy probability is used as the probability of being comfortable, which
+# widens the band when the space is less likely to be occupied.
+#
+# Output columns (same as the OccupancySetpoints_<date_range>.csv from eppp.py):
+#   outdoor, occ_status, occ_prob, occ_prob_comfort_range, occ_prob_heat, occ_prob_cool, occ_heat, occ_cool
+#
+# Run As:
+#           python3 epoccupancy.py
+# after setting the parameters at the bottom of this file, or import occupancySetpointsCached().
+
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+from epcache import fileKey, touchEntry, removeEntry, dirSize
+from eploader import chunkWindow
+from epcomfort import adaptiveBounds, comfortRange, SIGMA
+from epresults import runKey, RESULTS_DIR, RESULTS_INDEX, RESULTS_MAX_BYTES, RESULTS_MAX_ENTRIES
+from epexport import writeTable, openTable, writeChunk, closeTable
+
+# Default occupancy files from the occupancy generator
+OCC_STATUS_FILE = 'occupancy_5min.csv'
+OCC_PROB_FILE = 'occupancy_1hr.csv'
+
+SETPOINT_COLUMNS = ['outdoor', 'occ_status', 'occ_prob', 'occ_prob_comfort_range', 'occ_prob_heat',
+                    'occ_prob_cool', 'occ_heat', 'occ_cool']
+
+# Occupied (1) or not (0) at each timestep: first column of the first nrows rows of path
+def occupancyStatus(path=OCC_STATUS_FILE, nrows=None):
+    return pd.read_csv(path, nrows=nrows).iloc[:,0]
+
+# Same as occupancyStatus, chunkRows rows at a time, as Series indexed by row number (see eploader.chunkWindow)
+def occupancyStatusChunks(path=OCC_STATUS_FILE, nrows=None, chunkRows=50000):
+    return (c.iloc[:,0] for c in pd.read_csv(path, nrows=nrows, chunksize=chunkRows))
+
+# Hourly occupancy probability from the first nrows rows of path, as [hours as timestep numbers
+# [minutes] from the first hour, probability]
+def hourlyProbability(path=OCC_PROB_FILE, nrows=None, timestep=5):
+    hourly = pd.read_csv(path, nrows=nrows, usecols=['Dates/Times', 'Probability'])
+    times = pd.to_datetime(hourly['Dates/Times']).to_numpy().astype(np.int64)
+    steps = (times - times[0])/int(timestep*60e9)
+    return [steps, hourly['Probability'].to_numpy(dtype=np.float64)]
+
+# Hourly occupancy probability from the first nrows rows of path, linearly interpolated to timestep
+# [minutes]. Runs from the first to the last hour in the file.
+def occupancyProbability(path=OCC_PROB_FILE, nrows=None, timestep=5):
+    steps, prob = hourlyProbability(path, nrows, timestep)
+    return pd.Series(np.interp(np.arange(int(steps[-1]) + 1), steps, prob))
+
+# Returns the setpoint DataFrame (SETPOINT_COLUMNS) on the index of outdoor.
+#   outdoor   outdoor temperature Series [°C]
+#   status    occupancy status Series, matched to outdoor by index
+#   prob      occupancy probability at each timestep, matched to outdoor by position. If it is
+#             shorter than outdoor, the rows past its end are left blank.
+#   pb        fraction of people comfortable when occupied
+def occupancySetpoints(outdoor, status, prob, pb=0.90, sigma=SIGMA):
+    heat100, cool100 = adaptiveBounds(outdoor)
+    occsetpt = pd.DataFrame(index=outdoor.index)
+    occsetpt['outdoor'] = outdoor
+    # As float, so that chunks with and without missing rows have the same type
+    occsetpt['occ_status'] = status.reindex(outdoor.index).astype(np.float64)
+    prob = np.asarray(prob)[:len(outdoor)]
+    occsetpt['occ_prob'] = np.concatenate([prob, np.full(len(outdoor) - len(prob), np.nan)])
+    # Comfort range using occupancy probability as the probability of being comfortable
+    opRange = comfortRange(occsetpt['occ_prob'], sigma)
+    occsetpt['occ_prob_comfort_range'] = opRange
+    occsetpt['occ_prob_heat'] = heat100 - opRange
+    occsetpt['occ_prob_cool'] = cool100 + opRange
+    # If occupied, use the pb comfort band
+    cr = comfortRange(pb, sigma)
+    occupied = occsetpt['occ_status'] == 1
+    occsetpt['occ_heat'] = np.where(occupied, heat100 - cr, occsetpt['occ_prob_heat'])
+    occsetpt['occ_cool'] = np.where(occupied, cool100 + cr, occsetpt['occ_prob_cool'])
+    return occsetpt
+
+# Key for the setpoints: hash of the outdoor temperature values and index, the parameters and the
+# contents of the occupancy files
+def setpointKey(outdoor, date_range, pb, sigma, timestep, statusFile, probFile, statusRows, probRows):
+    h = hashlib.sha1(np.ascontiguousarray(outdoor, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(outdoor.index.to_numpy()).tobytes())
+    params = {'stage': 'occsetpt', 'weather': h.hexdigest(), 'date_range': date_range, 'pb': pb, 'sigma': sigma,
+              'timestep': timestep, 'statusRows': statusRows, 'probRows': probRows}
+    return runKey(params, [statusFile, probFile])
+
+# Saved setpoints folder for key
+def _setpointEntry(key):
+    return os.path.join(RESULTS_DIR, 'occsetpt-' + key)
+
+# Key of export file exportFile, which changes if the file is changed or written with other float32
+def _exportKey(exportFile, float32=False):
+    return str(fileKey(exportFile)) + (' float32' if float32 else '')
+
+# Returns the saved setpoint DataFrame for key, or None. exportFile, if given, is the file written
+# with the setpoints; if it has been changed or deleted since, or float32 is not what it was written
+# with, exported is False.
+# Returns [setpoints or None, exported]
+def loadSetpoints(key, exportFile=None, float32=False):
+    entry = _setpointEntry(key)
+    try:
+        with np.load(os.path.join(entry, 'setpoints.npz'), allow_pickle=False) as npz:
+            occsetpt = pd.DataFrame({c: npz[c] for c in SETPOINT_COLUMNS}, index=npz['index'])
+            exportKey = str(npz['exportKey']) if 'exportKey' in npz.files else None
+    except (OSError, ValueError, KeyError):
+        return [None, False]
+    exported = False
+    if exportFile is not None:
+        try: exported = _exportKey(exportFile, float32) == exportKey
+        except OSError: pass
+    touchEntry(RESULTS_INDEX, entry, maxBytes=RESULTS_MAX_BYTES, maxEntries=RESULTS_MAX_ENTRIES)
+    return [occsetpt, exported]
+
+# Save setpoints under key. exportFile is the file written with them, if any, with float32.
+def storeSetpoints(key, occsetpt, exportFile=None, float32=False):
+    entry = _setpointEntry(key)
+    tmp = entry + '.' + str(os.getpid()) + '.tmp'
+    arrays = {c: occsetpt[c].to_numpy() for c in SETPOINT_COLUMNS}
+    arrays['index'] = occsetpt.index.to_numpy()
+    try:
+        if exportFile is not None: arrays['exportKey'] = np.array(_exportKey(exportFile, float32))
+        removeEntry(tmp)
+        os.makedirs(tmp)
+        np.savez(os.path.join(tmp, 'setpoints.npz'), **arrays)
+        removeEntry(entry)
+        os.replace(tmp, entry)
+    except (OSError, TypeError, ValueError) as e:
+        print('Warning: Could not save occupancy setpoints: ', e)
+        removeEntry(tmp)
+        return
+    touchEntry(RESULTS_INDEX, entry, dirSize(entry), RESULTS_MAX_BYTES, RESULTS_MAX_ENTRIES)
+
+# Occupancy setpoints for outdoor temperature Series outdoor, from the saved copy if nothing has
+# changed, else computed and saved. Writes them to exportFile (unless None) if it is not already
+# up to date. Returns [setpoints DataFrame, True if the saved copy was used].
+#   statusRows, probRows  rows read from the status and probability files
+#   exportFormat, float32 format of exportFile and 32 bit floats, see epexport.py
+def occupancySetpointsCached(outdoor, date_range, pb=0.90, sigma=SIGMA, timestep=5, statusFile=OCC_STATUS_FILE,
+                             probFile=OCC_PROB_FILE, statusRows=None, probRows=None, exportFile=None, useSaved=True,
+                             exportFormat='csv', float32=False):
+    key = None
+    if useSaved:
+        key = setpointKey(outdoor, date_range, pb, sigma, timestep, statusFile, probFile, statusRows, probRows)
+        occsetpt, exported = loadSetpoints(key, exportFile, float32)
+        if occsetpt is not None:
+            if exportFile is not None and not exported:
+                writeTable(occsetpt, exportFile, exportFormat, float32)
+                storeSetpoints(key, occsetpt, exportFile, float32)
+            return [occsetpt, True]
+    occsetpt = occupancySetpoints(outdoor, occupancyStatus(statusFile, statusRows),
+                                  occupancyProbability(probFile, probRows, timestep), pb, sigma)
+    if exportFile is not None: writeTable(occsetpt, exportFile, exportFormat, float32)
+    if key is not None: storeSetpoints(key, occsetpt, exportFile, float32)
+    return [occsetpt, False]
+
+# Occupancy setpoints computed and written to exportFile chunk by chunk, for eppp.py stream mode.
+# outdoorChunks is an iterable of outdoor temperature Series indexed by row number from 0, in order
+# (eg. pd.read_csv chunks). Gives the same rows as occupancySetpointsCached, but nothing is kept for
+# the whole run and the saved copy is not used. Returns the number of rows.
+def occupancySetpointsStream(outdoorChunks, pb=0.90, sigma=SIGMA, timestep=5, statusFile=OCC_STATUS_FILE,
+                             probFile=OCC_PROB_FILE, statusRows=None, probRows=None, exportFile=None,
+                             exportFormat='csv', float32=False, chunkRows=50000):
+    steps, prob = hourlyProbability(probFile, probRows, timestep)
+    last = int(steps[-1]) + 1
+    status = occupancyStatusChunks(statusFile, statusRows, chunkRows)
+    table = openTable(exportFile, exportFormat, float32) if exportFile is not None else None
+    part = None
+    rows = 0
+    for outdoor in outdoorChunks:
+        if len(outdoor) == 0: continue
+        lo, hi = outdoor.index[0], outdoor.index[-1] + 1
+        part = chunkWindow(status, part, lo, hi)
+        occsetpt = occupancySetpoints(outdoor, part, np.interp(np.arange(lo, min(hi, last)), steps, prob), pb, sigma)
+        if table is not None: writeChunk(table, occsetpt)
+        rows = hi
+    if table is not None: closeTable(table)
+    return rows
+
+
+if __name__ == '__main__':
+    from eploader import loadEPlusCSV, dateRangeStart, DATETIME_COL, OUTDOOR_COL
+
+    # PARAMETER VARIABLES TO CHANGE -----------------------------------------
+    # Outdoor temperature: an EnergyPlus output csv, or the csv from weathersolar.py
+    weatherfile = "Demo_EP_Data.csv"
+    # EnergyPlus calibration rows at the top of weatherfile; 0 for weathersolar.py output
+    calibration = 2305 - 1
+
+    date_range = '2020-08-01_2020-08-31'
+    numdays = 7
+    timestep = 5 # minutes
+
+    # Fraction of people comfortable when occupied
+    pb = 0.90
+    sigma = SIGMA
+
+    outputfile = 'OccupancySetpoints_' + date_range + '.csv'
+
+    # Main processing code --------------------------------------------------
+    print('\n============ Occupancy Adaptive Setpoints V1.0 ============')
+    data = loadEPlusCSV(weatherfile, [DATETIME_COL, OUTDOOR_COL], calibration, dateRangeStart(date_range))
+    dayrows = int(60/timestep*24)
+    occsetpt, saved = occupancySetpointsCached(data[OUTDOOR_COL], date_range, pb, sigma, timestep,
+                                               statusRows=numdays*dayrows - 1, probRows=24*numdays + 2,
+                                               exportFile=outputfile)
+    if saved: print("(Unchanged since an earlier run, using saved setpoints)")
+    print(occsetpt)
+    print("\nOccupancy Setpoints Exported to: ", outputfile)
+    print('\n=======================================================\n')
@@ -0,0 +1,111 @@
+# epplot.py
+# Temperature overlay plots for eppp.py: decimated lines, image files without a display, worker pool
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# A year of 1 minute data is half a million points per line, far more than the figure has pixels.
+# Each line is cut into about one bucket per pixel of figure width, and only the first and last
+# point, and the lowest and highest point of each bucket, are drawn (min-max decimation). Peaks and
+# dips, eg. a comfort excursion of one timestep, are kept exactly, so the image looks the same as
+# with every point, and the cost of drawing no longer depends on the length of the run.
+#
+# A figure is described by a spec dict (see overlaySpec) of lines that are already decimated.
+# Specs are drawn onto a pyplot axes for the interactive window (drawOverlay), or rendered
+# straight to an image file with the Agg canvas, which needs no display and does not touch pyplot
+# (renderFigure). renderFigures() renders many specs, eg. one per file or per window of days,
+# spread over a pool of worker processes.
+
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Figure size [inches] and resolution [dots per inch], the matplotlib defaults
+PLOT_SIZE = (6.4, 4.8)
+PLOT_DPI = 100
+
+linestyles = ['-','--','-.','-','--','-.','-','--','-.','-','--','-.']
+
+# Indices of the points of y to draw with buckets buckets: first, last, and the min and max of each
+# bucket, in order. NaN is never picked over a number. All points if there are few enough already.
+def minMaxIndices(y, buckets):
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if buckets <= 0 or n <= 2*buckets + 2: return np.arange(n)
+    size = -(-n // buckets) # points per bucket
+    nb = -(-n // size)
+    pad = nb*size - n
+    nan = np.isnan(y)
+    lo = np.concatenate([np.where(nan, np.inf, y), np.full(pad, np.inf)]).reshape(nb, size)
+    hi = np.concatenate([np.where(nan, -np.inf, y), np.full(pad, -np.inf)]).reshape(nb, size)
+    first = np.arange(nb)*size
+    idx = np.unique(np.concatenate([[0, n - 1], first + lo.argmin(axis=1), first + hi.argmax(axis=1)]))
+    # An all-NaN last bucket can pick a padding position
+    return idx[idx < n]
+
+# Lines of the eppp.py temperature graph, as [[label, y, linestyle], ...]
+#   results   epanalysis results with indoorTemp, heatTemp and coolTemp over the plotted rows
+#   outdoor   outdoor temperature over the same rows
+#   graphType 'normal', 'detail', 'coolSetpoints' or 'heatSetpoints' (see eppp.py graph=)
+def overlayLines(results, outdoor, graphType='normal'):
+    lines = []
+    for i, res in enumerate(results):
+        f = res['file']
+        if 'coolSetpoints' in graphType: lines.append([f, res['coolTemp'], linestyles[i % len(linestyles)]])
+        elif 'heatSetpoints' in graphType: lines.append([f, res['heatTemp'], linestyles[i % len(linestyles)]])
+        else: lines.append([f, res['indoorTemp'], linestyles[i % len(linestyles)]])
+        # show heating and cooling setpoints if only plotting one simulation.
+        if 'detail' in graphType:
+            if res['totHeatElec'] > 1: lines.append(["Heating Setpoint", res['heatTemp'], '--'])
+            if res['totCoolElec'] > 1: lines.append(["Cooling Setpoint", res['coolTemp'], '-.'])
+    lines.append(["Outdoor", np.asarray(outdoor), ':'])
+    return lines
+
+# Figure spec for lines over the x values time (same length as each line), or only rows lo:hi of
+# them. Lines are decimated to the width of the figure in pixels unless decimate is False.
+# path is the image file to render to, title an optional figure title.
+def overlaySpec(time, lines, path=None, title=None, lo=0, hi=None, decimate=True, size=PLOT_SIZE, dpi=PLOT_DPI):
+    time = np.asarray(time)[lo:hi]
+    buckets = int(size[0]*dpi) if decimate else 0
+    drawn = []
+    for label, y, style in lines:
+        y = np.asarray(y)[lo:hi]
+        idx = minMaxIndices(y, buckets)
+        drawn.append([label, time[idx], y[idx], style])
+    return {'lines': drawn, 'xlim': [time[0], time[-1]] if len(time) else None, 'path': path, 'title': title,
+            'size': size, 'dpi': dpi}
+
+# Draw a figure spec on matplotlib axes ax
+def drawOverlay(ax, spec):
+    for label, x, y, style in spec['lines']:
+        ax.plot(x, y, label=label, linestyle=style)
+    # Readability
+    ax.legend()
+    ax.set_xlabel('Time [hours]')
+    ax.set_ylabel('Temperature [° C]')
+    if spec['xlim'] is not None: ax.set_xlim(spec['xlim'])
+    if spec['title']: ax.set_title(spec['title'])
+    ax.grid()
+
+# Render a figure spec to its image file with the Agg canvas. Returns the file name.
+def renderFigure(spec):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=spec['size'], dpi=spec['dpi'])
+    FigureCanvasAgg(fig)
+    drawOverlay(fig.add_subplot(), spec)
+    fig.savefig(spec['path'])
+    return spec['path']
+
+# Render every spec to its image file, with up to jobs worker processes. Returns the file names in order.
+def renderFigures(specs, jobs=1):
+    if jobs <= 1 or len(specs) <= 1 or 'fork' not in mp.get_all_start_methods():
+        return [renderFigure(spec) for spec in specs]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(specs)), mp_context=mp.get_context('fork')) as pool:
+        return list(pool.map(renderFigure, specs))
+
+# Image file for part of a plot: path with part added before the extension, eg. eppp_plot_run1.png
+def figurePath(path, part):
+    root, ext = os.path.splitext(path)
+    return root + '_' + part + (ext or '.png')
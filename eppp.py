@@ -1,577 +1,695 @@
-#  eppp.py    Identical to epPostProcess.py, with shorter name that is easier to type
-#  
-#  Author(s):   Brian Woo-Shem, Kaleb Pattawi
-#  Updated:     2022-05-23
-#  Version:     3.0 (Add occupancy comfort bounds generator, Full support for limited range of days)
-#  
-#  Instructions:
-#   - Prerequisite libraries os, ipypublish, pandas, numpy
-#   - Set analysis parameters in terminal OR by changing values in code below, marked by ===> <===
-#
-# Run As:
-#           python3 eppp.py < parameters >
-#
-# < Parameters > can go in any order!
-#   inputfilename.csv  OR  input=inputfilename.csv  Any number of source EP data files to analyze
-#   output=[outputfilename].csv   File to output results to. Note output=none means no output file
-#
-#   graph=detail  Extra detail graph (not yet implemented, does nothing)
-#   graph=none    Suppress graphs
-#
-#   -v            Verbose. Additional dataframe outputs to terminal
-#
-#   days <startday> <endday>  Three inputs separated by space; startday and endday must be integers
-#                               this is the range of days to process days for
-#
-#   pconst <a> <b>  Three inputs separated by space; a = pricing multiplier, b = pricing offset
-#                               both can be floating point values.
-#
-#   price=l  or legacy       Accepts older price csv files from before getWholesaleCAISO. Default is style from getWholesaleCAISO
-#   price=d   Day-ahead
-#   price=r   Real-time. Default setting.
-#
-#   date=[date_range]     Set date range to get data for
-#
-#   -c=filename   Outputs comfort data file as "original_file_filename.csv"
-#   -c=none       Do not output comfort data file
-#
-#   ts=         Number of timesteps per hour
-#   calibration=  Number of EP calibration rows
-
-#Import Scientific and numerical computing libraries --------------------
-import os
-import sys
-from ipypublish import nb_setup
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import csv
-from scipy.stats import norm
-
-# Suppress annoying warning
-pd.set_option('mode.chained_assignment', None)
-
-# Adds the .csv file extension if it is not already present to a string representing the output file name
-def addFileType(c):
-    if c[len(c)-4: len(c)] != ".csv": c = c + ".csv"
-    return c
-
-# UI
-header = '\n=================== epPostProcess.py V3.0 ==================='
-closer = '===========================================================\n'
-print(header)
-
-# Preset Values & Indices -----------------------------------------------
-# Values that can be designated here, or using command-line input. 
-# Command line input supercedes anything here.
-
-# < input= > ===> File Name(s) of Energy Plus result csv file(s) <=== 
-# List all of them here, separated by commas, eg. ["file1.csv", "file2.csv"]
-files = ["Demo_EP_Data.csv"]
-
-# < date= > ===> WHEN TO RUN - must match EP run period! <===
-# Legacy Options: 
-#   'Jan1thru7'
-#   'Feb12thru19'
-#   'Sept27-Oct3_SJ'
-date_range = '2020-08-01_2020-08-31'
-
-# < output= > ===> Default output csv file <===
-# Calling it "None" or "none" will make it not make this file
-outFile = "_summary.csv"
-
-# < days first last > ===> Start & End Day <=== 
-firstDay = 0  # 0 to 6
-lastDay = 7  # 1 to 7
-
-# < graph= > ===> Graph Settings <===
-# Display graph?
-graph = True
-# Show more detailed graph? - currently does nothing
-graphType = "normal"
-
-# < wholesale= > ===> Wholesale Data Type <===
-#   r = Real-Time
-#   d = Day-Ahead
-#   l = legacy = Older data, before GetWholesaleCAISO
-priceType = 'r'
-
-# < -c= > ===> Output Comfort Data <===
-# What name to add to the input file to designate the comfort data file as "InputFile_filename.csv"
-# Calling it "None" or "none" will make it output nothing
-comfortSuffix = "comfort.csv"
-pmultiplier = 8
-poffset = 0.015
-
-# < -v > ===> Verbose - Show detailed outputs to command line <===
-verbose = False
-
-# < ts= > ===> Timestep Length [min] <===
-timestep = 5 # minutes
-
-# < calibration= > ===> Set working data range <=== 
-# How many rows of calibration data at beginning of file
-# Changes based on variables you are outputting, for default simulation use 2305-1
-numEPlusCalibrationRows = 2305 - 1  # -1 because first row is column headers
-
-# Constants & Indices that should not be changed
-ns = len(sys.argv)
-i = 1
-nf = 0
-
-# Get parameter inputs from command line --------------------------------
-while i < ns:
-    if "output=" in sys.argv[i]: #must go before filenames because will include .csv in string
-        outFile = addFileType(sys.argv[i].replace("output=",""))
-    elif "-c=" in sys.argv[i]:
-        comfortSuffix = addFileType(sys.argv[i].replace("-c=",""))
-    elif ".csv" in sys.argv[i] or "data=" in sys.argv[i] or "input=" in sys.argv[i]: # Number of files. First one replaces the default file
-        if nf==0: files= [addFileType(sys.argv[i].replace("data=","").replace("input=",""))]
-        else: files.append(addFileType(sys.argv[i].replace("data=","").replace("input=",""))) # after that it adds more files to the list
-        nf += 1
-    elif "date=" in sys.argv[i]:
-        date_range = sys.argv[i].replace("date=","")
-    elif "pconst" in sys.argv[i]:
-        i += 1
-        try: pmultiplier = float(sys.argv[i])
-        except ValueError:
-            print('Warning: Invalid price multiplier, using default = 4 instead.')
-            i -= 1
-        except IndexError:
-            print('Warning: Missing price multiplier, using default = 4 instead.')
-            i -= 1
-        i += 1
-        try: 
-            poffset = float(sys.argv[i])
-        except ValueError:
-            print('Warning: Invalid price offset, using default = 0.10 instead.')
-            i -= 1
-        except IndexError:
-            print('Warning: Missing price offset, using default = 0.10 instead.')
-            i -= 1
-    elif "days" in sys.argv[i]:
-        i += 1
-        try: firstDay = int(sys.argv[i])
-        except ValueError:
-            print('Warning: Invalid start day, using default = 0 instead.')
-            i -= 1
-        except IndexError:
-            print('Warning: Missing start day, using default = 0 instead.')
-            i -= 1
-        i += 1
-        try: lastDay = int(sys.argv[i])
-        except ValueError:
-            print('Warning: Invalid end day, using default = 7 instead.')
-            i -= 1
-        except IndexError:
-            print('Warning: Missing end day, using default = 7 instead.')
-            i -= 1
-    elif "graph=" in sys.argv[i]:
-        if "detail" in sys.argv[i]: graphType = "detail"
-        elif "cool" in sys.argv[i]: graphType = "coolSetpoints"
-        elif "heat" in sys.argv[i]: graphType = "heatSetpoints"
-        elif "none" in sys.argv[i]: graph = False
-        else: print('Warning: invalid graph type, using default graph configuration instead.')
-    elif "-v" in sys.argv[i]: verbose = True
-    elif "price" in sys.argv[i]:
-        if "=d" in sys.argv[i]: priceType = 'd'
-        elif "=r" in sys.argv[i]: priceType = 'r'
-        elif "E-1" in sys.argv[i]: priceType = 'E-1'
-        elif "E-TOU-C_S" in sys.argv[i]: priceType = 'E-TOU-C_Summer'
-        elif "E-TOU-C_W" in sys.argv[i]: priceType = 'E-TOU-C_Winter'
-        elif "E-TD-Z" in sys.argv[i]: priceType = 'E-TD-Z'
-        elif "=l" in sys.argv[i]: priceType = 'l'
-        else: print('Warning: invalid wholesale price type, using default, ', priceType, ' instead.')
-    elif "calibration" in sys.argv[i]:
-        try: numEPlusCalibrationRows = int(sys.argv[i].replace("calibration=",""))
-        except ValueError: print('Warning: invalid calibration rows, using default =', str(numEPlusCalibrationRows))
-    elif "ts" in sys.argv[i]:
-        try: numEPlusCalibrationRows = int(sys.argv[i].replace("ts=",""))
-        except ValueError: print('Warning: invalid timestep, using default =', str(timestep))
-    else: print('Warning: Unrecognized parameter. Using defaults instead.')
-    i += 1
-
-# UI
-if nf == 0: print('FYI: Using preset input data files from code.')
-print("Processing Files: ")
-print(files)
-
-# Data range to plot
-#datarows = 2016 # number of rows with data [0:2040]
-dayrows = int(60 / timestep * 24) #Usually = 288 = int(datarows/7) = number of rows with data per day = timestepsperhour * 24
-# Set bounds to plot. Integer to multiply is the day number, must be on bounds (typically 0 - 7)
-datastart = int(firstDay * dayrows)
-dataend = int(lastDay * dayrows) - 1
-if verbose:
-    print("datastart = ", datastart)
-    print("dataend = ", dataend)
-
-# Constants & Indices ----------------------------------------------------
-# Constant for energy
-convTokWh = 2.77778e-7
-
-# Index
-i = 0
-# Initialize empty lists for data so it doesn't overwrite or get indexing errors later
-labels = []*len(files)
-totHeatElec = [0]*len(files)
-totCoolElec = [0]*len(files)
-meanDiff100 = [0]*len(files)
-meanComfBand = [0]*len(files)
-totalPrice = [0]*len(files)
-pctTimeComf90 = [0]*len(files)
-pctTimeComf80 = [0]*len(files)
-avgDailyEnergy = [0]*len(files)
-avgDailyCost = [0]*len(files)
-heatPrice = [0]*len(files)
-coolPrice = [0]*len(files)
-linestyles = ['-','--','-.','-','--','-.','-','--','-.','-','--','-.']
-
-# Get unified time and indoor temp --------------------------------------
-data = pd.read_csv(files[i])
-# remove the energyplus calibration part 
-data = data[numEPlusCalibrationRows:]
-#data = data[datastart:dataend]
-#print(len(data))
-#newIndex = np.array(range(0,dataend-datastart))
-newIndex = np.array(range(0,len(data['Date/Time'])))
-data = data.set_index(newIndex)
-if verbose:
-    print("Source Data Matrix: ")
-    print(data.head())
-# Global outdoor temperature
-outdoorTemp = data['Environment:Site Outdoor Air Drybulb Temperature [C](TimeStep)']
-# Total data time
-time = np.linspace(0,24*(lastDay-firstDay),len(data['Date/Time']))
-
-
-# Get generated occupancy data -------------------------------------------
-occupancy_data = pd.read_csv('occupancy_5min.csv', nrows=(dataend))
-
-# Occupancy
-occupancy_df = pd.read_csv('occupancy_1hr.csv', nrows=int(24*(lastDay-firstDay)+2))
-occupancy_df = occupancy_df.set_index('Dates/Times')
-occupancy_df.index = pd.to_datetime(occupancy_df.index)
-
-# hourly occupancy probability data to 5 minute intervals
-occ_prob_all = occupancy_df.Probability.resample('5min').interpolate(method='linear')
-#print(occ_prob_all)
-
-# Compute thermal comfort bounds based on outdoor temp -------------------
-# Compute 100% comfort bounds
-temp_100comfort_heating = outdoorTemp.apply(lambda x: 0.31*x + 16.3)
-temp_100comfort_cooling = outdoorTemp.apply(lambda x: 0.31*x + 19.3)
-
-HEAT_TEMP_MAX_100 = 25.7
-HEAT_TEMP_MIN_100 = 18.4
-COOL_TEMP_MAX_100 = 29.7
-COOL_TEMP_MIN_100 = 22.4
-
-# When temps too low or too high set to min or max (See adaptive 100)
-temp_100comfort_cooling.loc[(temp_100comfort_cooling < COOL_TEMP_MIN_100)] = COOL_TEMP_MIN_100
-temp_100comfort_cooling.loc[(temp_100comfort_cooling > COOL_TEMP_MAX_100)] = COOL_TEMP_MAX_100
-temp_100comfort_heating.loc[(temp_100comfort_heating < HEAT_TEMP_MIN_100)] = HEAT_TEMP_MIN_100
-temp_100comfort_heating.loc[(temp_100comfort_heating > HEAT_TEMP_MAX_100)] = HEAT_TEMP_MAX_100
-
-occsetptout = True
-
-if occsetptout:
-    # Determine Occupancy Adaptive Comfort Bounds -------------------------------------
-    occsetpt = pd.DataFrame(columns=['outdoor','occ_status','occ_prob','occ_prob_comfort_range'])
-    occsetpt['outdoor'] = outdoorTemp.copy()
-    occsetpt['occ_status'] = occupancy_data.copy()
-    #experimenting
-    #occsetpt['occ_prob'] = outdoorTemp.copy()
-    #print(occ_prob_all[0:len(outdoorTemp)])
-    test = pd.DataFrame(columns=['occ_prob'])
-    test['occ_prob'] = occ_prob_all[0:len(outdoorTemp)].copy()
-    #print(test) #test works
-    #Not sure why this one doesn't work and occ_prob ends up blank
-    occsetpt['occ_prob'] = test['occ_prob'].copy() #occ_prob_all[0:len(outdoorTemp)].copy()
-
-    pb = 0.90 # 90%
-    sigma = 3.937 # This was calculated based on adaptive comfort being normally distributed
-    # Comfort range at probability pb
-    cr = norm.ppf(((1-pb)/2)+1/2)*sigma
-    print("Comf range expansion: ", cr)
-
-    #Apply comfort bound function - requires using dataframe to do the lambda
-    op_comfort_range = occ_prob_all.iloc[:len(outdoorTemp)].apply(lambda x: (1-x)/2)+1/2
-    op_comfort_range = np.array(op_comfort_range.apply(lambda y: norm.ppf(y)*sigma))
-    occsetpt['occ_prob_comfort_range'] = op_comfort_range
-
-    occsetpt['occ_prob_heat'] = temp_100comfort_heating-op_comfort_range
-    occsetpt['occ_prob_cool'] = temp_100comfort_cooling+op_comfort_range
-
-    occsetpt['occ_heat'] = occsetpt['occ_prob_heat']
-    occsetpt['occ_cool'] = occsetpt['occ_prob_cool']
-
-    # If occupied, use 90% comfort band
-    occsetpt['occ_heat'].loc[(occsetpt['occ_status'] == 1)] = temp_100comfort_heating.loc[(occsetpt['occ_status'] == 1)] - cr
-    occsetpt['occ_cool'].loc[(occsetpt['occ_status'] == 1)] = temp_100comfort_cooling.loc[(occsetpt['occ_status'] == 1)] + cr
-    
-    print("Computed occupancy-based adaptive setpoints:")
-    print(occsetpt)
-
-    # Export to file
-    occsetptFile = 'OccupancySetpoints_' + date_range + '.csv'
-    occsetpt.to_csv(occsetptFile, header=True)
-    print("\nOccupancy Setpoints Exported to: ", occsetptFile)
-
-
-
-# Get pricing data -------------------------------------------------------
-# Below we get the wholesale price and convert to price for the users using a simple equation (the way we determine the users price will likely change in the future). Then we can determine the total cost over the whole simulation. Similar we can print out the total heating/cooling energy over the simulation.
-if 'l' in priceType:
-    wholesale = pd.read_excel('WholesalePrice.xlsx', sheet_name=date_range)
-    price = wholesale.apply(lambda x: 4*x/1000 + 0.1)
-    try: price.columns = ['Price [$/MWh]']
-    except ValueError: price.columns = ['Price [$/MWh]', "col2", "col3"]
-
-# Matches existing PG&E Rates
-elif 'E' in priceType:
-    if 'E-1' in priceType: pfile = 'E-1_5min.csv'
-    elif 'E-TOU-C_Summer' in priceType: pfile = 'E-TOU-C_5min_Summer.csv'
-    elif 'E-TOU-C_Winter' in priceType: pfile = 'E-TOU-C_5min_Winter.csv'
-    elif 'E-TD-Z' in priceType: pfile = 'E-TD-Z_5min.csv'
-    else: #error
-        pfile = 'Zero.csv'
-    
-    #Get data directly from file, no extra multiplier or offset
-    eprice= np.genfromtxt(pfile, skip_header=0, max_rows=dataend+1, delimiter=',',usecols=0)
-
-# Using Demand-based CAISO pricing
-else:
-    if 'd' in priceType.lower(): pfile = "WholesaleDayAhead_" + date_range + ".csv"
-    elif 'r' in priceType.lower(): pfile = "WholesaleRealTime_" + date_range + ".csv"
-    else: pfile = 'Zero.csv'
-    # Get data, with offset and multiplier
-    wholesale= np.genfromtxt(pfile, skip_header=0, max_rows=dataend+1, delimiter=',',usecols=0)
-    eprice = wholesale*pmultiplier/1000+poffset
-
-
-# Getting data from EP files ---------------------------------------------
-# Iterate through files, obtain and compute comfort data
-for f in files:
-    # Read EP file data ----------------------------------------
-    try: data = pd.read_csv(f)
-    except FileNotFoundError:
-        print("Input file ", f, " does not exist, skipping.")
-        continue
-    print("-------------------------------------------------\n\nDataset: " + f)
-    # remove the EnergyPlus calibration part 
-    data = data[numEPlusCalibrationRows:]
-    #data = data[datastart:dataend]
-
-    # set index
-    newIndex = np.array(range(0,len(data['Date/Time'])))
-    data = data.set_index(newIndex)
-
-    # Indoor temperature for current simulation
-    indoorTemp = data['LIVING_UNIT1:Zone Air Temperature [C](TimeStep)']
-    #print(indoorTemp)
-    
-    
-    # Cost, energy consumption, and thermal comfort ---------------------------
-    # determine price using total electricity times price of energy
-    if 'l' in priceType: # Legacy - older files
-        pricePaid = price['Price [$/MWh]'].loc[0:len(data)-1]*data['Electricity:Facility [J](TimeStep)']*2.77778e-7
-        totalPrice[i] = pricePaid.sum()
-    else: # New getWholesaleCAISO files
-        print(len(eprice))
-        print(len(data))
-        print(datastart)
-        print(dataend)
-        for w in range(datastart,dataend):
-            #print(totalPrice[i])
-            priceStep = eprice[w]*data['Electricity:Facility [J](TimeStep)'].iloc[w]*convTokWh
-            totalPrice[i] = totalPrice[i]+priceStep
-            # print(w)
-            # print(i)
-            # print(wholesale[w])
-            # print(data['Electricity:Facility [J](TimeStep)'].iloc[w])
-            # print(priceStep)
-            heatPrice[i] = heatPrice[i] + eprice[w]*data['Heating:Electricity [J](TimeStep)'].iloc[w]*convTokWh
-            coolPrice[i] = coolPrice[i] + eprice[w]*data['Cooling:Electricity [J](TimeStep)'].iloc[w]*convTokWh
-    print("Total HVAC Electric Bill [$] = ",totalPrice[i])
-    avgDailyCost[i] = totalPrice[i] / (lastDay - firstDay)
-
-    # total energy over whole simulation ------------------------------------------
-    elec_kwh = pd.DataFrame(columns=["Heating Electricity [kWh]", "Cooling Electricity [kWh]"])
-    elec_kwh["Heating Electricity [kWh]"] = data['Heating:Electricity [J](TimeStep)']*convTokWh
-    totHeatElec[i] = elec_kwh["Heating Electricity [kWh]"].iloc[datastart:dataend].sum()
-    print("total heating electricity [kWh]:",totHeatElec[i])
-    
-    elec_kwh["Cooling Electricity [kWh]"] = data['Cooling:Electricity [J](TimeStep)']*convTokWh
-    totCoolElec[i] =elec_kwh["Cooling Electricity [kWh]"].iloc[datastart:dataend].sum()
-    print("total cooling electricity [kWh]:",totCoolElec[i])
-    
-    avgDailyEnergy[i] = (totHeatElec[i] + totCoolElec[i]) / (lastDay - firstDay)
-    print("Average Daily HVAC Electricity [kWh] = ", avgDailyEnergy[i])
-
-    # thermal comfort -----------------------------------------------------------
-    
-    
-    #print(temp_100comfort_cooling)
-    # temperature difference from indoor to 100% comfortable:
-    delta_temp = pd.DataFrame(columns=["heating", "cooling"])
-    delta_temp["heating"] = temp_100comfort_heating - indoorTemp
-    delta_temp["cooling"] = indoorTemp - temp_100comfort_cooling
-    
-    #print(indoorTemp)
-    #print(delta_temp)
-    
-    delta_temp["heating"].iloc[delta_temp["heating"] < 0] = 0
-    delta_temp["cooling"].iloc[delta_temp["cooling"] < 0] = 0
-    delta_temp["maximum"] = delta_temp[["heating", "cooling"]].max(axis=1)
-
-    # Convert temperature difference into percent of comfortable occupants:
-    from scipy.stats import norm
-    delta_temp["percent-comfortable"] = delta_temp["maximum"].apply(lambda x: 100*(2 - 2*norm.cdf(x/3.937)))
-    if verbose:
-        print("Percent Comfortable Regardless of Occupancy Dataframe")
-        print(delta_temp.head(24))
-    meanDiff100[i] = delta_temp["maximum"].iloc[datastart:dataend].mean()
-    print("\nMean temperature difference from 100% comfortable temperature:", meanDiff100[i])
-    meanComfBand[i] = delta_temp["percent-comfortable"].iloc[datastart:dataend].mean()
-    print("Mean comfort band percent:", meanComfBand[i])
-
-
-    # Determine percentage of time that indoor temp is within 90% range ----------
-    comfort = pd.DataFrame(columns=['indoor','outdoor','occupancy'])
-    comfort['indoor'] = indoorTemp.iloc[datastart:dataend]
-    comfort['outdoor'] = outdoorTemp.iloc[datastart:dataend]
-    comfort['occupancy'] = occupancy_data.iloc[datastart:dataend]
-    comfort['comfort90_min'] = comfort['outdoor'].apply(lambda x: 0.31*x + 15.8)
-    comfort['comfort90_max'] = comfort['outdoor'].apply(lambda x: 0.31*x + 19.8)
-    
-    # Max and min for heating and cooling in adaptive setpoint control for 90% of people [°C]
-    HEAT_TEMP_MAX_90 = 26.2
-    HEAT_TEMP_MIN_90 = 18.9
-    COOL_TEMP_MAX_90 = 30.2
-    COOL_TEMP_MIN_90 = 22.9
-    
-    # When temps too low or too high set to min or max (See adaptive setpoints)
-    comfort.loc[(comfort['comfort90_max'] < COOL_TEMP_MIN_90, 'comfort90_max')] = COOL_TEMP_MIN_90
-    comfort.loc[(comfort['comfort90_max'] > COOL_TEMP_MAX_90, 'comfort90_max')] = COOL_TEMP_MAX_90
-    comfort.loc[(comfort['comfort90_min'] < HEAT_TEMP_MIN_90, 'comfort90_min')] = HEAT_TEMP_MIN_90
-    comfort.loc[(comfort['comfort90_min'] > HEAT_TEMP_MAX_90, 'comfort90_min')] = HEAT_TEMP_MAX_90
-
-    comfort['is90'] = comfort['indoor']   # makes new column in dataframe; will be overwritten
-    # Determine if temp is within 90% comfort bounds
-    comfort['is90'].loc[(comfort['indoor'] > comfort['comfort90_min']) & (comfort['indoor'] < comfort['comfort90_max'])] = 1
-    comfort['is90'].loc[(comfort['indoor'] < comfort['comfort90_min']) | (comfort['indoor'] > comfort['comfort90_max'])] = 0
-    # Is it both comfortable and occupied? 'is90' and 'occupancy' are both arrays with values of 1 or 0. Multiplying results
-    # in 1 if both are true, and 0 otherwise
-    comfort['comf_occ_90'] = comfort['is90']*comfort['occupancy']
-    # Compare what percent of the time it is comfortable when occupied with the total occupied time
-    pctTimeComf90[i] = 100*comfort['comf_occ_90'].sum()/comfort['occupancy'].sum()
-    #print(comfort['comf_occ_90'].sum())
-    #print(comfort['occupancy'].sum())
-    print('Percent of occupied time indoor temperature is within 90% comfortable:', pctTimeComf90[i])
-    
-    # 80% range ---------------------------------------------------------------
-    pb = 0.80 # 80%
-    sigma = 3.937 # This was calculated based on adaptive comfort being normally distributed
-    # Comfort range at probability pb
-    cr = norm.ppf(((1-pb)/2)+1/2)*sigma
-    comfort['is80'] = comfort['indoor'] #create arbitrary column in df
-    #100% setpoint band + expanded amount allowed by comfort range
-    comfort['comfort80_min'] = outdoorTemp.apply(lambda x: x*0.31 + 16.3 - cr)
-    comfort['comfort80_max'] = outdoorTemp.apply(lambda x: x*0.31 + 19.3 + cr)
-    
-    # When temps too low or too high set to min or max (See adaptive 100)
-    comfort.loc[(comfort['comfort80_max'] < COOL_TEMP_MIN_100+cr), 'comfort80_max'] = COOL_TEMP_MIN_100+cr
-    comfort.loc[(comfort['comfort80_max'] > COOL_TEMP_MAX_100+cr), 'comfort80_max'] = COOL_TEMP_MAX_100+cr
-    comfort.loc[(comfort['comfort80_min'] < HEAT_TEMP_MIN_100-cr), 'comfort80_min'] = HEAT_TEMP_MIN_100-cr
-    comfort.loc[(comfort['comfort80_min'] > HEAT_TEMP_MAX_100-cr), 'comfort80_min'] = HEAT_TEMP_MAX_100-cr
-    
-    # Is it comfortable for 80%?
-    comfort['is80'].loc[(comfort['indoor'] > comfort['comfort80_min']) & (comfort['indoor'] < comfort['comfort80_max'])] = 1
-    comfort['is80'].loc[(comfort['indoor'] < comfort['comfort80_min']) | (comfort['indoor'] > comfort['comfort80_max'])] = 0
-    # Multiply by occupancy status at that time. Both are either 0 or 1, so result is 0 or 1
-    comfort['comf_occ80'] = comfort['is80']*comfort['occupancy']
-    pctTimeComf80[i] = 100*comfort['comf_occ80'].sum()/comfort['occupancy'].sum()
-    print('Percent of occupied time indoor temperature is within 80% comfortable:', pctTimeComf80[i])
-    
-    if verbose: #Optional output of the first few lines of the data table
-        print("Percent of Occupied Time that is Comfortable Dataframe")
-        print(comfort.head(20))
-
-    # Output detailed comfort data csv ----------------------------------------
-    if "None" not in comfortSuffix and "none" not in comfortSuffix: 
-        # Add max and min setpoints, heating and cooling energy to the comfort dataframe
-        comfort['Max_Setpt'] = data['LIVING_UNIT1:Zone Thermostat Cooling Setpoint Temperature [C](TimeStep)']
-        comfort['Min_Setpt'] = data['LIVING_UNIT1:Zone Thermostat Heating Setpoint Temperature [C](TimeStep)']
-        comfort["Cooling Electricity [kWh]"] = elec_kwh["Cooling Electricity [kWh]"]
-        comfort["Heating Electricity [kWh]"] = elec_kwh["Heating Electricity [kWh]"]
-        if 'l' not in priceType: # Clunky method but works
-            ecost = pd.DataFrame(eprice, columns=['Electricity Price [$/kWh]'])
-            #comfort['Electric Price [$/kWh]'] = ecost.apply(lambda x: 4*x/1000 + 0.1)
-        else:
-            comfort['Electric Price [$/kWh]'] = price['Price [$/MWh]']
-        # Create and export comfort data
-        comfortFile = f.replace(".csv" , "") + "_" + comfortSuffix
-        comfort.to_csv(comfortFile, header=True)
-        print("\nComfort Data Exported to: ", comfortFile)
-    
-    # Plot indoor temp, outdoor temp, and heating/cooling setpoint -------------
-    if graph:
-        heatTemp = data['LIVING_UNIT1:Zone Thermostat Heating Setpoint Temperature [C](TimeStep)']
-        coolTemp = data['LIVING_UNIT1:Zone Thermostat Cooling Setpoint Temperature [C](TimeStep)']
-
-        if 'coolSetpoints' in graphType: 
-            plt.plot(time[datastart:dataend],coolTemp[datastart:dataend], label=f, linestyle=linestyles[i])
-        elif 'heatSetpoints' in graphType:
-            plt.plot(time[datastart:dataend],heatTemp[datastart:dataend], label=f, linestyle=linestyles[i])
-        else:
-            plt.plot(time[datastart:dataend],indoorTemp[datastart:dataend], label=f, linestyle=linestyles[i])
-        
-        # show heating and cooling setpoints if only plotting one simulation.
-        if 'detail' in graphType:
-            if totHeatElec[i] > 1:
-                plt.plot(time[datastart:dataend], heatTemp[datastart:dataend], label="Heating Setpoint", linestyle='--')
-            if totCoolElec[i] > 1:
-                plt.plot(time[datastart:dataend], coolTemp[datastart:dataend], label="Cooling Setpoint", linestyle='-.')
-    
-    i += 1
-# END For each file loop -----------------------------------------------
-
-if graph: # Final graph display to do one time. --------------------------
-    # Plot outdoor temp
-    plt.plot(time[datastart:dataend], outdoorTemp[datastart:dataend], label="Outdoor", linestyle=':')
-    # Readability
-    plt.legend()
-    plt.xlabel('Time [hours]')
-    plt.ylabel('Temperature [° C]')
-    plt.xlim([time[datastart],time[dataend-1]])
-    plt.grid()
-    plt.show()
-
-# Output results to csv file -----------------------------------------------
-if "None" not in outFile and "none" not in outFile:
-    # Add title/label rows
-    files.insert(0,"")
-    totalPrice.insert(0,"Total HVAC Electricity Bill [$]")
-    avgDailyCost.insert(0,"Avg Daily Electricity Cost [$/day]")
-    totHeatElec.insert(0,"Total Heating Electricity [kWh]")
-    totCoolElec.insert(0,"Total Cooling Electricity [kWh]")
-    avgDailyEnergy.insert(0,"Avg Daily HVAC Electricity [kWh/day]")
-    meanDiff100.insert(0,"Mean Temp Diff from 100% Comfortable [°C]")
-    meanComfBand.insert(0,"Mean Comfort Band Percent [%]")
-    pctTimeComf90.insert(0,"Percent of occupied time within 90% comfort band [%]")
-    pctTimeComf80.insert(0,"Percent of occupied time within 80% comfort band [%]")
-    heatPrice.insert(0,"Total Heating Energy Cost [$]")
-    coolPrice.insert(0,"Total Cooling Energy Cost [$]")
-    # Put all 1D lists into a single 2D list to write
-    rows = [files,totalPrice,avgDailyCost,heatPrice, coolPrice, totHeatElec,totCoolElec,avgDailyEnergy,meanDiff100,meanComfBand,pctTimeComf90,pctTimeComf80]
-    outFile = "eppp_" + date_range + outFile
-    # Write file using csvwrite
-    with open(outFile,"w") as out:
-        writer = csv.writer(out)
-        for r in rows:
-            writer.writerow(r)
-    print("--------------------------------------------------\n")
-    print("Data successfully written to file as: " + outFile)
-
-print(closer)
+#  eppp.py    Identical to epPostProcess.py, with shorter name that is easier to type
+#  
+#  Author(s):   Brian Woo-Shem, Kaleb Pattawi
+#  Updated:     2026-10-17
+#  Version:     4.4 (Add parquet/feather/hdf5 export, multi-zone metrics, decimated and headless plots, importable API with lazy imports, --profile stage timing, PG&E tariff rules, cached occupancy setpoints, saved results, tariff sweep, streaming mode, parallel files, input cache, vectorized cost & comfort)
+#  
+#  Instructions:
+#   - Prerequisite libraries os, ipypublish, pandas, numpy, scipy
+#   - Requires epcost.py, epcomfort.py, epanalysis.py, epcache.py, eploader.py, epresults.py, epoccupancy.py, eptariff.py, epprofile.py, epplot.py, epzones.py and epexport.py in the same folder
+#   - Set analysis parameters in terminal OR by changing values in code below, marked by ===> <===
+#
+# Run As:
+#           python3 eppp.py < parameters >
+#
+# Or import it, eg. from a co-simulation that post-processes after every run without starting a new
+# Python each time. Importing eppp.py runs nothing; pandas, matplotlib etc. are only imported by the
+# functions that need them, on their first call, so later calls have no import cost:
+#           import eppp
+#           opts = eppp.defaultOptions(files=['run1.csv'], graph=False, outFile='none')
+#           out = eppp.postProcess(opts)     # out['results'] = one dict of metrics per file
+# or step by step: inputs = loadRun(opts), results = analyzeRun(opts, inputs), runSweep(),
+# plotResults(), exportSummary(). parseArgs() turns command line parameters into opts.
+#
+# < Parameters > can go in any order!
+#   inputfilename.csv  OR  input=inputfilename.csv  Any number of source EP data files to analyze
+#   output=[outputfilename].csv   File to output results to. Note output=none means no output file
+#
+#   graph=detail  Extra detail graph (not yet implemented, does nothing)
+#   graph=none    Suppress graphs
+#   graph=cool or graph=heat   Plot the cooling or heating setpoints of each file instead of indoor temperature
+#
+#   plot=file.png Save the graph to file.png (or .pdf, .svg, ...) instead of showing it. Needs no display.
+#   plot=each     Also save one graph per input file, as eppp_[date_range]_plot_[file].png unless plot=file.png is given
+#   plotdays=N    Save one graph per N days of the range instead of one for the whole range
+#   plotjobs=N    Render the saved graphs in up to N parallel worker processes. Default 1
+#                 Lines are decimated to the width of the figure (see epplot.py), so long runs plot quickly.
+#
+#   -v            Verbose. Additional dataframe outputs to terminal
+#
+#   days <startday> <endday>  Three inputs separated by space; startday and endday must be integers
+#                               this is the range of days to process days for
+#
+#   pconst <a> <b>  Three inputs separated by space; a = pricing multiplier, b = pricing offset
+#                               both can be floating point values.
+#
+#   price=l  or legacy       Accepts older price csv files from before getWholesaleCAISO. Default is style from getWholesaleCAISO
+#   price=d   Day-ahead
+#   price=r   Real-time. Default setting.
+#   price=E-1, E-TD-Z   PG&E retail rates, from their 5 minute price files
+#   price=E-TOU-C_S or E-TOU-C_W  E-TOU-C with summer or winter rates for the whole run
+#   price=E-TOU-C  E-TOU-C changing season by date. Needs tariff rules
+#   rules         Build PG&E time of use rates for the date range from the example rules in eptariff.py
+#                 instead of reading the price files. The example rates are not checked against PG&E tariff sheets
+#   rules=file.json  Same, with the rules in file.json (see eptariff.py). Rates without rules are still read from file
+#
+#   date=[date_range]     Set date range to get data for
+#
+#   -c=filename   Outputs comfort data file as "original_file_filename.csv"
+#   -c=none       Do not output comfort data file
+#
+#   format=parquet  Write the comfort and occupancy setpoint data as parquet instead of csv. Also format=feather
+#                   or format=hdf5. Default csv. Needs pyarrow (parquet, feather) or tables (hdf5), see epexport.py
+#   float32       Store the float columns of those files as 32 bit, half the size
+#   dataset=dir   Write every input file's comfort data into folder dir, partitioned by run, as
+#                 dir/run=[inputfile]/comfort.[format], so they can be read back as one table
+#
+#   ts=         Number of timesteps per hour
+#   calibration=  Number of EP calibration rows
+#   calibration=auto  Find the calibration rows from the Date/Time column. Run period should start on the first day of date=
+#
+#   jobs=N      Process up to N input files in parallel worker processes. Default 1
+#
+#   cache=on    Save parsed input files as binary sidecars (file.eppcache) and reuse them on later runs. Default
+#   cache=off   Always parse the input csv files
+#   cache=clear Delete all cached sidecars, then run with the cache on
+#
+#   results=on    Reuse each file's results from an earlier run with the same input files and parameters. Default
+#   results=off   Always recompute results
+#   results=clear Delete all saved results, then run with saved results on
+#
+#   stream      Read each input file in chunks of 50000 rows, keeping running totals instead of whole-run tables.
+#   stream=N    Same, with N rows per chunk. For year-long runs at fine timesteps. Does not use the cache.
+#               Outdoor temperature, occupancy and the occupancy setpoints are also read and written in chunks.
+#               Only the price (8 bytes per timestep) and, with graphs on, the plotted series are kept for the whole run.
+#
+#   zones=all     Also compute comfort and setpoint metrics for every zone found in the column headers, and
+#                 for the whole building, and write them to [inputfile]_zones.csv (see epzones.py)
+#   zones=A,B     Same, for zones A and B only. Cost, energy and the summary still use LIVING_UNIT1.
+#
+#   sweep=tariffs.csv  Also compute cost for every input file under every tariff in the grid file (see epcost.py).
+#                       Writes one row per (file, tariff) to eppp_[date_range]_sweep.csv
+#
+#   --profile   Print wall time, CPU time, peak memory and rows for each stage and input file (see epprofile.py),
+#               and write them to eppp_profile.json. --profile=file.json writes to file.json instead.
+
+#Import Scientific and numerical computing libraries --------------------
+# Only the standard library here. pandas, numpy, matplotlib and the ep*.py helpers are imported
+# inside the functions that use them, so that importing eppp.py and graph=none runs stay fast.
+import os
+import sys
+import csv
+from epprofile import enableProfile, profileOn, clock, recordSince, addRecords, printProfile, writeProfile, profileFile
+
+# Adds the .csv file extension if it is not already present to a string representing the output file name
+def addFileType(c):
+    if c[len(c)-4: len(c)] != ".csv": c = c + ".csv"
+    return c
+
+# UI
+header = '\n=================== epPostProcess.py V4.4 ==================='
+closer = '===========================================================\n'
+
+# Preset Values & Indices -----------------------------------------------
+# Values that can be designated here, or using command-line input. 
+# Command line input supercedes anything here.
+
+# < input= > ===> File Name(s) of Energy Plus result csv file(s) <=== 
+# List all of them here, separated by commas, eg. ["file1.csv", "file2.csv"]
+files = ["Demo_EP_Data.csv"]
+
+# < date= > ===> WHEN TO RUN - must match EP run period! <===
+# Legacy Options: 
+#   'Jan1thru7'
+#   'Feb12thru19'
+#   'Sept27-Oct3_SJ'
+date_range = '2020-08-01_2020-08-31'
+
+# < output= > ===> Default output csv file <===
+# Calling it "None" or "none" will make it not make this file
+outFile = "_summary.csv"
+
+# < days first last > ===> Start & End Day <=== 
+firstDay = 0  # 0 to 6
+lastDay = 7  # 1 to 7
+
+# < graph= > ===> Graph Settings <===
+# Display graph?
+graph = True
+# Show more detailed graph? - currently does nothing
+graphType = "normal"
+
+# < wholesale= > ===> Wholesale Data Type <===
+#   r = Real-Time
+#   d = Day-Ahead
+#   l = legacy = Older data, before GetWholesaleCAISO
+priceType = 'r'
+
+# < -c= > ===> Output Comfort Data <===
+# What name to add to the input file to designate the comfort data file as "InputFile_filename.csv"
+# Calling it "None" or "none" will make it output nothing
+comfortSuffix = "comfort.csv"
+pmultiplier = 8
+poffset = 0.015
+
+# < format= > ===> File format of the comfort and occupancy setpoint data <===
+# 'csv', 'parquet', 'feather' or 'hdf5', see epexport.py. float32 = store floats as 32 bit
+exportFormat = 'csv'
+float32 = False
+
+# < dataset= > ===> Folder to collect the comfort data of every file in, one partition per run <===
+# "" = write each comfort data file next to its input file
+dataset = ""
+
+# < rules= > ===> PG&E tariff rules instead of price files <===
+# "" = read the price files, 'builtin' = example rules in eptariff.py, or a json rules file
+tariffRules = ""
+
+# < -v > ===> Verbose - Show detailed outputs to command line <===
+verbose = False
+
+# < ts= > ===> Timestep Length [min] <===
+timestep = 5 # minutes
+
+# < calibration= > ===> Set working data range <=== 
+# How many rows of calibration data at beginning of file
+# Changes based on variables you are outputting, for default simulation use 2305-1
+# 'auto' finds them from where the run period starts
+numEPlusCalibrationRows = 2305 - 1  # -1 because first row is column headers
+
+# < jobs= > ===> Number of files to process in parallel <===
+# 1 = one file at a time
+jobs = 1
+
+# < cache= > ===> Cache parsed input files as binary sidecars next to them <===
+# See epcache.py. cache=clear deletes all cached sidecars before running
+useCache = True
+clearCache = False
+
+# < results= > ===> Reuse results saved by earlier runs with the same inputs and parameters <===
+# See epresults.py. results=clear deletes all saved results before running
+useResults = True
+clearSaved = False
+
+# < stream= > ===> Read input files in chunks of this many rows <===
+# For very long runs that do not fit in memory. 0 = read whole file at once
+streamRows = 0
+
+# < sweep= > ===> Tariff grid file to compute cost for every price scenario at once <===
+# See epcost.py for the file format. "" = no sweep
+sweepFile = ""
+
+# < zones= > ===> Zones for per-zone metrics <===
+# None = off, 'all' = every zone in the file, or a list of zone names
+zones = None
+
+# < --profile= > ===> File to write the stage profile to, when run with --profile <===
+profileJson = "eppp_profile.json"
+
+# < plot= > ===> Save graphs to this image file instead of showing them <===
+# None = show the graph in a window. plotEach = also one graph per file, plotDays = one graph per this many days (0 = whole range)
+plotFile = None
+plotEach = False
+plotDays = 0
+# < plotjobs= > ===> Number of graphs to render in parallel <===
+plotJobs = 1
+
+# Returns the options dict for a run: the preset values above, with any of them replaced by keyword
+# arguments of the same name, eg. defaultOptions(files=['run1.csv'], graph=False).
+# profile is the json file for the stage profile, or None if the run is not profiled.
+def defaultOptions(**changes):
+    opts = {'files': list(files), 'date_range': date_range, 'outFile': outFile, 'firstDay': firstDay,
+            'lastDay': lastDay, 'graph': graph, 'graphType': graphType, 'priceType': priceType,
+            'comfortSuffix': comfortSuffix, 'exportFormat': exportFormat, 'float32': float32, 'dataset': dataset,
+            'tariffRules': tariffRules, 'pmultiplier': pmultiplier, 'poffset': poffset, 'verbose': verbose,
+            'timestep': timestep, 'numEPlusCalibrationRows': numEPlusCalibrationRows, 'jobs': jobs,
+            'useCache': useCache, 'clearCache': clearCache, 'useResults': useResults, 'clearSaved': clearSaved,
+            'streamRows': streamRows, 'sweepFile': sweepFile, 'profile': None, 'plotFile': plotFile,
+            'plotEach': plotEach, 'plotDays': plotDays, 'plotJobs': plotJobs, 'zones': zones}
+    for k in changes:
+        if k not in opts: raise KeyError('Unknown eppp option: ' + k)
+    opts.update(changes)
+    return opts
+
+# Get parameter inputs from command line --------------------------------
+# Returns [options dict, number of input files given] for the parameters in argv (without the script name)
+def parseArgs(argv, opts=None):
+    if opts is None: opts = defaultOptions()
+    ns = len(argv)
+    i = 0
+    nf = 0
+    while i < ns:
+        if "--profile" in argv[i]: # must go first because file name may include .csv or other parameters
+            opts['profile'] = profileFile(argv[i], profileJson)
+        elif "plotjobs=" in argv[i]: # plot parameters must go before jobs and days
+            try: opts['plotJobs'] = int(argv[i].replace("plotjobs=",""))
+            except ValueError: print('Warning: invalid number of plot jobs, using default =', str(opts['plotJobs']))
+        elif "plotdays=" in argv[i]:
+            try: opts['plotDays'] = float(argv[i].replace("plotdays=",""))
+            except ValueError: print('Warning: invalid plot days, using default =', str(opts['plotDays']))
+        elif "plot=" in argv[i]:
+            if argv[i].replace("plot=","") == "each": opts['plotEach'] = True
+            else: opts['plotFile'] = argv[i].replace("plot=","")
+        elif "output=" in argv[i]: #must go before filenames because will include .csv in string
+            opts['outFile'] = addFileType(argv[i].replace("output=",""))
+        elif "sweep=" in argv[i]: #must go before filenames because will include .csv in string
+            opts['sweepFile'] = argv[i].replace("sweep=","")
+        elif "zones=" in argv[i]: # must go before filenames because zone names may include .csv
+            names = argv[i].replace("zones=","")
+            if names in ["none", "None", ""]: opts['zones'] = None
+            elif names == "all": opts['zones'] = 'all'
+            else: opts['zones'] = names.split(",")
+        elif "format=" in argv[i]:
+            opts['exportFormat'] = argv[i].replace("format=","")
+        elif argv[i] == "float32": opts['float32'] = True
+        elif "dataset=" in argv[i]: # must go before filenames because folder name may include .csv
+            opts['dataset'] = argv[i].replace("dataset=","")
+        elif argv[i] == "rules": opts['tariffRules'] = 'builtin'
+        elif argv[i].startswith("rules="): # must go before filenames because file name may include .csv
+            opts['tariffRules'] = argv[i].replace("rules=","")
+        elif "-c=" in argv[i]:
+            opts['comfortSuffix'] = addFileType(argv[i].replace("-c=",""))
+        elif ".csv" in argv[i] or "data=" in argv[i] or "input=" in argv[i]: # Number of files. First one replaces the default file
+            if nf==0: opts['files'] = [addFileType(argv[i].replace("data=","").replace("input=",""))]
+            else: opts['files'].append(addFileType(argv[i].replace("data=","").replace("input=",""))) # after that it adds more files to the list
+            nf += 1
+        elif "date=" in argv[i]:
+            opts['date_range'] = argv[i].replace("date=","")
+        elif "pconst" in argv[i]:
+            i += 1
+            try: opts['pmultiplier'] = float(argv[i])
+            except ValueError:
+                print('Warning: Invalid price multiplier, using default = 4 instead.')
+                i -= 1
+            except IndexError:
+                print('Warning: Missing price multiplier, using default = 4 instead.')
+                i -= 1
+            i += 1
+            try: 
+                opts['poffset'] = float(argv[i])
+            except ValueError:
+                print('Warning: Invalid price offset, using default = 0.10 instead.')
+                i -= 1
+            except IndexError:
+                print('Warning: Missing price offset, using default = 0.10 instead.')
+                i -= 1
+        elif "days" in argv[i]:
+            i += 1
+            try: opts['firstDay'] = int(argv[i])
+            except ValueError:
+                print('Warning: Invalid start day, using default = 0 instead.')
+                i -= 1
+            except IndexError:
+                print('Warning: Missing start day, using default = 0 instead.')
+                i -= 1
+            i += 1
+            try: opts['lastDay'] = int(argv[i])
+            except ValueError:
+                print('Warning: Invalid end day, using default = 7 instead.')
+                i -= 1
+            except IndexError:
+                print('Warning: Missing end day, using default = 7 instead.')
+                i -= 1
+        elif "graph=" in argv[i]:
+            if "detail" in argv[i]: opts['graphType'] = "detail"
+            elif "cool" in argv[i]: opts['graphType'] = "coolSetpoints"
+            elif "heat" in argv[i]: opts['graphType'] = "heatSetpoints"
+            elif "none" in argv[i]: opts['graph'] = False
+            else: print('Warning: invalid graph type, using default graph configuration instead.')
+        elif "-v" in argv[i]: opts['verbose'] = True
+        elif "price" in argv[i]:
+            if "=d" in argv[i]: opts['priceType'] = 'd'
+            elif "=r" in argv[i]: opts['priceType'] = 'r'
+            elif "E-1" in argv[i]: opts['priceType'] = 'E-1'
+            elif "E-TOU-C_S" in argv[i]: opts['priceType'] = 'E-TOU-C_Summer'
+            elif "E-TOU-C_W" in argv[i]: opts['priceType'] = 'E-TOU-C_Winter'
+            elif "E-TOU-C" in argv[i]: opts['priceType'] = 'E-TOU-C'
+            elif "E-TD-Z" in argv[i]: opts['priceType'] = 'E-TD-Z'
+            elif "=l" in argv[i]: opts['priceType'] = 'l'
+            else: print('Warning: invalid wholesale price type, using default, ', opts['priceType'], ' instead.')
+        elif "calibration" in argv[i]:
+            if "auto" in argv[i]: opts['numEPlusCalibrationRows'] = 'auto'
+            else:
+                try: opts['numEPlusCalibrationRows'] = int(argv[i].replace("calibration=",""))
+                except ValueError: print('Warning: invalid calibration rows, using default =', str(opts['numEPlusCalibrationRows']))
+        elif "cache=" in argv[i]:
+            if "off" in argv[i] or "none" in argv[i]: opts['useCache'] = False
+            elif "clear" in argv[i]: opts['clearCache'] = True
+            elif "on" not in argv[i]: print('Warning: invalid cache option, using default = on')
+        elif "results=" in argv[i]: # must go before ts
+            if "off" in argv[i] or "none" in argv[i]: opts['useResults'] = False
+            elif "clear" in argv[i]: opts['clearSaved'] = True
+            elif "on" not in argv[i]: print('Warning: invalid results option, using default = on')
+        elif "stream" in argv[i]:
+            opts['streamRows'] = 50000
+            if "=" in argv[i]:
+                try: opts['streamRows'] = int(argv[i].split("=")[1])
+                except ValueError: print('Warning: invalid stream chunk size, using default =', str(opts['streamRows']))
+        elif "jobs=" in argv[i]:
+            try: opts['jobs'] = int(argv[i].replace("jobs=",""))
+            except ValueError: print('Warning: invalid number of jobs, using default =', str(opts['jobs']))
+        elif "ts" in argv[i]:
+            try: opts['numEPlusCalibrationRows'] = int(argv[i].replace("ts=",""))
+            except ValueError: print('Warning: invalid timestep, using default =', str(opts['timestep']))
+        else: print('Warning: Unrecognized parameter. Using defaults instead.')
+        i += 1
+    return [opts, nf]
+
+# Delete cached input files and/or saved results if opts asks for it
+def clearSavedData(opts):
+    if opts['clearCache']:
+        from epcache import invalidate, CACHE_INDEX
+        invalidate(CACHE_INDEX)
+        print("Cleared cached input files.")
+    if opts['clearSaved']:
+        from epresults import clearResults
+        clearResults()
+        print("Cleared saved results.")
+
+# Load the inputs that are the same for every file: outdoor temperature (from the first file),
+# occupancy and occupancy adaptive setpoints, and price. Returns a dict with
+#   shared        read-only inputs for epanalysis.analyzeFiles
+#   outdoorTemp, time (hours from the start of each row, for plots), occsetpt
+# In stream mode (opts['streamRows']) see streamRun.
+def loadRun(opts):
+    import numpy as np
+    import pandas as pd
+    from eploader import loadEPlusCSV, dateRangeStart, EPPP_COLUMNS
+    from epcomfort import adaptiveBounds, comfortRange
+    from epoccupancy import occupancyStatus, occupancySetpointsCached, OCC_STATUS_FILE
+    from epexport import exportFormat, exportPath
+    # Suppress annoying warning
+    pd.set_option('mode.chained_assignment', None)
+
+    files = opts['files']
+    date_range = opts['date_range']
+    firstDay, lastDay = opts['firstDay'], opts['lastDay']
+    timestep = opts['timestep']
+    numEPlusCalibrationRows = opts['numEPlusCalibrationRows']
+
+    # Data range to plot
+    #datarows = 2016 # number of rows with data [0:2040]
+    dayrows = int(60 / timestep * 24) #Usually = 288 = int(datarows/7) = number of rows with data per day = timestepsperhour * 24
+    # Set bounds to plot. Integer to multiply is the day number, must be on bounds (typically 0 - 7)
+    datastart = int(firstDay * dayrows)
+    dataend = int(lastDay * dayrows) - 1
+    if opts['verbose']:
+        print("datastart = ", datastart)
+        print("dataend = ", dataend)
+
+    # Streaming: nothing is read for the whole run here. Outdoor temperature (from the first file) and
+    # occupancy are read in chunks alongside each file by analyzeFileStream, and the setpoints are
+    # computed and written chunk by chunk. Only the plotted outdoor temperature is kept, if graph is on.
+    if opts['streamRows']:
+        return streamRun(opts, datastart, dataend)
+
+    # Get unified time and indoor temp --------------------------------------
+    # Same file and columns are read again by analyzeRun, so with the cache on the second read is a cache hit
+    # The energyplus calibration part is removed while loading
+    stageStart = clock()
+    data = loadEPlusCSV(files[0], EPPP_COLUMNS, numEPlusCalibrationRows, dateRangeStart(date_range), useCache=opts['useCache'])
+    if opts['verbose']:
+        print("Source Data Matrix: ")
+        print(data.head())
+    # Global outdoor temperature
+    outdoorTemp = data['Environment:Site Outdoor Air Drybulb Temperature [C](TimeStep)']
+    recordSince('outdoor temperature', stageStart, rows=len(data))
+    # Total data time
+    time = np.linspace(0,24*(lastDay-firstDay),len(data['Date/Time']))
+
+    # Get generated occupancy data -------------------------------------------
+    stageStart = clock()
+    occupancy_data = occupancyStatus(OCC_STATUS_FILE, nrows=(dataend))
+
+    # Compute thermal comfort bounds based on outdoor temp -------------------
+    # Compute 100% comfort bounds, clipped to min or max when temps too low or too high (See adaptive 100)
+    temp_100comfort_heating, temp_100comfort_cooling = adaptiveBounds(outdoorTemp)
+    temp_100comfort_heating = pd.Series(temp_100comfort_heating, index=outdoorTemp.index)
+    temp_100comfort_cooling = pd.Series(temp_100comfort_cooling, index=outdoorTemp.index)
+
+    # Determine Occupancy Adaptive Comfort Bounds -------------------------------------
+    # Saved with the results and only recomputed when the occupancy files, weather or parameters change
+    print("Comf range expansion: ", comfortRange(0.90))
+    fmt = exportFormat(opts['exportFormat'])
+    occsetptFile = exportPath('OccupancySetpoints_' + date_range + '.csv', fmt)
+    occsetpt, saved = occupancySetpointsCached(outdoorTemp, date_range, 0.90, timestep=timestep, statusRows=dataend,
+                                               probRows=int(24*(lastDay-firstDay)+2), exportFile=occsetptFile,
+                                               useSaved=opts['useResults'], exportFormat=fmt, float32=opts['float32'])
+    print("Computed occupancy-based adaptive setpoints:" + (" (unchanged, using saved setpoints)" if saved else ""))
+    print(occsetpt)
+    print("\nOccupancy Setpoints Exported to: ", occsetptFile)
+    recordSince('occupancy setpoints', stageStart, rows=len(outdoorTemp))
+
+    shared = sharedInputs(opts, datastart, dataend, fmt)
+    shared.update({'occupancy': occupancy_data, 'outdoorTemp': outdoorTemp, 'comfHeat100': temp_100comfort_heating,
+                   'comfCool100': temp_100comfort_cooling})
+    return {'shared': shared, 'outdoorTemp': outdoorTemp, 'time': time, 'occsetpt': occsetpt}
+
+# loadRun for stream mode: the occupancy setpoints are computed and written chunk by chunk, and the
+# shared inputs tell analyzeFileStream where to read outdoor temperature and occupancy from. Returns
+# the same dict as loadRun, with occsetpt None, and outdoorTemp and time None unless graph is on.
+def streamRun(opts, datastart, dataend):
+    import numpy as np
+    import pandas as pd
+    from eploader import findRunPeriodStart, outdoorChunks, dateRangeStart
+    from epcomfort import comfortRange
+    from epoccupancy import occupancySetpointsStream, OCC_STATUS_FILE
+    from epexport import exportFormat, exportPath
+    files = opts['files']
+    date_range = opts['date_range']
+    chunkRows = opts['streamRows']
+    stageStart = clock()
+    outdoorSkip = opts['numEPlusCalibrationRows']
+    if outdoorSkip == 'auto': outdoorSkip = findRunPeriodStart(files[0], dateRangeStart(date_range), chunkRows)
+    recordSince('outdoor temperature', stageStart)
+
+    # Outdoor temperature is only kept for the plot
+    stageStart = clock()
+    kept = []
+    def keep(chunks):
+        for c in chunks:
+            if opts['graph']: kept.append(c)
+            yield c
+    print("Comf range expansion: ", comfortRange(0.90))
+    fmt = exportFormat(opts['exportFormat'])
+    occsetptFile = exportPath('OccupancySetpoints_' + date_range + '.csv', fmt)
+    rows = occupancySetpointsStream(keep(outdoorChunks(files[0], outdoorSkip, chunkRows)), 0.90,
+                                    timestep=opts['timestep'], statusRows=dataend,
+                                    probRows=int(24*(opts['lastDay']-opts['firstDay'])+2), exportFile=occsetptFile,
+                                    exportFormat=fmt, float32=opts['float32'], chunkRows=chunkRows)
+    print("Computed occupancy-based adaptive setpoints: (streamed, " + str(rows) + " rows)")
+    print("\nOccupancy Setpoints Exported to: ", occsetptFile)
+    recordSince('occupancy setpoints', stageStart, rows=rows)
+
+    shared = sharedInputs(opts, datastart, dataend, fmt)
+    shared.update({'occupancyFile': OCC_STATUS_FILE, 'occupancyRows': dataend, 'outdoorFile': files[0],
+                   'outdoorSkip': outdoorSkip})
+    outdoorTemp, time = None, None
+    if opts['graph']:
+        outdoorTemp = pd.concat(kept) if kept else pd.Series(dtype=np.float64)
+        time = np.linspace(0,24*(opts['lastDay']-opts['firstDay']),rows)
+    return {'shared': shared, 'outdoorTemp': outdoorTemp, 'time': time, 'occsetpt': None}
+
+# Read-only inputs shared by every file, with price, for loadRun and streamRun. Computed once, then handed
+# to each worker in parallel mode. occupancy, outdoorTemp and the 100% comfort bounds are None.
+def sharedInputs(opts, datastart, dataend, fmt):
+    import pandas as pd
+    from eploader import dateRangeStart
+    from epcost import loadPrice, priceFile
+    from eptariff import tariffKey, loadTariffRules
+    from epoccupancy import OCC_STATUS_FILE, OCC_PROB_FILE
+    from epresults import runKey
+    files = opts['files']
+    date_range = opts['date_range']
+    firstDay, lastDay = opts['firstDay'], opts['lastDay']
+    priceType = opts['priceType']
+    timestep = opts['timestep']
+    numEPlusCalibrationRows = opts['numEPlusCalibrationRows']
+
+    # Get pricing data -------------------------------------------------------
+    # Below we get the wholesale price and convert to price for the users using a simple equation (the way we determine the users price will likely change in the future). Then we can determine the total cost over the whole simulation. Similar we can print out the total heating/cooling energy over the simulation.
+    stageStart = clock()
+    tariffs = loadTariffRules(opts['tariffRules'])
+    if 'l' in priceType:
+        wholesale = pd.read_excel('WholesalePrice.xlsx', sheet_name=date_range)
+        price = wholesale.apply(lambda x: 4*x/1000 + 0.1)
+        try: price.columns = ['Price [$/MWh]']
+        except ValueError: price.columns = ['Price [$/MWh]', "col2", "col3"]
+
+    # PG&E rates from tariff rules or file, or CAISO wholesale prices with multiplier and offset
+    else:
+        eprice = loadPrice(priceType, date_range, opts['pmultiplier'], opts['poffset'], dataend+1, timestep, tariffs)
+    recordSince('price', stageStart, rows=dataend+1)
+
+    shared = {'priceType': priceType, 'eprice': None, 'legacyPrice': None, 'occupancy': None,
+              'outdoorTemp': None, 'comfHeat100': None, 'comfCool100': None,
+              'datastart': datastart, 'dataend': dataend, 'firstDay': firstDay, 'lastDay': lastDay,
+              'calibration': numEPlusCalibrationRows, 'comfortSuffix': opts['comfortSuffix'], 'verbose': opts['verbose'],
+              'graph': opts['graph'], 'cache': opts['useCache'], 'startDate': dateRangeStart(date_range),
+              'stream': opts['streamRows'], 'sweep': bool(opts['sweepFile']), 'results': None, 'profile': profileOn(),
+              'zones': opts['zones'], 'timestep': timestep, 'exportFormat': fmt, 'float32': opts['float32'],
+              'dataset': opts['dataset']}
+    if 'l' in priceType: shared['legacyPrice'] = price
+    else: shared['eprice'] = eprice
+
+    # Saved results are keyed by these parameters and the contents of the shared input files
+    if opts['useResults']:
+        params = {'date_range': date_range, 'firstDay': firstDay, 'lastDay': lastDay, 'timestep': timestep,
+                  'calibration': numEPlusCalibrationRows, 'priceType': priceType, 'pmultiplier': opts['pmultiplier'],
+                  'poffset': opts['poffset'], 'comfortSuffix': opts['comfortSuffix'], 'verbose': opts['verbose'],
+                  'tariff': tariffKey(priceType, tariffs), 'zones': opts['zones'],
+                  'exportFormat': fmt, 'float32': opts['float32'], 'dataset': opts['dataset']}
+        pfile = 'WholesalePrice.xlsx' if 'l' in priceType else priceFile(priceType, date_range)
+        shared['results'] = runKey(params, [files[0], OCC_STATUS_FILE, OCC_PROB_FILE, pfile])
+    return shared
+
+# Getting data from EP files ---------------------------------------------
+# Analyze every input file with the inputs from loadRun. Prints each file's output and returns the
+# epanalysis.analyzeFile result dict of every file that was found, in the order of opts['files'].
+def analyzeRun(opts, inputs):
+    from epanalysis import analyzeFiles
+    if opts['jobs'] > 1: print("Processing files with", opts['jobs'], "parallel jobs")
+    results = []
+    for res in analyzeFiles(opts['files'], inputs['shared'], opts['jobs']):
+        for line in res['log']: print(line)
+        addRecords(res.get('profile'))
+        if res['found']: results.append(res)
+    return results
+
+# Tariff sweep: cost of every (file, tariff) pair in one matrix product ----
+# Needs results from a run with opts['sweepFile'] set. Returns the sweep file written, or None.
+def runSweep(opts, inputs, results):
+    if not opts['sweepFile'] or len(results) == 0: return None
+    from epcost import readTariffGrid, priceMatrix, sweepCost, writeSweep
+    from eptariff import loadTariffRules
+    shared = inputs['shared']
+    stageStart = clock()
+    labels = [res['file'] for res in results]
+    tariffs = readTariffGrid(opts['sweepFile'], (opts['pmultiplier'], opts['poffset']))
+    print("--------------------------------------------------\n")
+    print("Tariff sweep: ", len(labels), " files x ", len(tariffs), " tariffs")
+    sweep = sweepCost(priceMatrix(tariffs, opts['date_range'], shared['datastart'], shared['dataend'], opts['timestep'],
+                                  loadTariffRules(opts['tariffRules'])),
+                      [res['energy'] for res in results], labels)
+    sweepOut = "eppp_" + opts['date_range'] + "_sweep.csv"
+    writeSweep(sweepOut, labels, tariffs, sweep, opts['lastDay'] - opts['firstDay'])
+    print("Tariff sweep written to file as: " + sweepOut)
+    recordSince('sweep', stageStart, rows=len(labels)*len(tariffs))
+    return sweepOut
+
+# Plot indoor temp, outdoor temp, and heating/cooling setpoint of every file (see epplot.py).
+# Needs results from a run with opts['graph'] on. With no plot files set in opts, draws on a new
+# pyplot figure, shows it if show, and returns it. Otherwise renders the image files without a
+# display and returns their names.
+def plotResults(opts, inputs, results, show=True):
+    from epplot import overlayLines, overlaySpec, drawOverlay, renderFigures, figurePath
+    stageStart = clock()
+    shared = inputs['shared']
+    datastart, dataend = shared['datastart'], shared['dataend']
+    time = inputs['time'][datastart:dataend]
+    outdoor = inputs['outdoorTemp'].to_numpy()[datastart:dataend]
+    lines = overlayLines(results, outdoor, opts['graphType'])
+    if opts['plotFile'] is None and not opts['plotEach'] and not opts['plotDays']:
+        # Plotting libraries are only imported when there is something to show
+        from ipypublish import nb_setup
+        import matplotlib.pyplot as plt
+        fig = plt.figure()
+        drawOverlay(fig.gca(), overlaySpec(time, lines))
+        if show: plt.show()
+        recordSince('plot', stageStart)
+        return fig
+
+    path = opts['plotFile'] or "eppp_" + opts['date_range'] + "_plot.png"
+    # Whole range, or one window of plotDays days at a time: [image file, title, first row, end row]
+    windows = [[path, None, 0, len(time)]]
+    if opts['plotDays']:
+        dayrows = int(60 / opts['timestep'] * 24)
+        step = max(1, int(round(opts['plotDays'] * dayrows)))
+        windows = []
+        for lo in range(0, len(time), step):
+            part = "days{:g}-{:g}".format(round(opts['firstDay'] + lo/dayrows, 2),
+                                          round(opts['firstDay'] + min(lo + step, len(time))/dayrows, 2))
+            windows.append([figurePath(path, part), part, lo, lo + step])
+    specs = []
+    for wpath, title, lo, hi in windows:
+        specs.append(overlaySpec(time, lines, wpath, title, lo, hi))
+        if opts['plotEach']:
+            for res in results:
+                name = os.path.splitext(os.path.basename(res['file']))[0]
+                specs.append(overlaySpec(time, overlayLines([res], outdoor, opts['graphType']), figurePath(wpath, name),
+                                         title, lo, hi))
+    files = renderFigures(specs, opts['plotJobs'])
+    for f in files: print("Graph saved to: " + f)
+    recordSince('plot', stageStart, rows=len(time)*len(lines))
+    return files
+
+# Summary table of results: one list per row, with the row title first and one value per file
+def summaryRows(results):
+    names = [["", 'file'],
+             ["Total HVAC Electricity Bill [$]", 'totalPrice'],
+             ["Avg Daily Electricity Cost [$/day]", 'avgDailyCost'],
+             ["Total Heating Energy Cost [$]", 'heatPrice'],
+             ["Total Cooling Energy Cost [$]", 'coolPrice'],
+             ["Total Heating Electricity [kWh]", 'totHeatElec'],
+             ["Total Cooling Electricity [kWh]", 'totCoolElec'],
+             ["Avg Daily HVAC Electricity [kWh/day]", 'avgDailyEnergy'],
+             ["Mean Temp Diff from 100% Comfortable [°C]", 'meanDiff100'],
+             ["Mean Comfort Band Percent [%]", 'meanComfBand'],
+             ["Percent of occupied time within 90% comfort band [%]", 'pctTimeComf90'],
+             ["Percent of occupied time within 80% comfort band [%]", 'pctTimeComf80']]
+    return [[title] + [res[k] for res in results] for title, k in names]
+
+# Output results to csv file -----------------------------------------------
+# Writes the summary to eppp_[date_range][outFile] unless opts['outFile'] is none. Returns the file written, or None.
+def exportSummary(opts, results):
+    if "None" in opts['outFile'] or "none" in opts['outFile']: return None
+    stageStart = clock()
+    outFile = "eppp_" + opts['date_range'] + opts['outFile']
+    # Write file using csvwrite
+    with open(outFile,"w") as out:
+        writer = csv.writer(out)
+        for r in summaryRows(results):
+            writer.writerow(r)
+    print("--------------------------------------------------\n")
+    print("Data successfully written to file as: " + outFile)
+    recordSince('summary export', stageStart, rows=len(results))
+    return outFile
+
+# Whole post-processing run for opts (see defaultOptions): load, analyze every file, sweep, plot
+# and export. Returns a dict with inputs (see loadRun), results (one dict per file found),
+# summary and sweep (files written, or None).
+def postProcess(opts):
+    clearSavedData(opts)
+    print("Processing Files: ")
+    print(opts['files'])
+    inputs = loadRun(opts)
+    results = analyzeRun(opts, inputs)
+    sweepOut = runSweep(opts, inputs, results)
+    if opts['graph']: plotResults(opts, inputs, results)
+    summary = exportSummary(opts, results)
+    return {'inputs': inputs, 'results': results, 'summary': summary, 'sweep': sweepOut}
+
+# Command line run: parse argv (default sys.argv), post-process and print the profile if asked for
+def main(argv=None):
+    if argv is None: argv = sys.argv[1:]
+    # --profile is checked before anything else so that the time of the imports is recorded too
+    if any(a.startswith("--profile") for a in argv): enableProfile()
+    print(header)
+    opts, nf = parseArgs(argv)
+    stageStart = clock()
+    # Import the analysis modules here, not on first use, so that --profile shows their import time as its own stage
+    import pandas, epanalysis, epoccupancy, epcost
+    recordSince('imports', stageStart)
+    # UI
+    if nf == 0: print('FYI: Using preset input data files from code.')
+    out = postProcess(opts)
+    if profileOn():
+        printProfile()
+        writeProfile(opts['profile'])
+        print("\nProfile written to: " + opts['profile'])
+    print(closer)
+    return out
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+# epprices.py
+# Local store of CAISO wholesale prices, queried by market and date window
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# Prices are ingested once into one binary array per market and year, at 5 minute resolution:
+#       ~/.cache/eppp/prices/RT/2020.npy     (or set EPPP_PRICE_DIR)
+# Timestep k of a year is minutes 5k to 5k+5 after midnight on Jan 1, in Pacific Standard Time
+# (no daylight saving, like EnergyPlus). Values are $/MWh, NaN where nothing has been ingested.
+# The arrays are memory-mapped, so a query within one year at a 5 minute timestep (or a whole
+# multiple of it) is a slice of the mapped file, without reading or copying it. Other timesteps
+# and windows across New Year are copied.
+#
+# Ways in:
+#   - the WholesaleDayAhead_<date_range>.csv / WholesaleRealTime_<date_range>.csv files made for
+#     eppp.py (see Get CAISO Pricing Data.pdf): one price per run timestep from the first day of
+#     the date range. epcost.py ingests these automatically the first time it reads one with a
+#     timestep of 5 minutes or a multiple of it, and again whenever the file or timestep changes.
+#   - CAISO OASIS LMP exports (csv) with INTERVALSTARTTIME_GMT, INTERVALENDTIME_GMT and MW or VALUE
+#     columns. Hourly day-ahead and 15 minute real-time intervals are held over each 5 minute step.
+# The store is shared by every file of a market, so an ingest that would change prices already
+# stored for the same timesteps is refused (ValueError), and epcost.py reads that price file
+# directly instead. A window query therefore always returns the prices of the file it was ingested
+# from. With overwrite=True the new prices replace the old ones, and every price file of the market
+# is checked again before it is next used from the store.
+#
+# Run As:
+#           python3 epprices.py
+# after setting the files to ingest at the bottom of this file, or import priceWindow().
+
+import os
+import numpy as np
+import pandas as pd
+from epcache import fileKey, readIndex, writeIndex
+
+PRICE_DIR = os.environ.get('EPPP_PRICE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'eppp', 'prices'))
+# Files already ingested: {path: fileKey}
+PRICE_INDEX = os.path.join(PRICE_DIR, 'index.json')
+
+# Resolution of the store [minutes]
+PRICE_TIMESTEP = 5
+
+# eppp.py priceType -> market
+MARKETS = {'r': 'RT', 'd': 'DA'}
+
+# Offset of Pacific Standard Time from GMT
+PST_OFFSET = np.timedelta64(-8*60, 'm')
+
+# Arrays already mapped: {path: [mtime, array]}
+_mapped = {}
+
+# Store file of a market and year
+def storePath(market, year):
+    return os.path.join(PRICE_DIR, market, str(year) + '.npy')
+
+# Number of store timesteps in a year
+def yearLength(year):
+    minutes = np.datetime64(str(year + 1), 'm') - np.datetime64(str(year), 'm')
+    return int(minutes.astype(np.int64))//PRICE_TIMESTEP
+
+# Returns [year, store timestep of the year] for each datetime64 in times (PST)
+def yearSteps(times):
+    times = np.asarray(times, dtype='datetime64[m]')
+    years = times.astype('datetime64[Y]')
+    steps = (times - years.astype('datetime64[m]')).astype(np.int64)//PRICE_TIMESTEP
+    return [years.astype(np.int64) + 1970, steps]
+
+# Returns the read-only mapped array of a market and year, or None if nothing is stored for it
+def storedYear(market, year):
+    path = storePath(market, year)
+    try: mtime = os.stat(path).st_mtime_ns
+    except OSError: return None
+    if path not in _mapped or _mapped[path][0] != mtime:
+        _mapped[path] = [mtime, np.load(path, mmap_mode='r')]
+    return _mapped[path][1]
+
+# Raise ValueError if any of prices differs from a price already stored for the same timestep
+def _checkAgrees(market, years, steps, prices, source):
+    for year in np.unique(years):
+        arr = storedYear(market, year)
+        if arr is None: continue
+        sel = years == year
+        old = arr[steps[sel]]
+        new = prices[sel]
+        both = ~np.isnan(old) & ~np.isnan(new)
+        if not np.array_equal(old[both], new[both]):
+            raise ValueError(source + ' has ' + market + ' prices that differ from those already stored for ' + str(year))
+
+# Write prices [$/MWh] for the store timesteps starting at times (datetime64, PST). Unless overwrite,
+# raises ValueError without storing anything if they differ from prices already stored.
+def storePrices(market, times, prices, overwrite=False, source='Data'):
+    years, steps = yearSteps(times)
+    prices = np.asarray(prices, dtype=np.float64)
+    if overwrite: _forgetMarket(market)
+    else: _checkAgrees(market, years, steps, prices, source)
+    for year in np.unique(years):
+        path = storePath(market, year)
+        if os.path.exists(path):
+            arr = np.load(path, mmap_mode='r+')
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            arr = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(yearLength(year),))
+            arr[:] = np.nan
+        sel = years == year
+        arr[steps[sel]] = prices[sel]
+        arr.flush()
+        del arr
+        _mapped.pop(path, None)
+
+# Ingest a price file made for eppp.py: one price [$/MWh] per timestep [minutes] from midnight on start
+# (datetime64 or 'YYYY-MM-DD'). timestep must be a multiple of 5 minutes, the resolution of the store.
+# Returns the number of prices stored. See top of file for overwrite.
+def ingestWindowFile(path, market, start, timestep=PRICE_TIMESTEP, overwrite=False):
+    per = timestep//PRICE_TIMESTEP
+    if per < 1 or per*PRICE_TIMESTEP != timestep:
+        raise ValueError('Price files can only be stored at a multiple of 5 minutes, not ' + str(timestep))
+    prices = np.atleast_1d(np.genfromtxt(path, delimiter=',', usecols=0))
+    # Each price covers timestep/PRICE_TIMESTEP store timesteps
+    times = np.datetime64(start, 'm') + np.arange(len(prices)*per)*np.timedelta64(PRICE_TIMESTEP, 'm')
+    storePrices(market, times, np.repeat(prices, per), overwrite, path)
+    _markIngested(path, market, timestep, len(prices))
+    return len(prices)
+
+# Ingest a CAISO OASIS LMP export. Only total LMP rows are used if the file has other price components.
+# Returns the number of intervals stored. See top of file for overwrite.
+def ingestOASIS(path, market, overwrite=False):
+    data = pd.read_csv(path)
+    for col, keep in [('XML_DATA_ITEM', 'LMP_PRC'), ('LMP_TYPE', 'LMP')]:
+        if col in data.columns: data = data[data[col] == keep]
+    value = 'MW' if 'MW' in data.columns else 'VALUE'
+    start = _oasisTimes(data['INTERVALSTARTTIME_GMT'])
+    end = _oasisTimes(data['INTERVALENDTIME_GMT'])
+    # Every store timestep of every interval
+    n = ((end - start).astype(np.int64)//PRICE_TIMESTEP).clip(min=1)
+    first = np.repeat(start, n)
+    offset = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    storePrices(market, first + offset*np.timedelta64(PRICE_TIMESTEP, 'm'), np.repeat(data[value].to_numpy(), n),
+                overwrite, path)
+    _markIngested(path, market)
+    return len(data)
+
+# OASIS GMT timestamps (eg. 2020-08-01T07:00:00-00:00) to datetime64 PST
+def _oasisTimes(col):
+    times = pd.to_datetime(col, utc=True).dt.tz_localize(None).to_numpy().astype('datetime64[m]')
+    return times + PST_OFFSET
+
+# Remember that path has been ingested as it is now, into market with timestep and rows prices
+# (None for OASIS exports)
+def _markIngested(path, market, timestep=None, rows=None):
+    index = readIndex(PRICE_INDEX)
+    index[os.path.abspath(path)] = {'key': fileKey(path), 'market': market, 'timestep': timestep, 'rows': rows}
+    writeIndex(PRICE_INDEX, index)
+
+# Forget every file ingested into market, so that each is checked against the store again
+def _forgetMarket(market):
+    index = readIndex(PRICE_INDEX)
+    writeIndex(PRICE_INDEX, {k: v for k, v in index.items() if not isinstance(v, dict) or v.get('market') != market})
+
+# Number of prices of price file path if it has been ingested into market with timestep and has not
+# changed since, else None
+def ingestedRows(path, market, timestep=PRICE_TIMESTEP):
+    entry = readIndex(PRICE_INDEX).get(os.path.abspath(path))
+    if not isinstance(entry, dict): return None
+    try: key = fileKey(path)
+    except OSError: return None
+    if entry.get('key') != key or entry.get('market') != market or entry.get('timestep') != timestep: return None
+    return entry.get('rows')
+
+# Prices [$/MWh] of a market for nsteps timesteps [minutes] from midnight on start (datetime64 or
+# 'YYYY-MM-DD'). Timestep must be a multiple of 5 minutes or divide into 5 minutes; each value is
+# the price at the start of its timestep. Returns None if any of the window is not in the store.
+def priceWindow(market, start, nsteps, timestep=PRICE_TIMESTEP):
+    start = np.datetime64(start, 'm')
+    if timestep >= PRICE_TIMESTEP:
+        per = timestep//PRICE_TIMESTEP
+        if per*PRICE_TIMESTEP != timestep: raise ValueError('Price timestep must be a multiple of 5 minutes, not ' + str(timestep))
+        rows = _storeSlice(market, start, (nsteps - 1)*per + 1)
+        if rows is None: return None
+        rows = rows[::per]
+    else:
+        per = PRICE_TIMESTEP//timestep
+        if per*timestep != PRICE_TIMESTEP: raise ValueError('Price timestep must divide into 5 minutes, not ' + str(timestep))
+        rows = _storeSlice(market, start, -(-nsteps//per))
+        if rows is None: return None
+        rows = np.repeat(rows, per)[:nsteps]
+    if np.isnan(rows).any(): return None
+    return rows
+
+# n store timesteps from start (datetime64[m]), a view of the mapped year if it is within one year
+def _storeSlice(market, start, n):
+    years, steps = yearSteps([start])
+    year, k = int(years[0]), int(steps[0])
+    parts = []
+    while n > 0:
+        arr = storedYear(market, year)
+        if arr is None: return None
+        part = arr[k:k + n]
+        parts.append(part)
+        n -= len(part)
+        year, k = year + 1, 0
+    return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+if __name__ == '__main__':
+    # PARAMETER VARIABLES TO CHANGE -----------------------------------------
+    # Files to ingest: [file, market ('RT' or 'DA'), first day for eppp.py price files or None for OASIS exports]
+    # Price files are one price per timestep [minutes]. overwrite = replace prices already stored
+    timestep = PRICE_TIMESTEP
+    overwrite = False
+    sources = [["WholesaleRealTime_2020-08-01_2020-08-31.csv", 'RT', '2020-08-01'],
+               ["WholesaleDayAhead_2020-08-01_2020-08-31.csv", 'DA', '2020-08-01']]
+
+    # Main processing code --------------------------------------------------
+    print('\n================ CAISO Price Store V1.0 ================')
+    for path, market, start in sources:
+        if start is None: n = ingestOASIS(path, market, overwrite)
+        else: n = ingestWindowFile(path, market, start, timestep, overwrite)
+        print("Stored ", n, " ", market, " prices from:   " + path)
+    print("Price store: " + PRICE_DIR)
+    print('\n=======================================================\n')
@@ -0,0 +1,123 @@
+# epprofile.py
+# Per-stage profiling for eppp.py and mesoweatherepw.py (--profile)
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# Mark each named stage of a script with
+#       stageStart = clock()
+#       data = ...
+#       recordSince('load', stageStart, f, len(data))
+# With profiling on, every stage records wall time, CPU time, rows processed, and how much the peak
+# resident memory (RSS) of the process grew during the stage: 0 if the stage never used more memory
+# than an earlier stage had already, so the stage that sets the peak stands out. Repeated stages with
+# the same name and file (eg. once per chunk) are added together. With profiling off, clock() returns
+# None and recordSince() returns at once, so the instrumented code runs as before.
+#
+# Stages recorded in worker processes (eppp.py jobs=N) are sent back with each file's results,
+# see takeRecords() and addRecords().
+#
+# Uses only the standard library so it can be imported before anything else and also time the
+# imports. Peak RSS needs the resource module, which is not available on Windows.
+
+import os
+import sys
+import json
+import time
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_profile = {'on': False, 'start': None, 'records': {}}
+
+# Returns [wall time [s], CPU time [s], peak RSS so far [MB] or None] now, or None if profiling is off
+def clock():
+    if not _profile['on']: return None
+    return [time.perf_counter(), time.process_time(), peakRSS()]
+
+# Peak RSS of this process so far [MB], or None if not available
+def peakRSS():
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return peak/1e6 if sys.platform == 'darwin' else peak/1e3
+
+def enableProfile():
+    _profile['on'] = True
+    _profile['start'] = clock()
+
+def profileOn():
+    return _profile['on']
+
+# Growth [MB] of peak RSS from clock() start to clock() now, or None if not available
+def _growth(start, now):
+    if start[2] is None or now[2] is None: return None
+    return now[2] - start[2]
+
+# Add wall and CPU time [s], rows and peak RSS growth [MB] to the record of stage name for file
+def _add(name, file, wall, cpu, rows, rss):
+    rec = _profile['records'].get((name, file))
+    if rec is None:
+        rec = {'stage': name, 'file': file, 'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'rssGrowth': None, 'rows': 0}
+        _profile['records'][(name, file)] = rec
+    rec['calls'] += 1
+    rec['wall'] += wall
+    rec['cpu'] += cpu
+    rec['rows'] += int(rows or 0)
+    if rss is not None: rec['rssGrowth'] = (rec['rssGrowth'] or 0) + rss
+
+# Record stage name as running from start = clock() until now. file = input file the stage works on, if any.
+# Nothing is recorded if start is None, ie. profiling was off when the stage started.
+def recordSince(name, start, file=None, rows=0):
+    if not _profile['on'] or start is None: return
+    now = clock()
+    _add(name, file, now[0] - start[0], now[1] - start[1], rows, _growth(start, now))
+
+# Remove and return the records for file, eg. to send them back from a worker process
+def takeRecords(file):
+    keys = [k for k in _profile['records'] if k[1] == file]
+    return [_profile['records'].pop(k) for k in keys]
+
+# Add records from takeRecords, eg. from a worker process
+def addRecords(records):
+    for rec in records or []:
+        key = (rec['stage'], rec['file'])
+        if key in _profile['records']:
+            mine = _profile['records'][key]
+            for k in ['calls', 'wall', 'cpu', 'rows']: mine[k] += rec[k]
+            if rec['rssGrowth'] is not None: mine['rssGrowth'] = (mine['rssGrowth'] or 0) + rec['rssGrowth']
+        else:
+            _profile['records'][key] = dict(rec)
+
+# Returns all records in the order the stages were first run, with a 'total' record for the whole run
+def profileRecords():
+    records = list(_profile['records'].values())
+    if _profile['start'] is not None:
+        now = clock()
+        records.append({'stage': 'total', 'file': None, 'calls': 1, 'wall': now[0] - _profile['start'][0],
+                        'cpu': now[1] - _profile['start'][1], 'rssGrowth': _growth(_profile['start'], now), 'rows': 0})
+    return records
+
+# Print the profile as a table
+def printProfile():
+    print('\n{:<22}{:<28}{:>6}{:>10}{:>10}{:>10}{:>10}{:>12}'.format('Stage', 'File', 'Calls', 'Wall [s]', 'CPU [s]',
+                                                                    'RSS +MB', 'Rows', 'Rows/s'))
+    for rec in profileRecords():
+        f = os.path.basename(rec['file']) if rec['file'] else ''
+        rss = '{:.1f}'.format(rec['rssGrowth']) if rec['rssGrowth'] is not None else '-'
+        rate = '{:.0f}'.format(rec['rows']/rec['wall']) if rec['rows'] and rec['wall'] > 0 else ''
+        print('{:<22}{:<28}{:>6}{:>10.4f}{:>10.4f}{:>10}{:>10}{:>12}'.format(rec['stage'], f[:27], rec['calls'],
+              rec['wall'], rec['cpu'], rss, rec['rows'] or '', rate))
+    if peakRSS() is not None: print('Peak RSS of the process: {:.1f} MB'.format(peakRSS()))
+
+# Write the profile to a json file
+def writeProfile(path):
+    with open(path, 'w') as out:
+        json.dump({'script': os.path.basename(sys.argv[0]), 'argv': sys.argv[1:], 'peakRSS': peakRSS(),
+                   'stages': profileRecords()}, out, indent=1)
+
+# Returns the json file name from a --profile or --profile=file.json argument, default default
+def profileFile(arg, default):
+    if '=' in arg and arg.split('=', 1)[1]: return arg.split('=', 1)[1]
+    return default
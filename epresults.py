@@ -0,0 +1,121 @@
+# epresults.py
+# Persistent store of per-file eppp.py results, keyed by input file hashes and parameters
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# eppp.py is often rerun over the same EnergyPlus outputs with only the plot type changed or one
+# new file added. Each file's summary metrics (totalPrice, pctTimeComf90, ...) are saved here
+# after they are computed, and reused on later runs when nothing they depend on has changed.
+#
+# A result is keyed by a SHA-1 hash of
+#   - the contents of the EnergyPlus output file
+#   - the contents of every shared input: the file outdoor temperature is taken from, the price
+#     file and the occupancy files
+#   - the parameters: date range, days, timestep, calibration rows, price type, multiplier, offset, ...
+# so a changed input or parameter simply gives a different key. File hashes are remembered by
+# path, size and modification time so unchanged files are not re-hashed on every run.
+#
+# Each result is a folder in ~/.cache/eppp/results (or set EPPP_RESULTS_DIR) holding result.json
+# with the metrics and terminal output, and arrays.npz with any plotted or sweep arrays.
+# Old results are evicted least recently used first using the same index scheme as epcache.py.
+
+import os
+import json
+import hashlib
+import numpy as np
+from epcache import fileKey, fileHash, readIndex, writeIndex, touchEntry, invalidate, dirSize, removeEntry
+
+# Where results are kept and eviction limits
+RESULTS_DIR = os.environ.get('EPPP_RESULTS_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'eppp', 'results'))
+RESULTS_INDEX = os.path.join(RESULTS_DIR, 'index.json')
+RESULTS_MAX_BYTES = int(float(os.environ.get('EPPP_RESULTS_MAX_BYTES', 1e9))) # 1 GB
+RESULTS_MAX_ENTRIES = int(os.environ.get('EPPP_RESULTS_MAX_ENTRIES', 2000))
+
+# File hashes already computed, by path: {path: {'size', 'mtime', 'sha1'}}
+HASH_MEMO = os.path.join(RESULTS_DIR, 'hashes.json')
+
+# Bump when the metrics computed by epanalysis.py change so that old results are not reused
+RESULTS_FORMAT = 1
+
+# Arrays in a result that are saved to arrays.npz instead of result.json
+ARRAY_KEYS = ['indoorTemp', 'heatTemp', 'coolTemp', 'energy']
+
+# SHA-1 hash of a file's contents, or None if it does not exist.
+# Reuses the hash from the last run if the file size and modification time have not changed.
+def contentHash(path):
+    try: key = fileKey(path)
+    except OSError: return None
+    memo = readIndex(HASH_MEMO)
+    known = memo.get(key['path'])
+    if known is not None and known['size'] == key['size'] and known['mtime'] == key['mtime']:
+        return known['sha1']
+    sha1 = fileHash(path)
+    memo[key['path']] = {'size': key['size'], 'mtime': key['mtime'], 'sha1': sha1}
+    writeIndex(HASH_MEMO, memo)
+    return sha1
+
+# Key for one run of eppp.py: hash of the parameters dict and the contents of the shared input files.
+# Missing input files are hashed as None, so the key still changes when they appear.
+def runKey(params, inputs):
+    h = hashlib.sha1()
+    h.update(json.dumps({'format': RESULTS_FORMAT, 'params': params}, sort_keys=True, default=str).encode())
+    for path in inputs:
+        h.update((str(path) + ':' + str(contentHash(path)) + ';').encode())
+    return h.hexdigest()
+
+# Key for the result of file f in the run with key run. None if f does not exist.
+def resultKey(run, f):
+    sha1 = contentHash(f)
+    if sha1 is None: return None
+    return hashlib.sha1((run + ':' + sha1).encode()).hexdigest()
+
+# Returns the saved result dict for key, or None if there is none or it lacks any array in need.
+# exportFile, if given, is the output file written with the result. It must not have been changed
+# since, eg. overwritten by a run with other parameters.
+def loadResult(key, need=(), exportFile=None):
+    entry = os.path.join(RESULTS_DIR, key)
+    try:
+        with open(os.path.join(entry, 'result.json')) as src:
+            res = json.load(src)
+        arrays = {}
+        if os.path.exists(os.path.join(entry, 'arrays.npz')):
+            with np.load(os.path.join(entry, 'arrays.npz')) as npz:
+                arrays = {k: npz[k] for k in npz.files}
+    except (OSError, ValueError):
+        return None
+    if not set(need) <= set(arrays): return None
+    if exportFile is not None:
+        try:
+            if fileKey(exportFile) != res.pop('exportKey', None): return None
+        except OSError: return None
+    res.pop('exportKey', None)
+    res.update(arrays)
+    touchEntry(RESULTS_INDEX, entry, maxBytes=RESULTS_MAX_BYTES, maxEntries=RESULTS_MAX_ENTRIES)
+    return res
+
+# Save result dict res under key. Scalars and the log go to result.json, arrays to arrays.npz.
+# exportFile is the output file written with the result, if any.
+def storeResult(key, res, exportFile=None):
+    entry = os.path.join(RESULTS_DIR, key)
+    tmp = entry + '.' + str(os.getpid()) + '.tmp'
+    arrays = {k: np.asarray(res[k]) for k in ARRAY_KEYS if k in res}
+    scalars = {k: (float(v) if isinstance(v, np.floating) else v) for k, v in res.items() if k not in arrays}
+    try:
+        if exportFile is not None: scalars['exportKey'] = fileKey(exportFile)
+        removeEntry(tmp)
+        os.makedirs(tmp)
+        with open(os.path.join(tmp, 'result.json'), 'w') as out:
+            json.dump(scalars, out)
+        if arrays: np.savez(os.path.join(tmp, 'arrays.npz'), **arrays)
+        removeEntry(entry)
+        os.replace(tmp, entry)
+    except (OSError, TypeError, ValueError) as e:
+        print('Warning: Could not save results for ', res.get('file'), ': ', e)
+        removeEntry(tmp)
+        return
+    touchEntry(RESULTS_INDEX, entry, dirSize(entry), RESULTS_MAX_BYTES, RESULTS_MAX_ENTRIES)
+
+# Delete all saved results
+def clearResults():
+    invalidate(RESULTS_INDEX)
@@ -0,0 +1,110 @@
+# eptariff.py
+# Rule-based PG&E retail tariffs, expanded to a price for every timestep on demand
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# Instead of pre-expanded 5 minute price files (E-TOU-C_5min_Summer.csv, ...), a time of use tariff
+# can be given as a short list of rules
+#       [season, days, start hour, end hour, rate [$/kWh]]
+# season is a key of SEASONS or 'all', days is 'all', 'weekday' or 'weekend', and the rule covers
+# start hour <= hour of day < end hour. Later rules override earlier ones. Rules are expanded with
+# array masks over the timesteps of the run, so any timestep and any date range work, including
+# runs across a season boundary. Expansions are memoized for the life of the process.
+#
+# Rules are only used when asked for (eppp.py rules or rules=file.json, see loadTariffRules);
+# otherwise every PG&E rate is read from its price file as before. A rules file is json:
+#       {"E-TOU-C": [["summer", "all", 0, 24, 0.34], ["summer", "all", 16, 21, 0.40], ...]}
+# TARIFFS below is only an example with rates rounded to the cent, not checked against the current
+# PG&E tariff sheets; supply a rules file with the rates of the tariff sheet for absolute costs.
+# Tiered rates such as E-1 depend on the month's usage, not on the time, so the example has no rules
+# for them. Rates without rules (E-1, E-TD-Z, ...) are read from their price file.
+
+import re
+import json
+from functools import lru_cache
+import numpy as np
+
+# Months in each season
+SEASONS = {'summer': [6, 7, 8, 9], 'winter': [1, 2, 3, 4, 5, 10, 11, 12]}
+
+# Day types of rules
+DAY_TYPES = ['all', 'weekday', 'weekend']
+
+# Example rules, used with eppp.py rules (no file). See top of file.
+TARIFFS = {
+    # Time of use, peak 4 - 9 pm every day
+    'E-TOU-C': [['summer', 'all', 0, 24, 0.34], ['summer', 'all', 16, 21, 0.40],
+                ['winter', 'all', 0, 24, 0.29], ['winter', 'all', 16, 21, 0.31]],
+}
+
+# priceType -> [tariff, season used for the whole run]. Kept for the old one-season-per-file price types.
+TARIFF_ALIASES = {'E-TOU-C_Summer': ['E-TOU-C', 'summer'], 'E-TOU-C_Winter': ['E-TOU-C', 'winter']}
+
+# Returns the tariff rules to use: None (read every rate from its price file) if spec is empty or
+# None, TARIFFS if spec is 'builtin', else the rules in json file spec. Raises ValueError for a bad rule.
+def loadTariffRules(spec):
+    if not spec: return None
+    if spec == 'builtin': return TARIFFS
+    with open(spec) as src:
+        tariffs = json.load(src)
+    if not isinstance(tariffs, dict): raise ValueError('Tariff rules file ' + spec + ' must hold a dict of tariffs')
+    for name, rules in tariffs.items():
+        for rule in rules:
+            if (len(rule) != 5 or (rule[0] != 'all' and rule[0] not in SEASONS) or rule[1] not in DAY_TYPES
+                    or not 0 <= rule[2] < rule[3] <= 24):
+                raise ValueError('Invalid rule for ' + name + ' in ' + spec + ': ' + str(rule))
+    return tariffs
+
+# Returns [tariff name, rules, fixed season or None] for a priceType from tariffs (see
+# loadTariffRules), or None if it has no rules there
+def tariffRules(priceType, tariffs=None):
+    if not tariffs: return None
+    name, season = TARIFF_ALIASES.get(priceType, [priceType, None])
+    if name not in tariffs: return None
+    return [name, tariffs[name], season]
+
+# Text that changes whenever the rules used for priceType change, eg. for result keys. None if no rules.
+def tariffKey(priceType, tariffs=None):
+    rules = tariffRules(priceType, tariffs)
+    if rules is None: return None
+    return json.dumps(rules)
+
+# First day of a date_range string as [year, month, day], or None for legacy date ranges
+def tariffStart(date_range):
+    m = re.match(r'(\d{4})-(\d{2})-(\d{2})', date_range)
+    if m is None: return None
+    return [int(m.group(1)), int(m.group(2)), int(m.group(3))]
+
+# Price [$/kWh] of each of the nsteps timesteps of timestep [minutes] from midnight at the start of
+# day start = [year, month, day], from the rules for priceType in tariffs. Timestep k covers
+# minutes k*timestep to (k+1)*timestep.
+# Returns a read-only array, shared by every call with the same arguments.
+def expandTariff(priceType, start, nsteps, timestep=5, tariffs=TARIFFS):
+    key = tariffKey(priceType, tariffs)
+    if key is None: raise ValueError('No tariff rules for ' + str(priceType))
+    return _expand(key, tuple(start), int(nsteps), timestep)
+
+# key is the tariffKey, so that the memo is by the rules themselves
+@lru_cache(maxsize=64)
+def _expand(key, start, nsteps, timestep):
+    name, rules, fixedSeason = json.loads(key)
+    times = np.datetime64('{:04d}-{:02d}-{:02d}'.format(*start), 'm') + np.arange(nsteps)*np.timedelta64(1, 'm')*timestep
+    days = times.astype('datetime64[D]')
+    month = days.astype('datetime64[M]').astype(int) % 12 + 1
+    hour = (times - days).astype(int)/60
+    # 1970-01-01 was a Thursday: Monday = 0, ..., Sunday = 6
+    weekday = (days.astype(int) + 3) % 7
+    price = np.full(nsteps, np.nan)
+    for season, dayType, startHour, endHour, rate in rules:
+        mask = (hour >= startHour) & (hour < endHour)
+        if season != 'all':
+            if fixedSeason is None: mask &= np.isin(month, SEASONS[season])
+            elif season != fixedSeason: continue
+        if dayType == 'weekday': mask &= weekday < 5
+        elif dayType == 'weekend': mask &= weekday >= 5
+        price[mask] = rate
+    if np.isnan(price).any():
+        raise ValueError('Tariff ' + name + ' rules do not cover every timestep')
+    price.setflags(write=False)
+    return price
@@ -0,0 +1,247 @@
+# epw.py
+# Read and write EnergyPlus Weather (.epw) files
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# An EPW file is 8 header lines (LOCATION, DESIGN CONDITIONS, TYPICAL/EXTREME PERIODS, GROUND
+# TEMPERATURES, HOLIDAYS/DAYLIGHT SAVINGS, COMMENTS 1, COMMENTS 2, DATA PERIODS) followed by one
+# row per hour with the 35 fields in EPW_FIELDS. Hour is 1 - 24, where hour h holds the values
+# at the end of the hour (h-1):00 - h:00.
+#
+# Writing: epwFromHourly() turns the hourly table from mesohourly.py / mesobatch.py into the 35 EPW
+# fields, filling every field without data with its missing value. writeEPW() writes it under a
+# header copied from a template EPW such as USA_CA_San.Jose_2019.epw. Each field is rounded as a
+# whole column and the table is serialized in one call by the pandas csv writer, rather than
+# building one string per value, so a full year takes a fraction of a second.
+#
+# Reading: loadEPW() parses the header and the data rows once into a typed structured array (one
+# record per hour, fields EPW_FIELDS) and saves it as a sidecar next to the file:
+#   USA_CA_San.Jose_2019.epw  ->  USA_CA_San.Jose_2019.epwcache/
+# Later loads memory-map the array, so they cost almost nothing. Sidecars are checked against the
+# source and evicted the same way as the EnergyPlus output sidecars, see epcache.py. The first and
+# last row of every day are kept with the sidecar, so epwWindow() and epwDateRange() return a
+# window of days as a slice (a view, no copying or searching), eg.
+#   header, data, days = loadEPW('USA_CA_San.Jose_2019.epw')
+#   aug = epwDateRange(data, '2020-08-01_2020-08-31', days)
+#   temp, solar = aug['DryBulb'], aug['GloHorzRad']
+
+import os
+import re
+import json
+import numpy as np
+import pandas as pd
+from epcache import fileKey, fileHash, validSidecar, removeEntry, touchEntry, dirSize, CACHE_INDEX
+
+# Data fields of each EPW row, in order
+EPW_FIELDS = ['Year', 'Month', 'Day', 'Hour', 'Minute', 'DataSource', 'DryBulb', 'DewPoint', 'RelHum',
+              'AtmosPressure', 'ExtHorzRad', 'ExtDirNormRad', 'HorzIRSky', 'GloHorzRad', 'DirNormRad',
+              'DifHorzRad', 'GloHorzIllum', 'DirNormIllum', 'DifHorzIllum', 'ZenLum', 'WindDir', 'WindSpd',
+              'TotSkyCvr', 'OpaqSkyCvr', 'Visibility', 'CeilingHgt', 'PresWeathObs', 'PresWeathCodes',
+              'PrecipWtr', 'AerosolOptDepth', 'SnowDepth', 'DaysLastSnow', 'Albedo', 'Rain', 'RainQuantity']
+
+# Missing value of each numeric field, from the EnergyPlus Auxiliary Programs documentation
+EPW_MISSING = {'DryBulb': 99.9, 'DewPoint': 99.9, 'RelHum': 999, 'AtmosPressure': 999999, 'ExtHorzRad': 9999,
+               'ExtDirNormRad': 9999, 'HorzIRSky': 9999, 'GloHorzRad': 9999, 'DirNormRad': 9999,
+               'DifHorzRad': 9999, 'GloHorzIllum': 999999, 'DirNormIllum': 999999, 'DifHorzIllum': 999999,
+               'ZenLum': 9999, 'WindDir': 999, 'WindSpd': 999, 'TotSkyCvr': 99, 'OpaqSkyCvr': 99,
+               'Visibility': 9999, 'CeilingHgt': 99999, 'PresWeathObs': 9, 'PresWeathCodes': 999999999,
+               'PrecipWtr': 999, 'AerosolOptDepth': 0.999, 'SnowDepth': 999, 'DaysLastSnow': 99,
+               'Albedo': 999, 'Rain': 999, 'RainQuantity': 99}
+
+# Decimal places written for each numeric field. Trailing zeros are dropped, eg. 7.0 -> 7
+EPW_DECIMALS = dict({f: 0 for f in EPW_MISSING}, DryBulb=1, DewPoint=1, WindSpd=1, Visibility=1,
+                    AerosolOptDepth=3, Albedo=3, Rain=1, RainQuantity=1)
+
+# Data source and uncertainty flags for rows without known sources, as in our EPW files
+DATA_SOURCE = '?9?9?9?9E0?9?9?9?9?9?9?9?9?9?9?9?9?9?9?9*9*9?9*9*9'
+
+# Hourly table columns from mesohourly.py -> EPW fields
+HOURLY_FIELDS = {'Drybulb': 'DryBulb', 'Dewpoint': 'DewPoint', 'RH': 'RelHum', 'Pressure': 'AtmosPressure',
+                 'Windspeed': 'WindSpd', 'SolarRad': 'GloHorzRad'}
+
+# Fields of the LOCATION line after the keyword
+LOCATION_FIELDS = ['city', 'state', 'country', 'source', 'wmo', 'latitude', 'longitude', 'timezone', 'elevation']
+
+# Number of header lines
+EPW_HEADER_LINES = 8
+
+# Type of each field in the structured array from readEPW. DataSource is added with the width found.
+EPW_TYPES = dict({f: np.float64 for f in EPW_MISSING}, Year=np.int16, Month=np.int8, Day=np.int8, Hour=np.int8,
+                 Minute=np.int8, PresWeathObs=np.int8, PresWeathCodes=np.int64)
+
+# Bump when the sidecar layout changes so old sidecars are rebuilt
+EPW_CACHE_FORMAT = 1
+
+# Returns the header lines of an EPW file, without line endings
+def readEPWHeader(path):
+    with open(path) as src:
+        return [next(src).rstrip('\r\n') for i in range(EPW_HEADER_LINES)]
+
+# Returns header lines from template (list of lines, or EPW file to copy them from) with changes:
+#   location  dict of LOCATION_FIELDS to replace, eg. {'city': 'San Jose Intl Ap', 'wmo': 724945}
+#   comments  [comment 1, comment 2] to replace COMMENTS 1 and 2, None keeps either one
+#   data      EPW table to set the DATA PERIODS start weekday and dates from
+def epwHeader(template, location=None, comments=None, data=None):
+    header = readEPWHeader(template) if isinstance(template, str) else list(template)
+    for i, line in enumerate(header):
+        key = line.split(',', 1)[0]
+        if key == 'LOCATION' and location:
+            fields = line.split(',')[1:]
+            fields += [''] * (len(LOCATION_FIELDS) - len(fields))
+            for k, v in location.items():
+                fields[LOCATION_FIELDS.index(k)] = str(v)
+            header[i] = 'LOCATION,' + ','.join(fields)
+        elif key in ['COMMENTS 1', 'COMMENTS 2'] and comments:
+            c = comments[int(key[-1]) - 1]
+            if c is not None: header[i] = key + ',' + str(c)
+        elif key == 'DATA PERIODS' and data is not None and len(data) > 0:
+            first = pd.Timestamp(int(data['Year'].iloc[0]), int(data['Month'].iloc[0]), int(data['Day'].iloc[0]))
+            header[i] = 'DATA PERIODS,1,1,Data,{},{:d}/{:2d},{:d}/{:2d}'.format(first.day_name(),
+                        int(data['Month'].iloc[0]), int(data['Day'].iloc[0]),
+                        int(data['Month'].iloc[-1]), int(data['Day'].iloc[-1]))
+    return header
+
+# Returns a DataFrame of all EPW_FIELDS with every missing value filled, from a DataFrame (or
+# structured array from readEPW) with Year, Month, Day, Hour (1 - 24) and any of the other fields
+def epwTable(data):
+    if isinstance(data, np.ndarray): data = pd.DataFrame(data)
+    table = pd.DataFrame(index=range(len(data)))
+    for f in EPW_FIELDS:
+        if f in data.columns: table[f] = np.asarray(data[f])
+        elif f == 'Minute': table[f] = 0
+        elif f == 'DataSource': table[f] = DATA_SOURCE
+        elif f in EPW_MISSING: table[f] = EPW_MISSING[f]
+        else: raise ValueError('EPW data is missing the ' + f + ' column')
+    for f, missing in EPW_MISSING.items():
+        table[f] = table[f].astype(np.float64).fillna(missing)
+    return table
+
+# Converts the hourly table from mesohourly.py / mesobatch.py (Year, Month, Day, Hour 0 - 23, data
+# columns) to EPW_FIELDS. Each hourly value is centred on h:00, which is EPW hour 24 of the day
+# before for h = 0 and hour h otherwise. A leading hour 0 row, which belongs to the day before the
+# first day, is dropped. fields maps hourly columns to EPW fields (default HOURLY_FIELDS).
+def epwFromHourly(hourly, fields=None):
+    if fields is None: fields = HOURLY_FIELDS
+    times = pd.to_datetime(pd.DataFrame({'year': hourly['Year'], 'month': hourly['Month'], 'day': hourly['Day'],
+                                         'hour': hourly['Hour']}).astype(int))
+    keep = (times > times.dt.normalize().iloc[0]).to_numpy() if len(times) > 0 else np.ones(0, dtype=bool)
+    times = times[keep] - pd.Timedelta(hours=1)
+    data = pd.DataFrame({'Year': times.dt.year.to_numpy(), 'Month': times.dt.month.to_numpy(),
+                         'Day': times.dt.day.to_numpy(), 'Hour': times.dt.hour.to_numpy() + 1})
+    for c, f in fields.items():
+        if c in hourly.columns: data[f] = np.asarray(hourly[c], dtype=np.float64)[keep]
+    return epwTable(data)
+
+# Write an EPW file. data is an EPW table (see epwTable, or any DataFrame it accepts) and header
+# the header lines (see epwHeader) or a template EPW file to copy them from.
+def writeEPW(path, data, header):
+    table = epwTable(data)
+    if isinstance(header, str): header = epwHeader(header, data=table)
+    # Round each numeric column to its decimal places; whole number fields become integers
+    for f in EPW_FIELDS:
+        if f == 'DataSource': continue
+        d = EPW_DECIMALS.get(f, 0)
+        if d == 0: table[f] = np.round(table[f].to_numpy(dtype=np.float64)).astype(np.int64)
+        else: table[f] = np.round(table[f].to_numpy(dtype=np.float64), d) + 0.0  # + 0.0 turns -0.0 into 0.0
+    with open(path, 'w', newline='') as out:
+        out.write('\n'.join(header) + '\n')
+        # All values have at most 6 significant digits after rounding, so %g drops trailing zeros only
+        table.to_csv(out, header=False, index=False, float_format='%g', lineterminator='\n')
+
+# Reading ---------------------------------------------------------------
+
+# Parse an EPW file. Returns [header lines, structured array with one record per data row]
+def readEPW(path):
+    header = readEPWHeader(path)
+    # Everything numeric is read as float first. NaN is not a valid EPW value but does appear in
+    # some files; it is read as missing.
+    data = pd.read_csv(path, header=None, skiprows=EPW_HEADER_LINES, names=EPW_FIELDS,
+                       dtype={f: (str if f == 'DataSource' else np.float64) for f in EPW_FIELDS})
+    for f, missing in EPW_MISSING.items():
+        data[f] = data[f].fillna(missing)
+    source = data['DataSource'].fillna('').to_numpy().astype(str)
+    dtype = [(f, source.dtype if f == 'DataSource' else EPW_TYPES[f]) for f in EPW_FIELDS]
+    records = np.empty(len(data), dtype=dtype)
+    for f in EPW_FIELDS:
+        records[f] = source if f == 'DataSource' else data[f].to_numpy()
+    return [header, records]
+
+# Index of day of year for month and day, with a place for Feb 29: 0 - 365
+def dayOfYear(month, day):
+    return np.array([0,31,60,91,121,152,182,213,244,274,305,335])[np.asarray(month, dtype=int) - 1] + np.asarray(day, dtype=int) - 1
+
+# Returns (2 x 366) array of the first row and one past the last row of each day of the year in data,
+# -1 if that day is not in data. If a day appears more than once, its first appearance is used.
+def dayIndex(data):
+    doy = dayOfYear(data['Month'], data['Day'])
+    days = np.full((2, 366), -1, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, doy[1:] != doy[:-1]])
+    ends = np.r_[starts[1:], len(doy)]
+    # Reverse so that the first appearance of each day is written last
+    days[0, doy[starts][::-1]] = starts[::-1]
+    days[1, doy[starts][::-1]] = ends[::-1]
+    return days
+
+# Returns the sidecar folder for an EPW file: file.epw -> file.epwcache
+def epwSidecarPath(path):
+    return os.path.splitext(path)[0] + '.epwcache'
+
+# Load an EPW file. Returns [header lines, structured data array, day index (see dayIndex)].
+# useCache memory-maps the array from the sidecar, parsing the file and saving a sidecar on a miss.
+def loadEPW(path, useCache=True, index=CACHE_INDEX):
+    side = epwSidecarPath(path)
+    if useCache:
+        meta = validSidecar(path, side, EPW_CACHE_FORMAT)
+        if meta is not None:
+            try:
+                data = np.load(os.path.join(side, 'data.npy'), mmap_mode='r')
+                touchEntry(index, side)
+                return [meta['header'], data, np.array(meta['days'], dtype=np.int64)]
+            except (OSError, ValueError):
+                pass
+    header, data = readEPW(path)
+    days = dayIndex(data)
+    if useCache: storeEPWSidecar(path, header, data, days, index)
+    return [header, data, days]
+
+# Save a parsed EPW file as a sidecar
+def storeEPWSidecar(path, header, data, days, index=CACHE_INDEX):
+    side = epwSidecarPath(path)
+    meta = dict(fileKey(path), format=EPW_CACHE_FORMAT, sha1=fileHash(path), header=header, days=days.tolist())
+    tmp = side + '.' + str(os.getpid()) + '.tmp'
+    try:
+        removeEntry(tmp)
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, 'data.npy'), data)
+        with open(os.path.join(tmp, 'meta.json'), 'w') as out:
+            json.dump(meta, out)
+        removeEntry(side)
+        os.replace(tmp, side)
+    except OSError as e:
+        print('Warning: Could not write cache for ', path, ': ', e)
+        removeEntry(tmp)
+        return
+    touchEntry(index, side, dirSize(side))
+
+# Returns the rows of data from day [month, day] first to day last, inclusive, as a view.
+# days is the day index from loadEPW; without it the index is rebuilt, which has to scan data.
+# Raises ValueError if either day is not in the file.
+def epwWindow(data, first, last, days=None):
+    if days is None: days = dayIndex(data)
+    start = days[0, dayOfYear(first[0], first[1])]
+    end = days[1, dayOfYear(last[0], last[1])]
+    if start < 0 or end < 0:
+        raise ValueError('EPW data does not contain ' + '{}/{} - {}/{}'.format(first[0], first[1], last[0], last[1]))
+    if end <= start:
+        raise ValueError('EPW window ends before it starts: {}/{} - {}/{}'.format(first[0], first[1], last[0], last[1]))
+    return data[start:end]
+
+# Returns the rows of data for an eppp.py date_range string, eg. '2020-08-01_2020-08-31', inclusive
+def epwDateRange(data, date_range, days=None):
+    m = re.match(r'\d{4}-(\d{2})-(\d{2})_\d{4}-(\d{2})-(\d{2})$', date_range)
+    if m is None: raise ValueError('date_range must look like 2020-08-01_2020-08-31, not ' + date_range)
+    first = [int(m.group(1)), int(m.group(2))]
+    last = [int(m.group(3)), int(m.group(4))]
+    return epwWindow(data, first, last, days)
+
@@ -0,0 +1,197 @@
+# epwatch.py
+# Live post-processing of EnergyPlus output csv files while the co-simulation is still writing them
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# Tails each output file: every poll, only the bytes appended since the last poll are read and parsed,
+# and their complete rows are added into running totals of cost, energy and comfort (see
+# epanalysis.addChunk), so each update costs time in proportion to the new rows only. Every interval
+# seconds a snapshot of the totals so far is printed and written to eppp_[date_range]_live.csv, in the
+# same layout as the eppp.py summary plus the days processed, so a bad controller run can be stopped
+# early. The snapshot file is replaced in one step, so readers never see half of it.
+#
+# Stops when every file has reached the end of the days range, when no file has grown for idle
+# seconds, or on Ctrl-C; a final snapshot is written in each case. A file that gets shorter (a new
+# run writing over it) is started again from the top.
+#
+# Comfort bounds use each file's own outdoor temperature. The number of calibration rows must be
+# given (calibration=auto needs the whole file), and legacy prices are not supported.
+#
+# Run As:
+#           python3 epwatch.py run1.csv run2.csv < parameters >
+# Parameters are the same as eppp.py (date=, days, price=, pconst, calibration=, ...), plus
+#   interval=S    Seconds between snapshots. Default 60
+#   idle=S        Stop when no file has grown for S seconds. Default: run until the end of the range or Ctrl-C
+#   live=file.csv Snapshot file. Default eppp_[date_range]_live.csv
+
+import io
+import os
+import sys
+import csv
+import time
+
+# Default seconds between snapshots, and between checks of the files for new rows
+INTERVAL = 60
+POLL = 1.0
+
+# State of one watched file: read position, unfinished last line, header columns, data rows read
+# (including calibration rows) and running totals
+def newTail(path):
+    from epanalysis import newTotals
+    return {'path': path, 'pos': 0, 'partial': b'', 'columns': None, 'rows': 0, 'totals': newTotals()}
+
+# Returns a DataFrame of the complete rows appended to the watched file since the last call, with
+# the eppp.py columns and indexed by row number from the first non-calibration row. Calibration
+# rows are dropped. Returns None if there are no new rows.
+def readNew(tail, calibration):
+    import pandas as pd
+    from eploader import EPPP_COLUMNS, columnTypes
+    try:
+        with open(tail['path'], 'rb') as f:
+            if os.fstat(f.fileno()).st_size < tail['pos']:
+                # Shorter than what was already read: a new run is writing the file, start over
+                print("File ", tail['path'], " was restarted, starting its totals again.")
+                tail.update(newTail(tail['path']))
+            f.seek(tail['pos'])
+            new = f.read()
+    except FileNotFoundError:
+        return None
+    tail['pos'] += len(new)
+    # Only complete lines are parsed; the rest waits for the next call
+    buf = tail['partial'] + new
+    end = buf.rfind(b'\n') + 1
+    tail['partial'] = buf[end:]
+    buf = buf[:end]
+    if tail['columns'] is None:
+        if not buf: return None
+        first = buf.index(b'\n') + 1
+        tail['columns'] = list(pd.read_csv(io.BytesIO(buf[:first]), nrows=0).columns)
+        buf = buf[first:]
+    if not buf: return None
+    data = pd.read_csv(io.BytesIO(buf), header=None, names=tail['columns'], usecols=lambda c: c in EPPP_COLUMNS,
+                       dtype=columnTypes(EPPP_COLUMNS))
+    g0 = tail['rows'] - calibration
+    tail['rows'] += len(data)
+    data.index = pd.RangeIndex(g0, g0 + len(data))
+    if g0 < 0: data = data.iloc[-g0:]
+    if len(data) == 0: return None
+    return data
+
+# Read the new rows of a watched file and add them into its totals. Returns the number of new rows.
+def updateTail(tail, shared):
+    from epanalysis import addChunk
+    data = readNew(tail, shared['calibration'])
+    if data is None: return 0
+    addChunk(tail['totals'], data, shared)
+    return len(data)
+
+# Inputs for addChunk that are the same for every file: occupancy and price for the days range of opts
+# (see eppp.defaultOptions). Returns the shared dict.
+def watchInputs(opts):
+    from eploader import dateRangeStart
+    from epcost import loadPrice
+    from eptariff import loadTariffRules
+    from epoccupancy import occupancyStatus, OCC_STATUS_FILE
+    if 'l' in opts['priceType']: raise ValueError('Watch mode does not support legacy prices')
+    if opts['numEPlusCalibrationRows'] == 'auto': raise ValueError('Watch mode needs the number of calibration rows')
+    dayrows = int(60 / opts['timestep'] * 24)
+    datastart = int(opts['firstDay'] * dayrows)
+    dataend = int(opts['lastDay'] * dayrows) - 1
+    return {'priceType': opts['priceType'], 'legacyPrice': None,
+            'eprice': loadPrice(opts['priceType'], opts['date_range'], opts['pmultiplier'], opts['poffset'], dataend+1,
+                                opts['timestep'], loadTariffRules(opts['tariffRules'])),
+            'occupancy': occupancyStatus(OCC_STATUS_FILE, nrows=dataend), 'outdoorTemp': None,
+            'datastart': datastart, 'dataend': dataend, 'dayrows': dayrows, 'firstDay': opts['firstDay'],
+            'lastDay': opts['lastDay'], 'calibration': opts['numEPlusCalibrationRows'],
+            'startDate': dateRangeStart(opts['date_range'])}
+
+# Summary metrics of each watched file so far, as in eppp.py results plus 'days' processed.
+# Daily averages are over the days processed.
+def liveResults(tails, shared):
+    from epanalysis import totalsResult
+    results = []
+    for tail in tails:
+        rows = tail['totals']['rows']
+        # Whole range done: same number of days as eppp.py
+        if rows >= shared['dataend'] - shared['datastart']: days = shared['lastDay'] - shared['firstDay']
+        else: days = rows / shared['dayrows']
+        res = totalsResult(tail['totals'], days if days > 0 else float('nan'))
+        res['file'] = tail['path']
+        res['days'] = days
+        results.append(res)
+    return results
+
+# Print the live results and write them to liveFile
+def writeSnapshot(results, liveFile):
+    from eppp import summaryRows
+    print(time.strftime('%H:%M:%S'), " ---------------------------------------")
+    for res in results:
+        print("{}  day {:.2f}  cost ${:.2f}  HVAC {:.1f} kWh  occupied comfortable 90%: {:.1f}%  80%: {:.1f}%".format(
+              res['file'], res['days'], res['totalPrice'], res['totHeatElec'] + res['totCoolElec'],
+              res['pctTimeComf90'], res['pctTimeComf80']))
+    rows = summaryRows(results) + [["Days processed"] + [res['days'] for res in results]]
+    tmp = liveFile + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp, 'w') as out:
+        writer = csv.writer(out)
+        for r in rows:
+            writer.writerow(r)
+    os.replace(tmp, liveFile)
+
+# Watch the files of opts until they reach the end of the days range, no file has grown for idle
+# seconds (None = no limit) or Ctrl-C. Writes a snapshot to liveFile every interval seconds and at
+# the end. Returns the final liveResults.
+def watch(opts, interval=INTERVAL, idle=None, liveFile=None, poll=POLL):
+    if liveFile is None: liveFile = "eppp_" + opts['date_range'] + "_live.csv"
+    shared = watchInputs(opts)
+    tails = [newTail(f) for f in opts['files']]
+    rangeRows = shared['dataend'] - shared['datastart']
+    lastSnapshot = lastGrowth = time.monotonic()
+    try:
+        while True:
+            new = sum(updateTail(tail, shared) for tail in tails)
+            now = time.monotonic()
+            if new: lastGrowth = now
+            if all(tail['totals']['rows'] >= rangeRows for tail in tails):
+                print("All files reached the end of the range.")
+                break
+            if idle is not None and now - lastGrowth >= idle:
+                print("No new rows for ", idle, " s, stopping.")
+                break
+            if now - lastSnapshot >= interval:
+                writeSnapshot(liveResults(tails, shared), liveFile)
+                lastSnapshot = now
+            if not new: time.sleep(poll)
+    except KeyboardInterrupt:
+        print("Stopped.")
+    results = liveResults(tails, shared)
+    writeSnapshot(results, liveFile)
+    print("Live summary written to: " + liveFile)
+    return results
+
+
+if __name__ == '__main__':
+    from eppp import parseArgs
+
+    # PARAMETER VARIABLES TO CHANGE -----------------------------------------
+    # Other parameters are the eppp.py presets, changed by the same command line parameters
+    interval = INTERVAL # s
+    idle = None         # s, or None
+    liveFile = None     # None = eppp_[date_range]_live.csv
+
+    # Main processing code --------------------------------------------------
+    print('\n================ EnergyPlus Live Post-Processing V1.0 ================')
+    eppArgs = []
+    for arg in sys.argv[1:]:
+        # Checked before eppp.py parameters because live= includes .csv
+        try:
+            if arg.startswith("interval="): interval = float(arg.replace("interval=",""))
+            elif arg.startswith("idle="): idle = float(arg.replace("idle=",""))
+            elif arg.startswith("live="): liveFile = arg.replace("live=","")
+            else: eppArgs.append(arg)
+        except ValueError: print('Warning: invalid ', arg, ', using default instead.')
+    opts, nf = parseArgs(eppArgs)
+    print("Watching Files: ")
+    print(opts['files'])
+    watch(opts, interval, idle, liveFile)
+    print('\n=======================================================\n')
@@ -0,0 +1,119 @@
+# epzones.py
+# Comfort and setpoint metrics for every zone of a building at once, for eppp.py zones=
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# Zones are found from the EnergyPlus output column headers (eploader.findZones) and read in the
+# same parse as the other eppp.py columns. Their air temperatures and setpoints are 2D arrays,
+# time x zone, and every metric is computed for all zones at once by broadcasting the outdoor
+# temperature bounds and occupancy (one value per timestep) across the zone axis.
+#
+# zoneCounts() returns sums and counts rather than means, so that chunks of a file can be added up
+# (eppp.py stream mode) before zoneResult() turns them into per-zone metrics and a building row:
+#   meanDiff100      mean temperature difference from the 100% comfortable band [°C]
+#   meanComfBand     mean percent of people comfortable [%]
+#   pctTimeComf90/80 percent of occupied time within the 90% / 80% comfort band [%]
+#   meanHeatSetpt, meanCoolSetpt   mean heating and cooling setpoints [°C]
+#   heatUnmetHours, coolUnmetHours hours more than UNMET_TOLERANCE below the heating setpoint or
+#                    above the cooling setpoint. For the building, hours in which any zone is unmet,
+#                    as in the EnergyPlus facility setpoint-not-met report.
+# Building means and percentages are over all zones' timesteps together.
+
+import numpy as np
+import pandas as pd
+from epcomfort import adaptiveBounds, boundsAt, bounds90, tempDifference, percentComfortable, isComfortable
+from eploader import ZONE_TEMP_COL, ZONE_HEAT_SETPT_COL, ZONE_COOL_SETPT_COL
+
+# EnergyPlus default tolerance for setpoint not met [°C]
+UNMET_TOLERANCE = 0.2
+
+# Metrics in zone results and the header of each in the zone export file
+ZONE_METRICS = [['meanDiff100', 'Mean Temp Diff from 100% Comfortable [°C]'],
+                ['meanComfBand', 'Mean Comfort Band Percent [%]'],
+                ['pctTimeComf90', 'Percent of occupied time within 90% comfort band [%]'],
+                ['pctTimeComf80', 'Percent of occupied time within 80% comfort band [%]'],
+                ['meanHeatSetpt', 'Mean Heating Setpoint [°C]'],
+                ['meanCoolSetpt', 'Mean Cooling Setpoint [°C]'],
+                ['heatUnmetHours', 'Heating Setpoint Not Met [hours]'],
+                ['coolUnmetHours', 'Cooling Setpoint Not Met [hours]']]
+
+# Returns [air temperature, heating setpoint, cooling setpoint] of zones as time x zone arrays from
+# DataFrame data. Setpoints of zones without that column are NaN.
+def zoneArrays(data, zones):
+    arrays = []
+    for col in [ZONE_TEMP_COL, ZONE_HEAT_SETPT_COL, ZONE_COOL_SETPT_COL]:
+        a = np.full((len(data), len(zones)), np.nan)
+        for j, z in enumerate(zones):
+            if col.format(z) in data.columns: a[:, j] = data[col.format(z)].to_numpy(dtype=np.float64)
+        arrays.append(a)
+    return arrays
+
+# Sums and counts of the metrics of each zone (arrays with one value per zone), and the building
+# unmet counts, for time x zone arrays indoor, heatSet, coolSet and outdoor temperature and
+# occupancy (1 or 0) with one value per timestep
+def zoneCounts(indoor, heatSet, coolSet, outdoor, occupancy):
+    # One value per timestep, as a column to broadcast across zones
+    heat100, cool100 = [b[:, None] for b in adaptiveBounds(outdoor)]
+    lo90, hi90 = [b[:, None] for b in bounds90(outdoor)]
+    lo80, hi80 = [b[:, None] for b in boundsAt(outdoor, 0.80)]
+    occ = np.asarray(occupancy, dtype=np.float64)[:, None]
+    delta = tempDifference(indoor, heat100, cool100)
+    heatUnmet = indoor < heatSet - UNMET_TOLERANCE
+    coolUnmet = indoor > coolSet + UNMET_TOLERANCE
+    return {'diffSum': np.nansum(delta, axis=0), 'pctSum': np.nansum(percentComfortable(delta), axis=0),
+            'count': np.count_nonzero(~np.isnan(delta), axis=0),
+            'comf90': np.nansum(isComfortable(indoor, lo90, hi90)*occ, axis=0),
+            'comf80': np.nansum(isComfortable(indoor, lo80, hi80)*occ, axis=0),
+            'occupied': np.full(indoor.shape[1], np.nansum(occ)),
+            'heatSetSum': np.nansum(heatSet, axis=0), 'heatSetCount': np.count_nonzero(~np.isnan(heatSet), axis=0),
+            'coolSetSum': np.nansum(coolSet, axis=0), 'coolSetCount': np.count_nonzero(~np.isnan(coolSet), axis=0),
+            'heatUnmet': heatUnmet.sum(axis=0), 'coolUnmet': coolUnmet.sum(axis=0),
+            'anyHeatUnmet': int(heatUnmet.any(axis=1).sum()), 'anyCoolUnmet': int(coolUnmet.any(axis=1).sum())}
+
+# Add zoneCounts counts into total (None for the first chunk). Returns the new total.
+def addZoneCounts(total, counts):
+    if total is None: return counts
+    return {k: total[k] + counts[k] for k in total}
+
+# Ratio a/b, NaN where b is 0
+def _ratio(a, b):
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    return np.divide(a, b, out=np.full(np.shape(a), np.nan), where=(b != 0))
+
+# Zone metrics from counts of zones, as a dict of lists: 'zone' is the zone names then 'Building',
+# and each key of ZONE_METRICS has one value per zone then the building value.
+# timestep [minutes] converts unmet timesteps to hours.
+def zoneResult(counts, zones, timestep):
+    c = counts
+    zoneVals = {'meanDiff100': _ratio(c['diffSum'], c['count']),
+                'meanComfBand': _ratio(c['pctSum'], c['count']),
+                'pctTimeComf90': 100*_ratio(c['comf90'], c['occupied']),
+                'pctTimeComf80': 100*_ratio(c['comf80'], c['occupied']),
+                'meanHeatSetpt': _ratio(c['heatSetSum'], c['heatSetCount']),
+                'meanCoolSetpt': _ratio(c['coolSetSum'], c['coolSetCount']),
+                'heatUnmetHours': c['heatUnmet']*timestep/60,
+                'coolUnmetHours': c['coolUnmet']*timestep/60}
+    building = {'meanDiff100': _ratio(c['diffSum'].sum(), c['count'].sum()),
+                'meanComfBand': _ratio(c['pctSum'].sum(), c['count'].sum()),
+                'pctTimeComf90': 100*_ratio(c['comf90'].sum(), c['occupied'].sum()),
+                'pctTimeComf80': 100*_ratio(c['comf80'].sum(), c['occupied'].sum()),
+                'meanHeatSetpt': _ratio(c['heatSetSum'].sum(), c['heatSetCount'].sum()),
+                'meanCoolSetpt': _ratio(c['coolSetSum'].sum(), c['coolSetCount'].sum()),
+                'heatUnmetHours': c['anyHeatUnmet']*timestep/60,
+                'coolUnmetHours': c['anyCoolUnmet']*timestep/60}
+    res = {'zone': list(zones) + ['Building']}
+    for k, title in ZONE_METRICS:
+        res[k] = [float(v) for v in np.append(zoneVals[k], building[k])]
+    return res
+
+# Zone export file for input file f
+def zoneFileName(f):
+    return f.replace(".csv" , "") + "_zones.csv"
+
+# Write zoneResult res to csv: one row per zone and a last row for the building
+def writeZones(path, res):
+    table = pd.DataFrame({title: res[k] for k, title in ZONE_METRICS}, index=res['zone'])
+    table.index.name = 'Zone'
+    table.to_csv(path, header=True)
@@ -0,0 +1,162 @@
+# mesobatch.py
+# Several MesoWest stations to one merged hourly weather table for input to EPW file via Elements
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# Our EPW files mix stations, eg. temperature, pressure, RH, dewpoint and wind from KSJC with solar
+# radiation from E6095. Instead of running mesoweatherepw.py once per station and merging by hand,
+# list every (file, station type) pair below. Each station is averaged into hours (see
+# mesohourly.py) in its own worker process, then all of them are joined on the hour.
+#
+# Which station wins each field: the first station in that field's priority list that has a
+# value for the hour. Fields without a priority list use the order of the sources list. A missing
+# hour from the winning station is filled from the next station that has it.
+#
+# The merged table can also be written straight to an EPW file (see epw.py).
+#
+# Run As:
+#           python3 mesobatch.py
+# or import and call processStations() and mergeStations().
+
+import io
+import contextlib
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from mesohourly import hourlyWeather, writeHourly, stationColumns
+from epw import epwFromHourly, epwHeader, writeEPW
+
+# Hour of each row of an hourly table from its Year, Month, Day, Hour columns
+def hourIndex(hourly):
+    return pd.to_datetime(pd.DataFrame({'year': hourly['Year'], 'month': hourly['Month'], 'day': hourly['Day'],
+                                        'hour': hourly['Hour']}).astype(int))
+
+# Average one station into hours. source = [file, station type, name, headrows (optional)].
+# Returns [name, hourly DataFrame, terminal output], so that the output of parallel workers can be
+# shown in order.
+def processStation(source, start, nhours, headrows=8, verbosity=1, chunkRows=100000):
+    sourcefile, station, name = source[0], source[1], source[2]
+    if len(source) > 3: headrows = source[3]
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        print("------- Station ", name, " (", station, "): ", sourcefile, " -------")
+        try:
+            hourly = hourlyWeather(sourcefile, station, start, nhours, headrows, verbosity=verbosity, chunkRows=chunkRows)
+        except (OSError, ValueError) as e:
+            print("Error: Could not process ", sourcefile, ": ", e)
+            hourly = None
+    return [name, hourly, log.getvalue()]
+
+# Pool task: processStation with all arguments in one list
+def _poolTask(args):
+    return processStation(*args)
+
+# Average every source into hours, using up to jobs worker processes. sources is a list of
+# [file, station type] or [file, station type, name] or [file, station type, name, headrows];
+# name defaults to the file name. Returns a list of [name, hourly DataFrame or None], in order of sources.
+def processStations(sources, start, nhours, headrows=8, verbosity=1, jobs=1, chunkRows=100000):
+    tasks = []
+    for s in sources:
+        s = list(s)
+        if len(s) < 3: s.append(s[0])
+        stationColumns(s[1]) # Check the station type before starting any work
+        tasks.append([s, start, nhours, headrows, verbosity, chunkRows])
+    jobs = min(jobs, len(tasks))
+    # Workers must not re-run the calling script, so they are forked from it
+    if jobs > 1 and 'fork' in mp.get_all_start_methods():
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=mp.get_context('fork')) as pool:
+            results = list(pool.map(_poolTask, tasks))
+    else:
+        if jobs > 1: print('Warning: Parallel mode needs the fork start method, processing stations one at a time instead.')
+        results = [_poolTask(t) for t in tasks]
+    for name, hourly, log in results:
+        print(log, end='')
+    return [[name, hourly] for name, hourly, log in results]
+
+# Join hourly tables on the hour into one table. Returns [merged DataFrame, winners] where winners
+# counts how many hours of each field came from each station, as a DataFrame (fields x stations).
+#   tables    list of [name, hourly DataFrame] from processStations; None tables are skipped
+#   priority  dict {field: [station names, highest priority first]}. Stations not listed come after,
+#             in the order of tables.
+def mergeStations(tables, priority=None):
+    if priority is None: priority = {}
+    tables = [[name, t.set_index(hourIndex(t))] for name, t in tables if t is not None and len(t) > 0]
+    if len(tables) == 0: return [pd.DataFrame(columns=['Year','Month','Day','Hour']), pd.DataFrame()]
+    names = [name for name, t in tables]
+    byName = dict(tables)
+    # Shared time index: every hour any station has
+    index = tables[0][1].index
+    for name, t in tables[1:]:
+        index = index.union(t.index)
+    merged = pd.DataFrame({'Year': index.year, 'Month': index.month, 'Day': index.day, 'Hour': index.hour},
+                          index=index, dtype=float)
+    # Fields in order of first appearance
+    fields = []
+    for name, t in tables:
+        fields += [c for c in t.columns[4:] if c not in fields]
+    winners = pd.DataFrame(0, index=fields, columns=names)
+    for field in fields:
+        order = [n for n in priority.get(field, []) if n in byName]
+        order += [n for n in names if n not in order]
+        value = pd.Series(float('nan'), index=index)
+        for n in order:
+            if field not in byName[n].columns: continue
+            fill = value.isna() & byName[n][field].reindex(index).notna()
+            value[fill] = byName[n][field].reindex(index)[fill]
+            winners.loc[field, n] = int(fill.sum())
+        merged[field] = value
+    return [merged.reset_index(drop=True), winners]
+
+
+if __name__ == '__main__':
+    # PARAMETER VARIABLES TO CHANGE -----------------------------------------
+    # List of sources: [file, station type, name]. Station types are listed in mesohourly.py.
+    # Optional 4th entry is the number of header rows for that file, if not headrows.
+    sources = [["KSJC_2019_Metric.csv", 'NWS', 'KSJC'],
+               ["E6095_2019_Metric.csv", 'APR', 'E6095']]
+
+    # Which station wins each field. Stations not listed, and fields not listed, follow the order of sources
+    priority = {'SolarRad': ['E6095'],
+                'Drybulb': ['KSJC'], 'RH': ['KSJC'], 'Dewpoint': ['KSJC'], 'Pressure': ['KSJC'], 'Windspeed': ['KSJC']}
+
+    outputfile = "SJ_2019_Merged.csv"
+
+    # Also write the merged data straight to an EPW file, with the header copied from epwtemplate.
+    # Fields without data are written as missing. "" = only write the csv
+    epwfile = ""
+    epwtemplate = "USA_CA_San.Jose_2019.epw"
+
+    # When to start - must match input data
+    startyear = 2019
+    startmonth = 1
+    startday = 1
+    starthour = 0
+
+    numdays = 7 # How many days of data; often want 365
+    tsperday = 24 #Timesteps per day; usually want 24
+    outrows = int(1 + numdays*tsperday) # Don't change this
+
+    # Number of header rows (non-data) at top to skip
+    headrows = 8 #Usually 8
+
+    # Number of stations to process in parallel
+    jobs = 4
+
+    # How much to print, see mesoweatherepw.py
+    verbosity = 1
+
+    # Main processing code --------------------------------------------------
+    print('\n============= MesoWest Stations -> Merged EPW Input V1.0 =============')
+    tables = processStations(sources, [startyear, startmonth, startday, starthour], outrows, headrows, verbosity, jobs)
+    merged, winners = mergeStations(tables, priority)
+    print("\nHours of each field taken from each station:")
+    print(winners)
+    writeHourly(merged, outputfile)
+    print("\nData Processing Complete!")
+    print("Exported Data as:   "+ outputfile)
+    if epwfile:
+        data = epwFromHourly(merged)
+        writeEPW(epwfile, data, epwHeader(epwtemplate, data=data))
+        print("Exported EPW as:    "+ epwfile)
+    print('\n=======================================================\n')
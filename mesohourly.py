@@ -0,0 +1,214 @@
+# mesohourly.py
+# Vectorized hourly aggregation of MesoWest weather CSVs, used by mesoweatherepw.py
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# Parses every MesoWest timecode (MM/DD/YYYY hh:mm TZ) once, assigns each observation to the hour
+# whose window (h-1):31 - h:30 contains it, and averages each hour with one group-by, ignoring
+# missing values. Hours without any observations are left blank (nan). As in EnergyPlus weather
+# data, Feb 29 is skipped.
+#
+# Large files are streamed: read, decoded and averaged one chunk of rows at a time by a chain of
+# generators, with each finished hour written out before the next chunk is read.
+#
+# Each chunk's read, aggregate and write stages are recorded when profiling is on (see epprofile.py).
+#
+# Output has one row per hour with columns Year, Month, Day, Hour (0 - 23) followed by the
+# averaged data columns for the station type, in the same format as the original mesoweatherepw.py.
+
+import numpy as np
+import pandas as pd
+from epprofile import clock, recordSince
+
+# Source columns (Col A = 0) and output headers for each station type
+#   'NWS'    NWS/FAA Type Stations (eg KSJC, KSFO)
+#   'APR'    APRSWXNET/Citizen Weather Observer Program stations (eg https://mesowest.utah.edu/cgi-bin/droman/meso_base_dyn.cgi?stn=E6095)
+#   'E9060'  Like APR with different columns
+#   'custom'
+STATIONS = {
+    'NWS': [[3,5,6,30,37], ['Year','Month','Day','Hour',"Drybulb","RH","Windspeed","Dewpoint","Pressure"]],
+    'APR': [[3,4,5,9,12,16], ['Year','Month','Day','Hour',"Drybulb","RH","Windspeed","SolarRad","Dewpoint","Pressure"]],
+    'E9060': [[3,4,5,9,11,15], ['Year','Month','Day','Hour',"Drybulb","RH","Windspeed","SolarRad","Dewpoint","Pressure"]],
+    'custom': [[3,5,6,11,13], ['Year','Month','Day','Hour',"Drybulb","RH","Windspeed","Dewpoint","Pressure"]],
+}
+
+# Column with the MesoWest timecode
+TIME_COL = 1
+
+# MesoWest timecode, eg. '01/01/2019 00:53 PST'
+TIMECODE_PATTERN = r'(\d{1,2})/(\d{1,2})/(\d{4})\s+(\d{1,2}):(\d{2})'
+
+# Returns [getcols, headers] for a station type
+def stationColumns(station):
+    if station not in STATIONS:
+        raise ValueError('Unknown station type ' + str(station) + ', use one of ' + ', '.join(STATIONS))
+    return STATIONS[station]
+
+# Converts MesoWest timecodes to datetimes. Invalid timecodes become NaT.
+def decodeTimecodes(timecodes):
+    timecodes = pd.Series(timecodes).astype(str)
+    # Fast path for the usual zero padded MM/DD/YYYY hh:mm, ignoring the time zone
+    times = pd.to_datetime(timecodes.str.slice(0, 16), format='%m/%d/%Y %H:%M', errors='coerce')
+    odd = times.isna()
+    if odd.any():
+        # Anything else, eg. without leading zeros
+        parts = timecodes[odd].str.extract(TIMECODE_PATTERN).astype(float).dropna()
+        parts.columns = ['month', 'day', 'year', 'hour', 'minute']
+        if len(parts) > 0:
+            times[parts.index] = pd.to_datetime(parts[['year', 'month', 'day', 'hour', 'minute']], errors='coerce')
+    return times
+
+# Returns the output hour of each time: minutes (h-1):31 - h:30 go to hour h
+def hourBins(times):
+    return (times - pd.Timedelta(minutes=31)).dt.floor('h') + pd.Timedelta(hours=1)
+
+# Returns nhours consecutive output hours from start, skipping Feb 29
+def outputHours(start, nhours):
+    # Enough extra hours to replace any skipped leap days
+    hours = pd.date_range(start, periods=nhours + 24*(nhours//(24*365) + 1), freq='h')
+    hours = hours[~((hours.month == 2) & (hours.day == 29))]
+    return hours[:nhours]
+
+# Generator of [times, data] for each chunk of chunkRows observations (all at once if chunkRows is None).
+# Rows with an invalid DateTime code are dropped, invalid data points become nan.
+# counts is a dict that gets the number of rows read, invalid data points and invalid timecodes.
+def readObservations(sourcefile, getcols, headers, headrows=8, chunkRows=None, verbosity=1, counts=None):
+    if counts is None: counts = {}
+    for k in ['rows', 'bad', 'badtime']: counts.setdefault(k, 0)
+    if verbosity >= 2:
+        with open(sourcefile) as src:
+            skipped = [next(src, '').rstrip('\n') for r in range(headrows)]
+        print("--- Skipping the following rows ---")
+        for line in skipped: print(line)
+        print("-----------------------------------")
+    # Read everything as text, the header rows do not have the same number of fields as the data
+    reader = pd.read_csv(sourcefile, header=None, skiprows=headrows, usecols=[TIME_COL] + list(getcols),
+                         dtype=str, skip_blank_lines=True, chunksize=chunkRows)
+    stageStart = clock()
+    for raw in (reader if chunkRows else [reader]):
+        times = decodeTimecodes(raw[TIME_COL])
+        data = raw[list(getcols)].apply(pd.to_numeric, errors='coerce')
+        data.columns = headers[4:]
+        # Invalid data points are ignored
+        bad = (data.isna() & raw[list(getcols)].notna().to_numpy()).to_numpy()
+        if verbosity >= 2:
+            for r, c in zip(*np.nonzero(bad)):
+                print("Warning: Invalid data point; ignoring:   \'", raw[getcols[c]].iat[r], "\'")
+        counts['rows'] += len(raw)
+        counts['bad'] += int(bad.sum())
+        counts['badtime'] += int(times.isna().sum())
+        keep = times.notna().to_numpy()
+        recordSince('read', stageStart, sourcefile, len(raw))
+        yield [times[keep], data[keep]]
+        stageStart = clock()
+
+# Returns [next position in hours, DataFrame of mean values for hours[pos] up to and including hour until],
+# or [pos, None] if there are no new hours. sums and n are the sum and count of each column by hour.
+def _completeHours(sums, n, hours, pos, until):
+    end = hours.searchsorted(until, side='right')
+    if end <= pos: return [pos, None]
+    # Hours with no observations are left blank
+    return [end, (sums/n.where(n > 0)).reindex(hours[pos:end])]
+
+# Generator of hourly averages for each output hour in hours, from a generator of [times, data]
+# observations in time order. Only the sum and count of the latest hour, which may still get more
+# observations from the next chunk, are carried over; every earlier hour is yielded right away.
+# At the end of input, the leftover hour is written too.
+def aggregateHours(observations, hours, counts=None):
+    if counts is None: counts = {}
+    counts.setdefault('late', 0)
+    pos = 0     # Index in hours of the next hour to write
+    carry = None
+    for times, data in observations:
+        if len(times) == 0: continue
+        stageStart = clock()
+        bins = hourBins(times).to_numpy()
+        # Observations for an hour that has already been written (out of order, or before start)
+        late = bins < hours[pos] if pos < len(hours) else np.ones(len(bins), dtype=bool)
+        counts['late'] += int(late.sum())
+        group = data[~late].groupby(bins[~late])
+        sums, n = group.sum(), group.count()
+        if carry is not None:
+            sums = sums.add(carry[0], fill_value=0)
+            n = n.add(carry[1], fill_value=0)
+        if len(sums) == 0: continue
+        latest = sums.index.max()
+        done = sums.index < latest
+        carry = [sums[~done], n[~done]]
+        block = None
+        if done.any():
+            pos, block = _completeHours(sums[done], n[done], hours, pos, sums.index[done].max())
+        recordSince('aggregate', stageStart, rows=len(times))
+        if block is not None: yield block
+        # Stop reading once every hour has been written
+        if pos >= len(hours): return
+    if carry is not None:
+        pos, block = _completeHours(carry[0], carry[1], hours, pos, carry[0].index.max())
+        if block is not None: yield block
+    if pos < len(hours):
+        print("Error: Input file is shorter than requested output!!!!!!!!!!! ")
+        print("WARNING: Data set may be incomplete. Ignore if this is the expected last hour.")
+
+# Returns the output DataFrame for hourly means indexed by hour: Year, Month, Day, Hour, then data columns
+def formatHours(hourly, headers):
+    out = pd.DataFrame({'Year': hourly.index.year, 'Month': hourly.index.month, 'Day': hourly.index.day,
+                        'Hour': hourly.index.hour}, dtype=np.float64)
+    for c in headers[4:]:
+        out[c] = hourly[c].to_numpy()
+    out.columns = headers
+    return out
+
+# Generator of the hourly output of a MesoWest CSV, in blocks of hours, reading chunkRows input rows
+# at a time so memory use does not depend on the length of the file. Output starts after the first chunk.
+#   start       [year, month, day, hour] of the first output hour; must match the input data
+#   nhours      number of output rows (hours)
+#   headrows    number of non-data rows at the top of the file
+#   getcols, headers  source columns and output headers, default from station
+#   verbosity   0 = errors only, 1 = summary, 2 = also skipped header rows and invalid data points,
+#               3 = also every hour written
+#   chunkRows   input rows per chunk, or None to read the whole file at once
+def streamHourly(sourcefile, station='NWS', start=(2019,1,1,0), nhours=24*365, headrows=8,
+                 getcols=None, headers=None, verbosity=1, chunkRows=100000):
+    if getcols is None or headers is None:
+        getcols, headers = stationColumns(station)
+    hours = outputHours(pd.Timestamp(*start), nhours)
+    counts = {}
+    observations = readObservations(sourcefile, getcols, headers, headrows, chunkRows, verbosity, counts)
+    written, empty = 0, 0
+    for block in aggregateHours(observations, hours, counts):
+        out = formatHours(block, headers)
+        written += len(out)
+        empty += int(block.isna().all(axis=1).sum())
+        if verbosity >= 3: print(out.to_string(header=(written == len(out))))
+        yield out
+    if verbosity >= 1:
+        if counts['bad'] > 0 and verbosity < 2: print("Warning: Ignored ", counts['bad'], " invalid data points")
+        if counts['badtime'] > 0: print("Warning: Ignored ", counts['badtime'], " rows with invalid DateTime code")
+        if counts['late'] > 0: print("Warning: Ignored ", counts['late'], " rows before the start or out of order")
+        if empty > 0: print("Warning: ", empty, " hours have no data and are left blank")
+        print("Read ", counts['rows'], " data rows into ", written, " hours from ", hours[0])
+
+# Read a MesoWest CSV and return the hourly average DataFrame, see streamHourly
+def hourlyWeather(sourcefile, station='NWS', start=(2019,1,1,0), nhours=24*365, headrows=8,
+                  getcols=None, headers=None, verbosity=1, chunkRows=None):
+    if getcols is None or headers is None:
+        getcols, headers = stationColumns(station)
+    blocks = list(streamHourly(sourcefile, station, start, nhours, headrows, getcols, headers, verbosity, chunkRows))
+    if len(blocks) == 0: return pd.DataFrame(columns=headers)
+    return pd.concat(blocks, ignore_index=True)
+
+# Write hourly data as csv, in the same format as the original mesoweatherepw.py.
+# hourly may be a DataFrame, or a generator of DataFrames (eg. streamHourly) that are written as they come.
+# Returns the number of rows written.
+def writeHourly(hourly, outputfile):
+    if isinstance(hourly, pd.DataFrame): hourly = [hourly]
+    rows = 0
+    with open(outputfile, 'w', newline='') as out:
+        for block in hourly:
+            stageStart = clock()
+            block.to_csv(out, header=(rows == 0), index=False, na_rep='nan', lineterminator='\r\n')
+            rows += len(block)
+            out.flush()
+            recordSince('write', stageStart, outputfile, len(block))
+    return rows
@@ -0,0 +1,114 @@
+# resampler.py
+# Resample evenly spaced csv time series (price, occupancy, weather) to another timestep
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# Output row k is at source position k/factor (factor = source timestep / target timestep, so 12
+# for hourly -> 5 minute, 1/12 for 5 minute -> hourly). Modes:
+#   'step'     hold the last source value (repeat each value factor times when upsampling)
+#   'nearest'  nearest source value, halfway goes to the later one
+#   'linear'   linear interpolation between source values
+# After the last source row, the last value is held. Every column is resampled the same way.
+#
+# Input is read and resampled a chunk of rows at a time; each resampled block is written before the
+# next chunk is read, so year-long 1-minute series never need the whole input or output in memory.
+# Only the source row(s) needed by the next output row are carried between chunks.
+#
+# Input csv is either one value per row (or several columns, one per series), or a single row of
+# values like '1, 2, 4, 5, 2, ...'. Output has one row per timestep with the columns comma
+# separated, written by numpy savetxt in the same format hourlyTo5min.py always wrote.
+
+import math
+from fractions import Fraction
+import numpy as np
+import pandas as pd
+
+RESAMPLE_MODES = ['step', 'nearest', 'linear']
+
+# Returns factor as an exact fraction. source and target are timesteps in the same units, eg.
+# resampleFactor(60, 5) = 12 for hourly -> 5 minute. A float factor is rounded to a close fraction.
+def resampleFactor(source, target=None):
+    if target is not None: return Fraction(source)/Fraction(target)
+    if isinstance(source, float): return Fraction(source).limit_denominator(1000000)
+    return Fraction(source)
+
+# Output rows kStart up to kEnd from buf, whose first row is source row base
+def _resampleRows(buf, base, kStart, kEnd, factor, mode):
+    k = np.arange(kStart, kEnd, dtype=np.int64)
+    # Source position of each output row: row i plus fraction frac of the way to row i + 1
+    i = (k*factor.denominator)//factor.numerator - base
+    frac = ((k*factor.denominator) % factor.numerator)/factor.numerator
+    # Past the last source row, the last value is held
+    after = np.minimum(i + 1, len(buf) - 1)
+    if mode == 'step':
+        return buf[i]
+    if mode == 'nearest':
+        return buf[np.where(frac >= 0.5, after, i)]
+    frac = frac[:, None]
+    return buf[i]*(1 - frac) + buf[after]*frac
+
+# Generator of resampled blocks from a generator of source blocks (arrays, rows = time), in order.
+# Each output block is yielded as soon as the source rows it needs have been read.
+def streamResample(blocks, factor=12, mode='step'):
+    if mode not in RESAMPLE_MODES:
+        raise ValueError('Unknown resample mode ' + str(mode) + ', use one of ' + ', '.join(RESAMPLE_MODES))
+    factor = resampleFactor(factor)
+    if factor <= 0: raise ValueError('Resample factor must be positive, not ' + str(factor))
+    num, den = factor.numerator, factor.denominator
+    # Nearest and linear need the source row after each output row too
+    ahead = 0 if mode == 'step' else 1
+    carry = None    # Source rows not used up yet
+    base = 0        # Source row number of carry[0]
+    k = 0           # Next output row
+    for block in blocks:
+        block = np.asarray(block, dtype=np.float64)
+        if block.ndim == 1: block = block.reshape(-1, 1)
+        if len(block) == 0: continue
+        buf = block if carry is None else np.vstack([carry, block])
+        # Output rows with source rows up to the last row in buf - ahead
+        kEnd = math.ceil((base + len(buf) - ahead)*num/den)
+        if kEnd > k:
+            yield _resampleRows(buf, base, k, kEnd, factor, mode)
+            k = kEnd
+        # Keep from the source row of the next output row on
+        keep = min((k*den)//num - base, len(buf))
+        carry = buf[keep:]
+        base += keep
+    # End of input: the rest of the output rows, holding the last value
+    if carry is not None and len(carry) > 0:
+        kEnd = math.ceil((base + len(carry))*num/den)
+        if kEnd > k: yield _resampleRows(carry, base, k, kEnd, factor, mode)
+
+# Resample a whole array (rows = time) at once. Returns the resampled array.
+def resampleArray(values, factor=12, mode='step'):
+    values = np.asarray(values, dtype=np.float64)
+    blocks = list(streamResample([values], factor, mode))
+    if len(blocks) == 0: return values.reshape(0, *values.shape[1:])
+    out = np.concatenate(blocks)
+    return out[:, 0] if values.ndim == 1 else out
+
+# Generator of source blocks of chunkRows rows from a csv without header.
+# A file with a single row of values is read as one column.
+def readBlocks(infile, chunkRows=100000):
+    with open(infile) as f:
+        first = [next(f, '') for r in range(2)]
+    if first[1].strip() == '':
+        yield np.genfromtxt(infile, delimiter=',').reshape(-1, 1)
+        return
+    for chunk in pd.read_csv(infile, header=None, skipinitialspace=True, dtype=np.float64,
+                             float_precision='round_trip', chunksize=chunkRows):
+        yield chunk.to_numpy()
+
+# Write blocks (arrays, rows = time) to a csv as they come. Returns the number of rows written.
+def writeBlocks(blocks, outfile, fmt='%.18e'):
+    rows = 0
+    with open(outfile, 'w') as out:
+        for block in blocks:
+            np.savetxt(out, block, fmt=fmt, delimiter=',')
+            rows += len(block)
+    return rows
+
+# Resample infile to outfile, chunkRows source rows at a time. Returns the number of rows written.
+def resampleFile(infile, outfile, factor=12, mode='step', chunkRows=100000, fmt='%.18e'):
+    return writeBlocks(streamResample(readBlocks(infile, chunkRows), factor, mode), outfile, fmt)
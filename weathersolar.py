@@ -0,0 +1,149 @@
+# weathersolar.py
+# Outdoor temperature and solar radiation at the co-sim timestep, straight from an EPW file
+# Author(s):    SCU Smart Grid CPS
+# Version:      1.0
+# Last Updated: 2026-10-17
+#
+# Replaces running GetWeatherSolar/GetWeatherSolar.idf (or _wDiffuse) through EnergyPlus just to get
+# the weather at each timestep. Hourly EPW values are interpolated to the timestep the same way
+# EnergyPlus does it (WeatherManager):
+#   - Temperature and humidity are instantaneous values at the end of each hour. Timestep ts of n
+#     in hour h is  last hour*(1 - ts/n) + this hour*ts/n.
+#   - Solar radiation is the total over each hour, so it is weighted towards the middle of the
+#     hour: at the half hour the value is this hour's, before it is blended with the hour before,
+#     after it with the hour after. With an odd number of timesteps per hour no timestep ends at
+#     the half hour, and EnergyPlus uses its own weights for those (see solarWeights).
+# The hour before the first hour of the file, and the hour after the last, are taken as the
+# first and last hour themselves. EnergyPlus also sets solar to 0 while the sun is down; that
+# check needs a solar position model and is not done here, so values at sunrise and sunset can
+# differ a little from an EnergyPlus run.
+#
+# The whole file is interpolated once and each window is a slice of the result, so any number of
+# date windows come from one call to weatherWindows(). The EPW is read through the cache in epw.py.
+#
+# Output CSV has the EnergyPlus Date/Time column (' 08/01  00:05:00', last timestep of a day is
+# 24:00:00) and the columns in WEATHER_COLUMNS, named as in the EnergyPlus output.
+#
+# Run As:
+#           python3 weathersolar.py
+# after setting the parameters at the bottom of this file, or import weatherWindows().
+
+import numpy as np
+import pandas as pd
+from epw import loadEPW, epwWindow, epwDateRange
+
+# EPW field -> [output column, interpolation 'point' (instantaneous) or 'solar' (hourly total)]
+WEATHER_COLUMNS = {
+    'DryBulb': ['Environment:Site Outdoor Air Drybulb Temperature [C](TimeStep)', 'point'],
+    'RelHum': ['Environment:Site Outdoor Air Relative Humidity [%](TimeStep)', 'point'],
+    'GloHorzRad': ['Environment:Site Global Horizontal Solar Radiation Rate per Area [W/m2](TimeStep)', 'solar'],
+    'DirNormRad': ['Environment:Site Direct Solar Radiation Rate per Area [W/m2](TimeStep)', 'solar'],
+    'DifHorzRad': ['Environment:Site Diffuse Solar Radiation Rate per Area [W/m2](TimeStep)', 'solar'],
+}
+
+# Returns [weight of this hour, weight of last hour] for each of the n timesteps in an hour, for
+# instantaneous values. Same as EnergyPlus Interpolation.
+def pointWeights(n):
+    now = np.minimum(1.0, np.arange(1, n + 1)/n)
+    return [now, 1 - now]
+
+# Returns [weight of last hour, this hour, next hour] for each of the n timesteps in an hour, for
+# solar radiation. Same as EnergyPlus SolarInterpolation:
+#   even n   1 at timestep n/2, less 1/n for each timestep away from it
+#   n = 1    1/2, and 1/2 of the next hour
+#   n = 3    5/6, 5/6, 1/2
+#   other n  1 - 1/(2n) at both middle timesteps n//2 and n//2 + 1, less 1/n for each timestep away
+# The rest of the weight goes to the last hour before the half hour and to the next hour after it.
+def solarWeights(n):
+    ts = np.arange(1, n + 1)
+    if n % 2 == 0:
+        now = 1 - np.abs(ts - n//2)/n
+    elif n == 1:
+        now = np.array([0.5])
+    elif n == 3:
+        now = np.array([5/6, 5/6, 0.5])
+    else:
+        half = n//2
+        away = np.where(ts <= half, half - ts, ts - half - 1)
+        now = (1 - (1/n)/2) - away*(1/n)
+    before = ts*(1/n) < 0.5
+    prev = np.where(before & (now < 1), 1 - now, 0.0)
+    nxt = np.where(~before & (now < 1), 1 - now, 0.0)
+    return [prev, now, nxt]
+
+# Interpolates an hourly array to n timesteps per hour. Returns an array of len(hourly)*n values.
+def interpolateHourly(hourly, n, kind='point'):
+    hourly = np.asarray(hourly, dtype=np.float64)
+    last = np.r_[hourly[:1], hourly[:-1]]
+    nxt = np.r_[hourly[1:], hourly[-1:]]
+    # (hours x n) by broadcasting the per-timestep weights against the hourly values
+    if kind == 'solar':
+        wPrev, wNow, wNext = solarWeights(n)
+        values = np.outer(last, wPrev) + np.outer(hourly, wNow) + np.outer(nxt, wNext)
+    else:
+        wNow, wPrev = pointWeights(n)
+        values = np.outer(last, wPrev) + np.outer(hourly, wNow)
+    return values.ravel()
+
+# EnergyPlus Date/Time strings for n timesteps per hour of each EPW row, eg. ' 08/01  00:05:00'
+def timestepDateTimes(data, n):
+    rows = len(data)
+    month = np.repeat(np.asarray(data['Month'], dtype=int), n)
+    day = np.repeat(np.asarray(data['Day'], dtype=int), n)
+    # Minutes since midnight at the end of each timestep
+    minutes = (np.repeat(np.asarray(data['Hour'], dtype=int) - 1, n)*60 + np.tile(np.arange(1, n + 1)*60//n, rows))
+    s = pd.DataFrame({'m': month, 'd': day, 'H': minutes//60, 'M': minutes % 60}).astype(str)
+    return (' ' + s['m'].str.zfill(2) + '/' + s['d'].str.zfill(2) + '  ' + s['H'].str.zfill(2) + ':' +
+            s['M'].str.zfill(2) + ':00').to_numpy()
+
+# Weather at n timesteps per hour for every row of an EPW file. Returns a DataFrame with
+# Date/Time and WEATHER_COLUMNS.
+def timestepWeather(data, n, fields=None):
+    if fields is None: fields = list(WEATHER_COLUMNS)
+    out = {'Date/Time': timestepDateTimes(data, n)}
+    for f in fields:
+        name, kind = WEATHER_COLUMNS[f]
+        out[name] = interpolateHourly(data[f], n, kind)
+    return pd.DataFrame(out)
+
+# Weather at timestep [minutes] for each window, from one EPW file. timestep must divide an hour.
+#   windows  list of eppp.py date_range strings ('2020-08-01_2020-08-31') or [[month, day], [month, day]]
+#            pairs, first and last day inclusive
+# Returns a list of DataFrames, one per window. The file is read and interpolated once.
+def weatherWindows(epwfile, windows, timestep=5, fields=None, useCache=True):
+    if timestep <= 0 or 60 % timestep != 0:
+        raise ValueError("Timestep must divide 60 minutes evenly, got " + str(timestep))
+    n = 60//timestep
+    header, data, days = loadEPW(epwfile, useCache)
+    weather = timestepWeather(data, n, fields)
+    rows = np.arange(len(data))
+    out = []
+    for w in windows:
+        # Rows of the window in the EPW data, then the matching timesteps
+        if isinstance(w, str): win = epwDateRange(rows, w, days)
+        else: win = epwWindow(rows, w[0], w[1], days)
+        out.append(weather.iloc[win[0]*n:(win[-1] + 1)*n].reset_index(drop=True))
+    return out
+
+
+if __name__ == '__main__':
+    # PARAMETER VARIABLES TO CHANGE -----------------------------------------
+    epwfile = "USA_CA_San.Jose_2019.epw"
+
+    # Date windows to produce, as date_range strings like eppp.py or [[month, day], [month, day]]
+    windows = ['2020-08-01_2020-08-31', [[6, 21], [9, 30]]]
+
+    # Co-sim timestep [minutes]
+    timestep = 5
+
+    # Output file name prefix, followed by the window
+    outputprefix = "WeatherSolar_"
+
+    # Main processing code --------------------------------------------------
+    print('\n================ EPW -> Timestep Weather & Solar V1.0 ================')
+    for w, weather in zip(windows, weatherWindows(epwfile, windows, timestep)):
+        name = w if isinstance(w, str) else '{:02d}-{:02d}_{:02d}-{:02d}'.format(w[0][0], w[0][1], w[1][0], w[1][1])
+        outputfile = outputprefix + name + '.csv'
+        weather.to_csv(outputfile, index=False)
+        print("Exported ", len(weather), " timesteps as:   " + outputfile)
+    print('\n=======================================================\n')